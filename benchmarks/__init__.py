@@ -0,0 +1,4 @@
+"""Benchmarks for hints.
+
+These are development tools, they are not part of the hints package.
+"""
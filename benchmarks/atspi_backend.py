@@ -0,0 +1,318 @@
+"""Benchmark AtspiBackend.get_children against synthetic trees.
+
+Runs headless with only dbus-daemon: a private dbus-daemon is the
+accessibility bus, and benchmarks.atspi_simulator serves the trees on it.
+Every scenario (shape, node count, collection or recursive path) gets its
+own simulator and its own worker process, so libatspi starts cold like
+hints does:
+
+    python -m benchmarks.atspi_backend --shapes web wide --nodes 10000 50000
+
+Prints a JSON line per scenario, with the latency (in seconds) of the
+first (cold) get_children call and a summary of the following (warm)
+calls, and the AT-SPI calls the backend made.
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from os import environ
+from subprocess import PIPE, Popen, run
+from sys import executable
+from time import perf_counter
+from typing import Any
+
+from benchmarks.synthetic_tree import TREE_SHAPES, WINDOW_SIZE
+from hints.mouse_stats import Histogram
+from hints.window_systems.window_system import WindowSystem
+from hints.window_systems.window_system_type import WindowSystemType
+
+# the collection path, and the recursive fallback for applications without
+# the Collection interface
+MODES = ("collection", "recursive")
+
+
+class SimulatedWindowSystem(WindowSystem):
+    """Window system with the simulator's window focused."""
+
+    def __init__(self, pid: int):
+        """Simulated window system constructor.
+
+        :param pid: Process ID of the simulator.
+        """
+        self.pid = pid
+
+    @property
+    def window_system_type(self) -> WindowSystemType:
+        return WindowSystemType.X11
+
+    @property
+    def window_system_name(self) -> str:
+        return "simulator"
+
+    @property
+    def focused_window_extents(self) -> tuple[int, int, int, int]:
+        return (0, 0, *WINDOW_SIZE)
+
+    @property
+    def focused_window_pid(self) -> int:
+        return self.pid
+
+    @property
+    def focused_applicaiton_name(self) -> str:
+        return "simulator"
+
+
+def start_bus() -> tuple[Popen, str]:
+    """Start a private dbus-daemon.
+
+    :return: The daemon process and its address.
+    """
+    bus = Popen(
+        ["dbus-daemon", "--session", "--nofork", "--nopidfile", "--print-address=1"],
+        stdout=PIPE,
+        text=True,
+    )
+
+    return bus, bus.stdout.readline().strip()  # type: ignore[union-attr]
+
+
+def start_simulator(address: str, simulator_args: list[str]) -> tuple[Popen, dict]:
+    """Start the simulator and wait for it to be ready.
+
+    :param address: Address of the accessibility bus.
+    :param simulator_args: Arguments for the simulator.
+    :return: The simulator process and its bus name, pid and node count.
+    """
+    simulator = Popen(
+        [
+            executable,
+            "-m",
+            "benchmarks.atspi_simulator",
+            "--address",
+            address,
+            *simulator_args,
+        ],
+        stdout=PIPE,
+        text=True,
+    )
+
+    return simulator, loads(simulator.stdout.readline())  # type: ignore[union-attr]
+
+
+def run_worker(address: str, bus_name: str, pid: int, repeat: int, timeout: float):
+    """Call get_children and print the latency and calls of every call as
+    a JSON line.
+
+    :param address: Address of the accessibility bus.
+    :param bus_name: Bus name of the simulator.
+    :param pid: Process ID of the simulator.
+    :param repeat: Number of get_children calls.
+    :param timeout: Seconds to wait for D-Bus calls.
+    """
+    # pylint: disable=import-outside-toplevel
+    import dbus
+    import dbus.bus
+    from gi import require_version
+
+    require_version("Atspi", "2.0")
+    from gi.repository import Atspi
+
+    from hints.backends.atspi import AtspiBackend
+    from hints.default_config import get_default_config
+
+    # collections of large trees take longer than the default timeout
+    Atspi.set_timeout(round(timeout * 1000), round(timeout * 1000))
+    control = dbus.Interface(
+        dbus.bus.BusConnection(address).get_object(bus_name, "/org/hints/Simulator"),
+        "org.hints.Simulator",
+    )
+    backend = AtspiBackend(get_default_config(), SimulatedWindowSystem(pid))
+    runs = []
+
+    for _ in range(repeat):
+        control.ResetCallCounts()
+        start = perf_counter()
+        children = backend.get_children()
+        seconds = perf_counter() - start
+        runs.append(
+            {
+                "seconds": seconds,
+                "children": len(children),
+                "calls": {
+                    str(name): int(count)
+                    for name, count in control.GetCallCounts().items()
+                },
+            }
+        )
+
+    print(dumps(runs))
+
+
+def run_scenario(
+    address: str,
+    shape: str,
+    nodes: int,
+    mode: str,
+    cache: bool,
+    latency: float,
+    repeat: int,
+    timeout: float,
+) -> dict[str, Any]:
+    """Benchmark get_children against a synthetic tree.
+
+    :param address: Address of the accessibility bus.
+    :param shape: Tree shape.
+    :param nodes: Number of nodes in the tree.
+    :param mode: "collection" or "recursive".
+    :param cache: Whether the simulator implements the Cache interface.
+    :param latency: Seconds the simulator delays every call by.
+    :param repeat: Number of get_children calls.
+    :param timeout: Seconds to wait for D-Bus calls.
+    :return: The results.
+    """
+    simulator, simulator_info = start_simulator(
+        address,
+        [
+            "--shape",
+            shape,
+            "--nodes",
+            str(nodes),
+            "--collection" if mode == "collection" else "--no-collection",
+            "--cache" if cache else "--no-cache",
+            "--latency",
+            str(latency),
+        ],
+    )
+
+    try:
+        worker = run(
+            [
+                executable,
+                "-m",
+                "benchmarks.atspi_backend",
+                "--worker",
+                simulator_info["bus_name"],
+                str(simulator_info["pid"]),
+                "--repeat",
+                str(repeat),
+                "--timeout",
+                str(timeout),
+            ],
+            env=environ
+            | {"AT_SPI_BUS_ADDRESS": address, "DBUS_SESSION_BUS_ADDRESS": address},
+            stdout=PIPE,
+            text=True,
+            check=True,
+        )
+    finally:
+        simulator.terminate()
+        simulator.wait()
+
+    runs = loads(worker.stdout)
+    cold, *warm = runs
+    warm_seconds = Histogram()
+
+    for warm_run in warm:
+        warm_seconds.add(warm_run["seconds"])
+
+    return {
+        "shape": shape,
+        "nodes": simulator_info["nodes"],
+        "mode": mode,
+        "cache": cache,
+        "latency": latency,
+        "children": cold["children"],
+        "cold": {
+            "seconds": cold["seconds"],
+            "total_calls": sum(cold["calls"].values()),
+            "calls": cold["calls"],
+        },
+        "warm": {
+            "seconds": warm_seconds.to_dict(),
+            "total_calls": (
+                sum(sum(warm_run["calls"].values()) for warm_run in warm) / len(warm)
+                if warm
+                else 0
+            ),
+        },
+    }
+
+
+def main():
+    """Benchmark entry point."""
+    parser = ArgumentParser(
+        prog="atspi_backend",
+        description="Benchmark AtspiBackend.get_children against synthetic"
+        " accessibility trees.",
+    )
+    parser.add_argument(
+        "--shapes", nargs="+", choices=TREE_SHAPES, default=list(TREE_SHAPES)
+    )
+    parser.add_argument("--nodes", nargs="+", type=int, default=[10000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Have the simulator implement the Cache interface.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0,
+        help="Seconds the simulator delays every call by.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="get_children calls per scenario, the first one is cold.",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=120, help="Seconds to wait for D-Bus calls."
+    )
+    parser.add_argument(
+        "--worker",
+        nargs=2,
+        metavar=("BUS_NAME", "PID"),
+        help="Run get_children against a running simulator (used internally).",
+    )
+
+    args = parser.parse_args()
+
+    if args.worker:
+        bus_name, pid = args.worker
+        run_worker(
+            environ["AT_SPI_BUS_ADDRESS"], bus_name, int(pid), args.repeat, args.timeout
+        )
+        return
+
+    bus, address = start_bus()
+
+    try:
+        for shape in args.shapes:
+            for nodes in args.nodes:
+                for mode in args.modes:
+                    print(
+                        dumps(
+                            run_scenario(
+                                address,
+                                shape,
+                                nodes,
+                                mode,
+                                args.cache,
+                                args.latency,
+                                args.repeat,
+                                args.timeout,
+                            )
+                        ),
+                        flush=True,
+                    )
+    finally:
+        bus.terminate()
+        bus.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,731 @@
+"""Synthetic application serving accessibility trees over D-Bus.
+
+Stands in for the AT-SPI registry and an application on an accessibility
+bus (usually a private dbus-daemon), so AtspiBackend can be benchmarked
+without a desktop:
+
+- the registry owns org.a11y.atspi.Registry and serves the desktop, with
+  the application as its only child.
+- the application serves a synthetic tree (see benchmarks.synthetic_tree)
+  with the Accessible, Component and Application interfaces, and
+  optionally the Collection and Cache interfaces.
+
+Every AT-SPI call is counted, and can be delayed to simulate slow
+applications. Counts are read and reset over the org.hints.Simulator
+interface, which is not counted.
+
+The simulator prints a JSON line with its bus name and pid once it is
+ready:
+
+    python -m benchmarks.atspi_simulator --address "$AT_SPI_BUS_ADDRESS" \\
+        --shape web --nodes 50000 --no-collection --latency 0.0001
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser, BooleanOptionalAction
+from json import dumps
+from os import getpid
+from time import sleep
+from typing import Any
+
+import dbus
+import dbus.bus
+import dbus.service
+from dbus.mainloop.glib import DBusGMainLoop
+from gi import require_version
+
+require_version("Atspi", "2.0")
+require_version("GLib", "2.0")
+from gi.repository import Atspi, GLib
+
+from benchmarks.synthetic_tree import TREE_SHAPES, SyntheticTree, build_tree
+from hints.backends.replay import CollectionMatchRule
+
+REGISTRY_NAME = "org.a11y.atspi.Registry"
+REGISTRY_PATH = "/org/a11y/atspi/registry"
+ACCESSIBLE_PATH = "/org/a11y/atspi/accessible"
+ROOT_PATH = "/org/a11y/atspi/accessible/root"
+NULL_PATH = "/org/a11y/atspi/null"
+CACHE_PATH = "/org/a11y/atspi/cache"
+ACCESSIBLE_INTERFACE = "org.a11y.atspi.Accessible"
+APPLICATION_INTERFACE = "org.a11y.atspi.Application"
+CACHE_INTERFACE = "org.a11y.atspi.Cache"
+COLLECTION_INTERFACE = "org.a11y.atspi.Collection"
+COMPONENT_INTERFACE = "org.a11y.atspi.Component"
+REGISTRY_INTERFACE = "org.a11y.atspi.Registry"
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+SIMULATOR_PATH = "/org/hints/Simulator"
+SIMULATOR_INTERFACE = "org.hints.Simulator"
+
+
+class UnknownObjectError(dbus.exceptions.DBusException):
+    """D-Bus error for paths that are not nodes of the tree."""
+
+    _dbus_error_name = "org.freedesktop.DBus.Error.UnknownObject"
+
+
+class UnknownMethodError(dbus.exceptions.DBusException):
+    """D-Bus error for interfaces the simulator was told not to implement."""
+
+    _dbus_error_name = "org.freedesktop.DBus.Error.UnknownMethod"
+
+
+class CallCounter:
+    """Count AT-SPI calls and delay them."""
+
+    def __init__(self, latency: float = 0):
+        """Call counter constructor.
+
+        :param latency: Seconds to delay every call by.
+        """
+        self.latency = latency
+        self.counts: dict[str, int] = {}
+
+    def __call__(self, name: str):
+        """Count a call, then delay it.
+
+        :param name: Name of the call, like "Accessible.GetRole".
+        """
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+        if self.latency:
+            sleep(self.latency)
+
+
+def get_bits(words: list[int]) -> int:
+    """Get a bit set from D-Bus int32 words (like state sets and role sets
+    in match rules).
+
+    :param words: The words, least significant first.
+    :return: The bit set.
+    """
+    bits = 0
+
+    for word_index, word in enumerate(words):
+        bits |= (int(word) & 0xFFFFFFFF) << (32 * word_index)
+
+    return bits
+
+
+def get_words(bits: int, count: int) -> list[int]:
+    """Get D-Bus uint32 words from a bit set.
+
+    :param bits: The bit set.
+    :param count: Number of words.
+    :return: The words, least significant first.
+    """
+    return [(bits >> (32 * word_index)) & 0xFFFFFFFF for word_index in range(count)]
+
+
+def get_match_rule(rule: Any) -> CollectionMatchRule:
+    """Read a collection match rule from D-Bus.
+
+    :param rule: The (aiia{ss}iaiiasib) match rule struct.
+    :return: The match rule.
+    """
+    (
+        states,
+        states_match_type,
+        attributes,
+        attributes_match_type,
+        roles,
+        roles_match_type,
+        _interfaces,
+        _interfaces_match_type,
+        invert,
+    ) = rule
+
+    return CollectionMatchRule(
+        states=get_bits(states),
+        states_match_type=int(states_match_type),
+        attributes={str(key): str(value) for key, value in attributes.items()},
+        attributes_match_type=int(attributes_match_type),
+        roles=get_bits(roles),
+        roles_match_type=int(roles_match_type),
+        invert=bool(invert),
+    )
+
+
+class SimulatedApplication(dbus.service.FallbackObject):
+    """The accessible objects of the synthetic tree.
+
+    Node 0 is served at /org/a11y/atspi/accessible/root, node n at
+    /org/a11y/atspi/accessible/n.
+    """
+
+    def __init__(
+        self,
+        connection: dbus.bus.BusConnection,
+        tree: SyntheticTree,
+        counter: CallCounter,
+        collection: bool = True,
+        toolkit: tuple[str, str] = ("hints-simulator", "1.0"),
+    ):
+        """Simulated application constructor.
+
+        :param connection: The accessibility bus connection to serve on.
+        :param tree: The tree to serve.
+        :param counter: Counter for calls.
+        :param collection: Whether to implement the Collection interface.
+        :param toolkit: Toolkit name and version.
+        """
+        super().__init__(connection, ACCESSIBLE_PATH)
+        self.bus_name = connection.get_unique_name()
+        self.tree = tree
+        self.counter = counter
+        self.collection = collection
+        self.toolkit = toolkit
+        self.interfaces = [ACCESSIBLE_INTERFACE, COMPONENT_INTERFACE]
+
+        if collection:
+            self.interfaces.append(COLLECTION_INTERFACE)
+
+    def get_index(self, rel_path: str) -> int:
+        """Get the node a path is for.
+
+        :param rel_path: Path relative to /org/a11y/atspi/accessible.
+        :return: Index of the node.
+        :raises UnknownObjectError: When there is no node for the path.
+        """
+        name = rel_path.rsplit("/", 1)[-1]
+
+        if name == "root":
+            return 0
+
+        if name.isdigit() and 0 < int(name) < len(self.tree):
+            return int(name)
+
+        raise UnknownObjectError(f"No accessible at {rel_path}")
+
+    def get_reference(self, index: int) -> tuple[str, dbus.ObjectPath]:
+        """Get the (bus name, path) reference to a node.
+
+        :param index: Index of the node.
+        :return: The reference.
+        """
+        if index < 0:
+            return (REGISTRY_NAME, dbus.ObjectPath(ROOT_PATH))
+
+        return (
+            self.bus_name,
+            dbus.ObjectPath(ROOT_PATH if index == 0 else f"{ACCESSIBLE_PATH}/{index}"),
+        )
+
+    def get_interfaces(self, index: int) -> list[str]:
+        """Get the interfaces a node implements.
+
+        :param index: Index of the node.
+        :return: The interface names.
+        """
+        if index == 0:
+            return self.interfaces + [APPLICATION_INTERFACE]
+
+        return self.interfaces
+
+    def get_properties(self, interface: str, index: int) -> dict[str, Any]:
+        """Get the D-Bus properties of a node.
+
+        :param interface: The interface to get properties for.
+        :param index: Index of the node.
+        :return: Properties by name.
+        """
+        if interface == APPLICATION_INTERFACE:
+            name, version = self.toolkit
+            return {
+                "ToolkitName": dbus.String(name),
+                "Version": dbus.String(version),
+                "AtspiVersion": dbus.String("2.1"),
+                "Id": dbus.Int32(index),
+            }
+
+        if interface == ACCESSIBLE_INTERFACE:
+            return {
+                "Name": dbus.String(self.tree.get_name(index)),
+                "Description": dbus.String(""),
+                "Parent": dbus.Struct(
+                    self.get_reference(self.tree.parents[index]), signature="so"
+                ),
+                "ChildCount": dbus.Int32(len(self.tree.children[index])),
+                "Locale": dbus.String("en_US"),
+                "AccessibleId": dbus.String(str(index)),
+                "HelpText": dbus.String(""),
+            }
+
+        return {}
+
+    @dbus.service.method(
+        PROPERTIES_INTERFACE,
+        in_signature="ss",
+        out_signature="v",
+        rel_path_keyword="rel_path",
+    )
+    def Get(self, interface, name, rel_path):  # pylint: disable=invalid-name
+        """Get a property."""
+        self.counter(f"Properties.Get:{name}")
+        properties = self.get_properties(interface, self.get_index(rel_path))
+
+        if name not in properties:
+            raise UnknownMethodError(f"No property {interface}.{name}")
+
+        return properties[name]
+
+    @dbus.service.method(
+        PROPERTIES_INTERFACE,
+        in_signature="s",
+        out_signature="a{sv}",
+        rel_path_keyword="rel_path",
+    )
+    def GetAll(self, interface, rel_path):  # pylint: disable=invalid-name
+        """Get all properties of an interface."""
+        self.counter("Properties.GetAll")
+        return self.get_properties(interface, self.get_index(rel_path))
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="i",
+        out_signature="(so)",
+        rel_path_keyword="rel_path",
+    )
+    def GetChildAtIndex(self, child_index, rel_path):  # pylint: disable=invalid-name
+        """Get a child."""
+        self.counter("Accessible.GetChildAtIndex")
+        children = self.tree.children[self.get_index(rel_path)]
+
+        if not 0 <= child_index < len(children):
+            return (self.bus_name, dbus.ObjectPath(NULL_PATH))
+
+        return self.get_reference(children[child_index])
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="a(so)",
+        rel_path_keyword="rel_path",
+    )
+    def GetChildren(self, rel_path):  # pylint: disable=invalid-name
+        """Get all children."""
+        self.counter("Accessible.GetChildren")
+        return [
+            self.get_reference(child)
+            for child in self.tree.children[self.get_index(rel_path)]
+        ]
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="i",
+        rel_path_keyword="rel_path",
+    )
+    def GetIndexInParent(self, rel_path):  # pylint: disable=invalid-name
+        """Get the index of the node among its siblings."""
+        self.counter("Accessible.GetIndexInParent")
+        return self.tree.indexes[self.get_index(rel_path)]
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="a(ua(so))",
+        rel_path_keyword="rel_path",
+    )
+    def GetRelationSet(self, rel_path):  # pylint: disable=invalid-name
+        """Get relations, synthetic nodes have none."""
+        self.counter("Accessible.GetRelationSet")
+        self.get_index(rel_path)
+        return dbus.Array([], signature="(ua(so))")
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="u",
+        rel_path_keyword="rel_path",
+    )
+    def GetRole(self, rel_path):  # pylint: disable=invalid-name
+        """Get the role."""
+        self.counter("Accessible.GetRole")
+        return self.tree.roles[self.get_index(rel_path)]
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="s",
+        rel_path_keyword="rel_path",
+    )
+    def GetRoleName(self, rel_path):  # pylint: disable=invalid-name
+        """Get the name of the role."""
+        self.counter("Accessible.GetRoleName")
+        return Atspi.role_get_name(self.tree.roles[self.get_index(rel_path)])
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="au",
+        rel_path_keyword="rel_path",
+    )
+    def GetState(self, rel_path):  # pylint: disable=invalid-name
+        """Get the state set."""
+        self.counter("Accessible.GetState")
+        return get_words(self.tree.states[self.get_index(rel_path)], 2)
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="a{ss}",
+        rel_path_keyword="rel_path",
+    )
+    def GetAttributes(self, rel_path):  # pylint: disable=invalid-name
+        """Get the attributes."""
+        self.counter("Accessible.GetAttributes")
+        return dbus.Dictionary(
+            self.tree.get_attributes(self.get_index(rel_path)), signature="ss"
+        )
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="(so)",
+        rel_path_keyword="rel_path",
+    )
+    def GetApplication(self, rel_path):  # pylint: disable=invalid-name
+        """Get the application."""
+        self.counter("Accessible.GetApplication")
+        self.get_index(rel_path)
+        return self.get_reference(0)
+
+    @dbus.service.method(
+        ACCESSIBLE_INTERFACE,
+        in_signature="",
+        out_signature="as",
+        rel_path_keyword="rel_path",
+    )
+    def GetInterfaces(self, rel_path):  # pylint: disable=invalid-name
+        """Get the interfaces the node implements."""
+        self.counter("Accessible.GetInterfaces")
+        return self.get_interfaces(self.get_index(rel_path))
+
+    @dbus.service.method(
+        COMPONENT_INTERFACE,
+        in_signature="u",
+        out_signature="(iiii)",
+        rel_path_keyword="rel_path",
+    )
+    def GetExtents(self, _coord_type, rel_path):  # pylint: disable=invalid-name
+        """Get the extents.
+
+        The window is at the origin of the screen, so screen and window
+        coordinates are the same.
+        """
+        self.counter("Component.GetExtents")
+        return self.tree.extents[self.get_index(rel_path)]
+
+    @dbus.service.method(
+        COMPONENT_INTERFACE,
+        in_signature="u",
+        out_signature="(ii)",
+        rel_path_keyword="rel_path",
+    )
+    def GetPosition(self, _coord_type, rel_path):  # pylint: disable=invalid-name
+        """Get the position."""
+        self.counter("Component.GetPosition")
+        return self.tree.extents[self.get_index(rel_path)][:2]
+
+    @dbus.service.method(
+        COMPONENT_INTERFACE,
+        in_signature="",
+        out_signature="(ii)",
+        rel_path_keyword="rel_path",
+    )
+    def GetSize(self, rel_path):  # pylint: disable=invalid-name
+        """Get the size."""
+        self.counter("Component.GetSize")
+        return self.tree.extents[self.get_index(rel_path)][2:]
+
+    @dbus.service.method(
+        COLLECTION_INTERFACE,
+        in_signature="(aiia{ss}iaiiasib)uib",
+        out_signature="a(so)",
+        rel_path_keyword="rel_path",
+    )
+    def GetMatches(  # pylint: disable=invalid-name
+        self, rule, sort_by, count, _traverse, rel_path
+    ):
+        """Get the descendants matching a rule."""
+        if not self.collection:
+            raise UnknownMethodError("The Collection interface is disabled")
+
+        self.counter("Collection.GetMatches")
+        match_rule = get_match_rule(rule)
+        tree = self.tree
+        matches = [
+            descendant
+            for descendant in tree.iter_descendants(self.get_index(rel_path))
+            if match_rule.match(
+                tree.states[descendant],
+                tree.roles[descendant],
+                tree.get_attributes(descendant),
+            )
+        ]
+
+        if sort_by == Atspi.CollectionSortOrder.REVERSE_CANONICAL:
+            matches.reverse()
+
+        if count > 0:
+            matches = matches[:count]
+
+        return dbus.Array(
+            [self.get_reference(match) for match in matches], signature="(so)"
+        )
+
+    @dbus.service.method(
+        APPLICATION_INTERFACE,
+        in_signature="",
+        out_signature="s",
+        rel_path_keyword="rel_path",
+    )
+    def GetApplicationBusAddress(self, rel_path):  # pylint: disable=invalid-name
+        """Get the address for peer to peer connections, there is none."""
+        self.counter("Application.GetApplicationBusAddress")
+        self.get_index(rel_path)
+        return ""
+
+
+class SimulatedCache(dbus.service.Object):
+    """The Cache interface, with every node of the tree."""
+
+    def __init__(self, application: SimulatedApplication):
+        """Simulated cache constructor.
+
+        :param application: The application to serve the cache for.
+        """
+        super().__init__(application.connection, CACHE_PATH)
+        self.application = application
+
+    @dbus.service.method(
+        CACHE_INTERFACE, in_signature="", out_signature="a((so)(so)(so)iiassusau)"
+    )
+    def GetItems(self):  # pylint: disable=invalid-name
+        """Get all nodes."""
+        application = self.application
+        application.counter("Cache.GetItems")
+        tree = application.tree
+        root = application.get_reference(0)
+
+        return dbus.Array(
+            [
+                (
+                    application.get_reference(index),
+                    root,
+                    application.get_reference(tree.parents[index]),
+                    tree.indexes[index],
+                    len(tree.children[index]),
+                    application.get_interfaces(index),
+                    tree.get_name(index),
+                    tree.roles[index],
+                    "",
+                    get_words(tree.states[index], 2),
+                )
+                for index in range(len(tree))
+            ],
+            signature="((so)(so)(so)iiassusau)",
+        )
+
+
+class SimulatedDesktop(dbus.service.Object):
+    """The desktop the registry serves, with the application as its child."""
+
+    def __init__(
+        self,
+        connection: dbus.bus.BusConnection,
+        application: SimulatedApplication,
+    ):
+        """Simulated desktop constructor.
+
+        :param connection: The registry's accessibility bus connection.
+        :param application: The application.
+        """
+        super().__init__(connection, ROOT_PATH)
+        self.application = application
+
+    def get_properties(self) -> dict[str, Any]:
+        """Get the D-Bus properties of the desktop.
+
+        :return: Properties by name.
+        """
+        return {
+            "Name": dbus.String("main"),
+            "Description": dbus.String(""),
+            "Parent": dbus.Struct(("", dbus.ObjectPath(NULL_PATH)), signature="so"),
+            "ChildCount": dbus.Int32(1),
+        }
+
+    @dbus.service.method(PROPERTIES_INTERFACE, in_signature="ss", out_signature="v")
+    def Get(self, _interface, name):  # pylint: disable=invalid-name
+        """Get a property."""
+        self.application.counter(f"Registry.Properties.Get:{name}")
+        properties = self.get_properties()
+
+        if name not in properties:
+            raise UnknownMethodError(f"No property {name}")
+
+        return properties[name]
+
+    @dbus.service.method(PROPERTIES_INTERFACE, in_signature="s", out_signature="a{sv}")
+    def GetAll(self, _interface):  # pylint: disable=invalid-name
+        """Get all properties."""
+        self.application.counter("Registry.Properties.GetAll")
+        return self.get_properties()
+
+    @dbus.service.method(ACCESSIBLE_INTERFACE, in_signature="", out_signature="a(so)")
+    def GetChildren(self):  # pylint: disable=invalid-name
+        """Get the applications."""
+        self.application.counter("Registry.Accessible.GetChildren")
+        return [self.application.get_reference(0)]
+
+    @dbus.service.method(ACCESSIBLE_INTERFACE, in_signature="i", out_signature="(so)")
+    def GetChildAtIndex(self, child_index):  # pylint: disable=invalid-name
+        """Get an application."""
+        self.application.counter("Registry.Accessible.GetChildAtIndex")
+
+        if child_index != 0:
+            return ("", dbus.ObjectPath(NULL_PATH))
+
+        return self.application.get_reference(0)
+
+    @dbus.service.method(ACCESSIBLE_INTERFACE, in_signature="", out_signature="u")
+    def GetRole(self):  # pylint: disable=invalid-name
+        """Get the role."""
+        self.application.counter("Registry.Accessible.GetRole")
+        return Atspi.Role.DESKTOP_FRAME
+
+    @dbus.service.method(ACCESSIBLE_INTERFACE, in_signature="", out_signature="au")
+    def GetState(self):  # pylint: disable=invalid-name
+        """Get the state set."""
+        self.application.counter("Registry.Accessible.GetState")
+        return [0, 0]
+
+    @dbus.service.method(ACCESSIBLE_INTERFACE, in_signature="", out_signature="as")
+    def GetInterfaces(self):  # pylint: disable=invalid-name
+        """Get the interfaces."""
+        self.application.counter("Registry.Accessible.GetInterfaces")
+        return [ACCESSIBLE_INTERFACE, COMPONENT_INTERFACE]
+
+
+class SimulatedRegistry(dbus.service.Object):
+    """The registry's event registrations, there are no events."""
+
+    def __init__(self, connection: dbus.bus.BusConnection):
+        """Simulated registry constructor.
+
+        :param connection: The registry's accessibility bus connection.
+        """
+        super().__init__(connection, REGISTRY_PATH)
+
+    @dbus.service.method(REGISTRY_INTERFACE, in_signature="", out_signature="a(ss)")
+    def GetRegisteredEvents(self):  # pylint: disable=invalid-name
+        """Get the events listeners are registered for."""
+        return dbus.Array([], signature="(ss)")
+
+    @dbus.service.method(REGISTRY_INTERFACE, in_signature="s", out_signature="")
+    def RegisterEvent(self, _event):  # pylint: disable=invalid-name
+        """Register for an event."""
+
+    @dbus.service.method(REGISTRY_INTERFACE, in_signature="s", out_signature="")
+    def DeregisterEvent(self, _event):  # pylint: disable=invalid-name
+        """Deregister from an event."""
+
+
+class SimulatorControl(dbus.service.Object):
+    """Interface for benchmarks to read call counts."""
+
+    def __init__(self, application: SimulatedApplication):
+        """Simulator control constructor.
+
+        :param application: The application.
+        """
+        super().__init__(application.connection, SIMULATOR_PATH)
+        self.application = application
+
+    @dbus.service.method(SIMULATOR_INTERFACE, in_signature="", out_signature="a{su}")
+    def GetCallCounts(self):  # pylint: disable=invalid-name
+        """Get the number of calls by name since the last reset."""
+        return dbus.Dictionary(self.application.counter.counts, signature="su")
+
+    @dbus.service.method(SIMULATOR_INTERFACE, in_signature="", out_signature="")
+    def ResetCallCounts(self):  # pylint: disable=invalid-name
+        """Reset the call counts."""
+        self.application.counter.counts.clear()
+
+    @dbus.service.method(SIMULATOR_INTERFACE, in_signature="", out_signature="u")
+    def GetNodeCount(self):  # pylint: disable=invalid-name
+        """Get the number of nodes in the tree."""
+        return len(self.application.tree)
+
+
+def main():
+    """Simulator entry point."""
+    parser = ArgumentParser(
+        prog="atspi_simulator",
+        description="Serve a synthetic accessibility tree on an accessibility bus.",
+    )
+    parser.add_argument(
+        "--address", required=True, help="D-Bus address of the accessibility bus."
+    )
+    parser.add_argument("--shape", choices=TREE_SHAPES, default="web")
+    parser.add_argument(
+        "--nodes", type=int, default=10000, help="Number of nodes in the tree."
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--collection",
+        action=BooleanOptionalAction,
+        default=True,
+        help="Implement the Collection interface.",
+    )
+    parser.add_argument(
+        "--cache",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Implement the Cache interface.",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0, help="Seconds to delay every call by."
+    )
+    parser.add_argument("--toolkit", default="hints-simulator")
+    parser.add_argument("--toolkit-version", default="1.0")
+
+    args = parser.parse_args()
+
+    DBusGMainLoop(set_as_default=True)
+    tree = build_tree(args.shape, args.nodes, args.seed)
+    # the registry and the application both serve the root accessible path,
+    # so they need their own connections
+    registry_connection = dbus.bus.BusConnection(args.address)
+    application_connection = dbus.bus.BusConnection(args.address)
+    registry_name = dbus.service.BusName(REGISTRY_NAME, registry_connection)
+    application = SimulatedApplication(
+        application_connection,
+        tree,
+        CallCounter(args.latency),
+        collection=args.collection,
+        toolkit=(args.toolkit, args.toolkit_version),
+    )
+    # referenced until the simulator exits
+    objects = [
+        registry_name,
+        SimulatedDesktop(registry_connection, application),
+        SimulatedRegistry(registry_connection),
+        SimulatorControl(application),
+    ]
+
+    if args.cache:
+        objects.append(SimulatedCache(application))
+
+    print(
+        dumps({"bus_name": application.bus_name, "pid": getpid(), "nodes": len(tree)}),
+        flush=True,
+    )
+    GLib.MainLoop().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Benchmark hints against recorded accessible trees.
+
+Replays recordings (made with `hints --record-tree`) and synthetic trees
+offline, and times the stages hints runs on the tree:
+
+- children: finding the children (ReplayBackend.get_children).
+- labels: generating and assigning labels (get_hints).
+- render: rendering the labels (LabelSurfaceCache.render_labels).
+- layout: placing the hints (layout_hints).
+
+    python -m benchmarks.replay thunderbird.json.gz --synthetic web:50000
+
+Prints a JSON line per tree with a summary of every stage's latency (in
+seconds).
+"""
+
+from __future__ import annotations
+
+from argparse import ArgumentParser
+from json import dumps
+from time import perf_counter
+from typing import Any
+
+from benchmarks.synthetic_tree import build_tree, to_recording
+from hints.backends.recording import AccessibleTreeRecording
+from hints.backends.replay import ReplayBackend, ReplayWindowSystem
+from hints.default_config import get_default_config
+from hints.hints import get_hints
+from hints.huds.label_surfaces import LabelSurfaceCache
+from hints.huds.layout import get_visible_children, layout_hints
+from hints.mouse_stats import Histogram
+
+STAGES = ("children", "labels", "render", "layout")
+
+
+def benchmark_recording(
+    recording: AccessibleTreeRecording, repeat: int
+) -> dict[str, Any]:
+    """Time the stages hints runs on a tree.
+
+    :param recording: The tree.
+    :param repeat: Number of runs.
+    :return: Number of elements and children, and a summary of every
+        stage.
+    """
+    config = get_default_config()
+    window_system = ReplayWindowSystem(recording)
+    _, _, width, height = recording.window_extents
+    stages = {stage: Histogram() for stage in STAGES}
+    children = []
+
+    for _ in range(repeat):
+        start = perf_counter()
+        children = ReplayBackend(config, window_system, recording).get_children()
+        children_end = perf_counter()
+        hints = get_hints(
+            get_visible_children(children, width, height),
+            alphabet=config["alphabet"],
+            priority=config["hint_label_priority"],
+        )
+        labels_end = perf_counter()
+        # a new cache every run, like every hints run renders its labels
+        label_surfaces = LabelSurfaceCache(config)
+        label_surfaces.render_labels(list(hints))
+        render_end = perf_counter()
+        layout_hints(
+            hints,
+            {
+                hint: (label.width, label.height)
+                for hint, label in label_surfaces.labels.items()
+            },
+            width,
+            height,
+        )
+        layout_end = perf_counter()
+
+        stages["children"].add(children_end - start)
+        stages["labels"].add(labels_end - children_end)
+        stages["render"].add(render_end - labels_end)
+        stages["layout"].add(layout_end - render_end)
+
+    return {
+        "elements": len(recording),
+        "children": len(children),
+        "collection": recording.collection,
+        **{stage: histogram.to_dict() for stage, histogram in stages.items()},
+    }
+
+
+def main():
+    """Benchmark entry point."""
+    parser = ArgumentParser(
+        prog="replay",
+        description="Benchmark hints against recorded accessible trees.",
+    )
+    parser.add_argument(
+        "recordings", nargs="*", help="Recordings made with hints --record-tree."
+    )
+    parser.add_argument(
+        "--synthetic",
+        nargs="+",
+        default=[],
+        metavar="SHAPE:NODES",
+        help="Synthetic trees to replay, like web:50000 (see"
+        " benchmarks.synthetic_tree).",
+    )
+    parser.add_argument(
+        "--recursive",
+        action="store_true",
+        help="Replay synthetic trees like applications without the Collection"
+        " interface.",
+    )
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per tree.")
+
+    args = parser.parse_args()
+
+    for path in args.recordings:
+        print(
+            dumps(
+                {
+                    "tree": path,
+                    **benchmark_recording(
+                        AccessibleTreeRecording.load(path), args.repeat
+                    ),
+                }
+            ),
+            flush=True,
+        )
+
+    for synthetic in args.synthetic:
+        shape, nodes = synthetic.split(":")
+        recording = to_recording(
+            build_tree(shape, int(nodes)), collection=not args.recursive
+        )
+        print(
+            dumps({"tree": synthetic, **benchmark_recording(recording, args.repeat)}),
+            flush=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""Synthetic accessibility trees.
+
+Trees are generated from a shape and a seed, so the same arguments always
+give the same tree. Nodes are indexes into flat lists (a couple hundred
+thousand node objects would dominate the memory of the simulator):
+
+- 0 is the application.
+- 1 is its window (a frame with the ACTIVE state).
+- the rest are descendants of the window.
+
+Shapes:
+
+- web: deep and narrow, like the DOM of a web page. Nested sections with a
+  few children each, links, buttons and text at the leaves.
+- wide: a window full of toolbars with hundreds of buttons each.
+- balanced: every container has the same number of children.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from math import ceil, sqrt
+from random import Random
+
+from gi import require_version
+
+require_version("Atspi", "2.0")
+from gi.repository import Atspi
+
+from hints.backends.recording import AccessibleTreeRecording, get_state_mask
+from hints.window_systems.window_system_type import WindowSystemType
+
+WINDOW_SIZE = (1920, 1080)
+# states of nodes that are on screen
+SHOWING_STATES = (
+    Atspi.StateType.ENABLED,
+    Atspi.StateType.SENSITIVE,
+    Atspi.StateType.SHOWING,
+    Atspi.StateType.VISIBLE,
+)
+SHOWING_MASK = get_state_mask(SHOWING_STATES)
+SHOWING_BIT = 1 << int(Atspi.StateType.SHOWING)
+WINDOW_MASK = SHOWING_MASK | get_state_mask((Atspi.StateType.ACTIVE,))
+
+
+@dataclass(frozen=True)
+class TreeShape:
+    """Parameters for generating a tree."""
+
+    min_children: int
+    max_children: int
+    # depth of the deepest containers, the window is at depth 1
+    max_depth: int
+    # expand the newest containers first, giving deep trees
+    depth_first: bool
+    container_roles: tuple[Atspi.Role, ...]
+    leaf_roles: tuple[Atspi.Role, ...]
+    # chance of a node not showing (scrolled out of view, collapsed)
+    hidden_ratio: float = 0.0
+    attributes: dict[Atspi.Role, dict[str, str]] = field(default_factory=dict)
+
+
+TREE_SHAPES = {
+    "web": TreeShape(
+        min_children=1,
+        max_children=4,
+        max_depth=48,
+        depth_first=True,
+        container_roles=(
+            Atspi.Role.SECTION,
+            Atspi.Role.SECTION,
+            Atspi.Role.PANEL,
+            Atspi.Role.LIST,
+            Atspi.Role.LIST_ITEM,
+            Atspi.Role.PARAGRAPH,
+        ),
+        leaf_roles=(
+            Atspi.Role.LINK,
+            Atspi.Role.LINK,
+            Atspi.Role.PUSH_BUTTON,
+            Atspi.Role.STATIC,
+            Atspi.Role.IMAGE,
+            Atspi.Role.ENTRY,
+        ),
+        hidden_ratio=0.05,
+        attributes={
+            Atspi.Role.SECTION: {"tag": "div"},
+            Atspi.Role.PARAGRAPH: {"tag": "p"},
+            Atspi.Role.LINK: {"tag": "a"},
+            Atspi.Role.PUSH_BUTTON: {"tag": "button"},
+            Atspi.Role.ENTRY: {"tag": "input"},
+        },
+    ),
+    "wide": TreeShape(
+        min_children=200,
+        max_children=1000,
+        max_depth=2,
+        depth_first=False,
+        container_roles=(Atspi.Role.TOOL_BAR,),
+        leaf_roles=(
+            Atspi.Role.PUSH_BUTTON,
+            Atspi.Role.PUSH_BUTTON,
+            Atspi.Role.TOGGLE_BUTTON,
+            Atspi.Role.SEPARATOR,
+        ),
+    ),
+    "balanced": TreeShape(
+        min_children=8,
+        max_children=8,
+        max_depth=64,
+        depth_first=False,
+        container_roles=(Atspi.Role.PANEL,),
+        leaf_roles=(Atspi.Role.PUSH_BUTTON, Atspi.Role.CHECK_BOX),
+        hidden_ratio=0.1,
+    ),
+}
+
+
+@dataclass
+class SyntheticTree:
+    """Accessibility tree, nodes are indexes into the lists."""
+
+    shape: TreeShape
+    parents: list[int] = field(default_factory=list)
+    # index of the node among its siblings
+    indexes: list[int] = field(default_factory=list)
+    children: list[list[int]] = field(default_factory=list)
+    roles: list[int] = field(default_factory=list)
+    # bit masks of Atspi.StateType
+    states: list[int] = field(default_factory=list)
+    # (x, y, width, height) relative to the window
+    extents: list[tuple[int, int, int, int]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def add(
+        self,
+        parent: int,
+        role: int,
+        states: int,
+        extents: tuple[int, int, int, int],
+    ) -> int:
+        """Add a node.
+
+        :param parent: Index of the parent, -1 for the application.
+        :param role: Role of the node.
+        :param states: State mask of the node.
+        :param extents: Extents of the node.
+        :return: Index of the node.
+        """
+        index = len(self.parents)
+        self.parents.append(parent)
+        self.children.append([])
+        self.roles.append(role)
+        self.states.append(states)
+        self.extents.append(extents)
+
+        if parent >= 0:
+            self.indexes.append(len(self.children[parent]))
+            self.children[parent].append(index)
+        else:
+            self.indexes.append(0)
+
+        return index
+
+    def get_attributes(self, index: int) -> dict[str, str]:
+        """Get the attributes of a node.
+
+        :param index: Index of the node.
+        :return: The attributes.
+        """
+        return self.shape.attributes.get(self.roles[index], {})
+
+    def get_name(self, index: int) -> str:
+        """Get the name of a node.
+
+        :param index: Index of the node.
+        :return: The name.
+        """
+        return "simulator" if index == 0 else f"node {index}"
+
+    def iter_descendants(self, index: int):
+        """Iterate over the descendants of a node in canonical (pre)
+        order.
+
+        :param index: Index of the node.
+        :return: Iterator of descendant indexes.
+        """
+        stack = list(reversed(self.children[index]))
+
+        while stack:
+            descendant = stack.pop()
+            yield descendant
+            stack.extend(reversed(self.children[descendant]))
+
+
+def get_grid_extents(
+    extents: tuple[int, int, int, int], count: int
+) -> list[tuple[int, int, int, int]]:
+    """Split extents into a grid of cells with about the same aspect ratio.
+
+    :param extents: The extents to split.
+    :param count: Number of cells.
+    :return: Extents of the cells, row by row.
+    """
+    x, y, width, height = extents
+    columns = max(1, min(count, ceil(sqrt(count * max(width, 1) / max(height, 1)))))
+    rows = ceil(count / columns)
+    cell_width = max(1, width // columns)
+    cell_height = max(1, height // rows)
+
+    return [
+        (
+            x + (cell % columns) * cell_width,
+            y + (cell // columns) * cell_height,
+            cell_width,
+            cell_height,
+        )
+        for cell in range(count)
+    ]
+
+
+def build_tree(
+    shape_name: str,
+    node_count: int,
+    seed: int = 0,
+    window_size: tuple[int, int] = WINDOW_SIZE,
+) -> SyntheticTree:
+    """Generate a tree.
+
+    :param shape_name: Name of the shape (see TREE_SHAPES).
+    :param node_count: Number of nodes, including the application and its
+        window.
+    :param seed: Seed for the random choices.
+    :param window_size: Window width and height.
+    :return: The tree.
+    """
+    shape = TREE_SHAPES[shape_name]
+    random = Random(seed)
+    tree = SyntheticTree(shape)
+    application = tree.add(-1, Atspi.Role.APPLICATION, 0, (0, 0, 0, 0))
+    window = tree.add(application, Atspi.Role.FRAME, WINDOW_MASK, (0, 0, *window_size))
+    # containers to add children to, with their depth
+    frontier = deque([(window, 1)])
+
+    while frontier and len(tree) < node_count:
+        parent, depth = frontier.pop() if shape.depth_first else frontier.popleft()
+
+        if depth > shape.max_depth:
+            continue
+
+        count = min(
+            random.randint(shape.min_children, shape.max_children),
+            node_count - len(tree),
+        )
+
+        for extents in get_grid_extents(tree.extents[parent], count):
+            showing = random.random() >= shape.hidden_ratio
+            states = SHOWING_MASK if showing else SHOWING_MASK & ~SHOWING_BIT
+            # roles are assigned once it is known which nodes have children
+            child = tree.add(parent, 0, states, extents)
+            frontier.append((child, depth + 1))
+
+    for index in range(2, len(tree)):
+        tree.roles[index] = random.choice(
+            shape.container_roles if tree.children[index] else shape.leaf_roles
+        )
+
+    return tree
+
+
+def to_recording(
+    tree: SyntheticTree, collection: bool = True
+) -> AccessibleTreeRecording:
+    """Get a recording of the window of a tree, for replaying it.
+
+    :param tree: The tree.
+    :param collection: Whether to replay it like an application that
+        implements the Collection interface.
+    :return: The recording.
+    """
+    recording = AccessibleTreeRecording(
+        application_name="simulator",
+        toolkit="hints-simulator",
+        toolkit_version="1.0",
+        window_system_type=WindowSystemType.X11.value,
+        window_extents=tree.extents[1],
+        window_coordinates=False,
+        collection=collection,
+    )
+    # recordings are in canonical order, the application is not recorded
+    recorded_indexes = {0: -1}
+
+    for index in tree.iter_descendants(0):
+        recorded_indexes[index] = recording.add(
+            recorded_indexes[tree.parents[index]],
+            tree.roles[index],
+            tree.states[index],
+            tree.extents[index],
+            tree.get_attributes(index),
+        )
+
+    return recording
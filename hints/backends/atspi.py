@@ -8,15 +8,84 @@ from gi import require_version
 from hints.window_systems.window_system_type import WindowSystemType
 
 require_version("Atspi", "2.0")
-from gi.repository import Atspi
+require_version("GLib", "2.0")
+from gi.repository import Atspi, GLib
 
 from hints.backends.backend import HintsBackend
-from hints.backends.exceptions import AccessibleChildrenNotFoundError
+from hints.backends.exceptions import (
+    AccessibleChildrenNotFoundError,
+    CouldNotFindAccessibleWindow,
+)
+from hints.backends.matching import match_role, match_states
+from hints.backends.recording import AccessibleTreeRecording, get_state_mask
 from hints.child import Child
 
 logger = logging.getLogger(__name__)
 
 
+def get_relative_and_absolute_extents(
+    extents: tuple[int, int, int, int],
+    window_extents: tuple[int, int, int, int],
+    scale_factor: float,
+    window_coordinates: bool,
+) -> tuple[tuple[int, int], tuple[int, int], tuple[int, int]]:
+    """Get absolute position, relative position, and extents for accessible
+    element extents.
+
+    Some DE/WMs like gnome don't yield the correct relative postions
+    for elements for some tooklits (QT). This function computes the
+    relative postion of elements from the absolute position and top
+    level window extents. Except for toolkits that do not allow top
+    level positioning.
+
+    :param extents: Element extents (x, y, width, height) as the
+        application reports them.
+    :param window_extents: Extents of the focused window.
+    :param scale_factor: Scale factor for the extents.
+    :param window_coordinates: Whether the extents are relative to the
+        window instead of the screen.
+    :return: absolute_position, relative_position, and extents.
+    """
+    start_x, start_y, _, _ = window_extents
+    x, y, width, height = extents
+
+    if window_coordinates:
+        # Sometimes in GTK4 elements have negative relative positioning for
+        # items in corners ie: (-1,0).
+        if x == -1:
+            x = abs(x)
+
+        x *= scale_factor
+        y *= scale_factor
+
+        return (
+            (
+                x + start_x,
+                y + start_y,
+            ),
+            (x, y),
+            (
+                width * scale_factor,
+                height * scale_factor,
+            ),
+        )
+
+    x *= scale_factor
+    y *= scale_factor
+
+    return (
+        (x, y),
+        (
+            x - start_x,
+            y - start_y,
+        ),
+        (
+            width * scale_factor,
+            height * scale_factor,
+        ),
+    )
+
+
 class AtspiBackend(HintsBackend):
     """Atspi backend class."""
 
@@ -33,68 +102,39 @@ class AtspiBackend(HintsBackend):
         self.toolkit_version = ""
         self.scale_factor = 1
 
+    def uses_window_coordinates(self) -> bool:
+        """Check whether element extents are relative to the window.
+
+        GTK4 and Wayland do not support absolute positioning, so we work
+        off relative positions.
+
+        :return: Whether to get extents relative to the window instead of
+            the screen.
+        """
+        return self.window_system.window_system_type == WindowSystemType.WAYLAND or (
+            self.toolkit == "GTK"
+            and int(str(self.toolkit_version).split(".", maxsplit=1)[0]) >= 4
+        )
+
     def get_relative_and_absolute_extents(
         self, root: Atspi.Accessible
     ) -> tuple[tuple[int, int], tuple[int, int], tuple[int, int]]:
         """Get absolute position, relative position, and extents for accessible
         element.
 
-        Some DE/WMs like gnome don't yield the correct relative postions
-        for elements for some tooklits (QT). This function computes the
-        relative postion of elements from the absolute position and top
-        level window extents. Except for toolkits that do not allow top
-        level positioning.
-
         :param root: Accessible element to get extents for.
         :return: absolute_position, relative_position, and extents.
         """
-        start_x, start_y, _, _ = self.window_system.focused_window_extents
-
-        # GTK4 and Wayland do not support absolute positioning, so we work off relative positions
-        if self.window_system.window_system_type == WindowSystemType.WAYLAND or (
-            self.toolkit == "GTK"
-            and int(str(self.toolkit_version).split(".", maxsplit=1)[0]) >= 4
-        ):
-
-            relative_extents = root.get_extents(Atspi.CoordType.WINDOW)
-
-            x = relative_extents.x
-            y = relative_extents.y
-
-            # Sometimes in GTK4 elements have negative relative positioning for
-            # items in corners ie: (-1,0).
-            if x == -1:
-                x = abs(x)
-
-            x *= self.scale_factor
-            y *= self.scale_factor
-
-            return (
-                (
-                    x + start_x,
-                    y + start_y,
-                ),
-                (x, y),
-                (
-                    relative_extents.width * self.scale_factor,
-                    relative_extents.height * self.scale_factor,
-                ),
-            )
-
-        absolute_extents = root.get_extents(Atspi.CoordType.SCREEN)
-        x = absolute_extents.x * self.scale_factor
-        y = absolute_extents.y * self.scale_factor
+        window_coordinates = self.uses_window_coordinates()
+        extents = root.get_extents(
+            Atspi.CoordType.WINDOW if window_coordinates else Atspi.CoordType.SCREEN
+        )
 
-        return (
-            (x, y),
-            (
-                x - start_x,
-                y - start_y,
-            ),
-            (
-                absolute_extents.width * self.scale_factor,
-                absolute_extents.height * self.scale_factor,
-            ),
+        return get_relative_and_absolute_extents(
+            (extents.x, extents.y, extents.width, extents.height),
+            self.window_system.focused_window_extents,
+            self.scale_factor,
+            window_coordinates,
         )
 
     def validate_match_conditions(
@@ -105,50 +145,18 @@ class AtspiBackend(HintsBackend):
         """Validate matching conditions for atspi match types.
 
         :param root: Accessible element to validate.
-        :param match_against: Set to match against.
-        :param conditions: Condition to match for.
         :param match_type: The type of matching to do.
+        :return: Whether the element matches.
         """
-        result = False
         match match_type:
             case "state":
-                state_set = root.get_state_set()
-                if self.states_match_type in {
-                    Atspi.CollectionMatchType.ALL,
-                    Atspi.CollectionMatchType.EMPTY,
-                }:
-                    result = all(
-                        state_set.contains(state_to_match)
-                        for state_to_match in self.states
-                    )
-                elif self.states_match_type == Atspi.CollectionMatchType.ANY:
-                    result = any(
-                        state_set.contains(state_to_match)
-                        for state_to_match in self.states
-                    )
-                elif self.states_match_type == Atspi.CollectionMatchType.NONE:
-                    result = not any(
-                        state_set.contains(state_to_match)
-                        for state_to_match in self.states
-                    )
-
+                return match_states(
+                    root.get_state_set().contains, self.states, self.states_match_type
+                )
             case "role":
-                role = root.get_role()
-                if self.roles_match_type in {
-                    Atspi.CollectionMatchType.ALL,
-                    Atspi.CollectionMatchType.EMPTY,
-                }:
-                    # for all elements to match means the only role must be
-                    # in the set (like any)
-                    # the other way to think about this is that roles is just
-                    # one to check ie: role = {a_single_role}, but that does not
-                    # seem very useful.
-                    result = role in self.roles
-                elif self.roles_match_type == Atspi.CollectionMatchType.ANY:
-                    result = role in self.roles
-                elif self.roles_match_type == Atspi.CollectionMatchType.NONE:
-                    result = role not in self.roles
-        return result
+                return match_role(root.get_role(), self.roles, self.roles_match_type)
+
+        return False
 
     def recursively_get_children_of_interest(
         self,
@@ -309,6 +317,84 @@ class AtspiBackend(HintsBackend):
 
         return None
 
+    def record_tree(self) -> AccessibleTreeRecording:
+        """Record the accessible tree of the focused window.
+
+        The tree is walked like the recursive fallback walks it, but every
+        element is recorded, whatever the application rules are. Of the
+        element attributes, only the ones application rules (of any
+        application) match on are recorded, others can hold text.
+
+        :return: The recording (see hints.backends.recording).
+        :raises CouldNotFindAccessibleWindow: When the focused window is
+            not accessible.
+        """
+        window = self.get_atspi_active_window()
+
+        if not window:
+            raise CouldNotFindAccessibleWindow()
+
+        application = window.get_application()
+        self.toolkit = application.get_toolkit_name()
+        self.toolkit_version = application.get_toolkit_version()
+        window_coordinates = self.uses_window_coordinates()
+        coordinate_type = (
+            Atspi.CoordType.WINDOW if window_coordinates else Atspi.CoordType.SCREEN
+        )
+        recording = AccessibleTreeRecording(
+            application_name=self.window_system.focused_applicaiton_name,
+            toolkit=self.toolkit,
+            toolkit_version=str(self.toolkit_version),
+            window_system_type=self.window_system.window_system_type.value,
+            window_extents=tuple(  # type: ignore[arg-type]
+                self.window_system.focused_window_extents
+            ),
+            window_coordinates=window_coordinates,
+            collection=window.get_collection_iface() is not None,
+        )
+        application_rules = self.config["backends"][self.backend_name][
+            "application_rules"
+        ]
+        recorded_attributes = {
+            key
+            for rules in application_rules.values()
+            for key in rules.get("attributes", {})
+        }
+        # elements to record with the index of their parent, popped in
+        # canonical order
+        pending: list[tuple[Atspi.Accessible, int]] = [(window, -1)]
+
+        while pending:
+            accessible, parent = pending.pop()
+
+            try:
+                extents = accessible.get_extents(coordinate_type)
+                index = recording.add(
+                    parent,
+                    accessible.get_role(),
+                    get_state_mask(accessible.get_state_set().get_states()),
+                    (extents.x, extents.y, extents.width, extents.height),
+                    {
+                        key: value
+                        for key, value in (accessible.get_attributes() or {}).items()
+                        if key in recorded_attributes
+                    },
+                )
+                children = [
+                    accessible.get_child_at_index(child_index)
+                    for child_index in range(accessible.get_child_count())
+                ]
+            except GLib.Error:
+                # the element went away while recording
+                logger.debug("Skipping an element that could not be read.")
+                continue
+
+            pending.extend(
+                (child, index) for child in reversed(children) if child is not None
+            )
+
+        return recording
+
     def get_children(
         self,
     ) -> list[Child]:
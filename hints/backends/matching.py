@@ -0,0 +1,66 @@
+"""Matching of accessible elements against application rules.
+
+Applications that don't implement the Collection interface are searched
+recursively, matching every element against the rules here. The Atspi
+backend matches live elements and the replay backend recorded ones, so
+both find the same children for the same tree.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+from gi import require_version
+
+require_version("Atspi", "2.0")
+from gi.repository import Atspi
+
+
+def match_states(
+    has_state: Callable[[int], bool],
+    states: Iterable[int],
+    match_type: int,
+) -> bool:
+    """Match the states of an element.
+
+    :param has_state: Whether the element has a state.
+    :param states: The states to match (like Atspi.StateType values).
+    :param match_type: How to match (Atspi.CollectionMatchType).
+    :return: Whether the states match.
+    """
+    if match_type in {
+        Atspi.CollectionMatchType.ALL,
+        Atspi.CollectionMatchType.EMPTY,
+    }:
+        return all(has_state(state) for state in states)
+    if match_type == Atspi.CollectionMatchType.ANY:
+        return any(has_state(state) for state in states)
+    if match_type == Atspi.CollectionMatchType.NONE:
+        return not any(has_state(state) for state in states)
+
+    return False
+
+
+def match_role(role: int, roles: set[int], match_type: int) -> bool:
+    """Match the role of an element.
+
+    An element has a single role, so matching "all" roles means the role
+    is one of them (like "any"). The other way to think about this is that
+    roles would be a single role to check, but that does not seem very
+    useful.
+
+    :param role: The role of the element (an Atspi.Role value).
+    :param roles: The roles to match.
+    :param match_type: How to match (Atspi.CollectionMatchType).
+    :return: Whether the role matches.
+    """
+    if match_type in {
+        Atspi.CollectionMatchType.ALL,
+        Atspi.CollectionMatchType.EMPTY,
+        Atspi.CollectionMatchType.ANY,
+    }:
+        return role in roles
+    if match_type == Atspi.CollectionMatchType.NONE:
+        return role not in roles
+
+    return False
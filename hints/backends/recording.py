@@ -0,0 +1,244 @@
+"""Recordings of accessibility trees.
+
+A recording holds the accessible tree of a window: the structure, and the
+role, states and extents of every element, with the attributes that
+application rules match on (see AtspiBackend.record_tree). Names, text
+and other attributes (which can hold text, like placeholders or URLs) are
+not recorded, so recordings can be attached to bug reports. Replaying a
+recording (see hints.backends.replay) gives the same children the Atspi
+backend found, without the application or a desktop.
+
+Recordings are gzipped JSON, with a list per element property (elements
+in canonical order, the window first) and attributes deduplicated:
+
+    {
+        "version": 1,
+        "application_name": "thunderbird",
+        ...
+        "attribute_sets": [{}, {"tag": "div"}],
+        "elements": {
+            "parents": [-1, 0, 1],
+            "roles": [23, 39, 43],
+            "states": [1125899906842624, ...],
+            "extents": [[0, 0, 1920, 1080], ...],
+            "attributes": [0, 1, 0]
+        }
+    }
+"""
+
+from __future__ import annotations
+
+import gzip
+from dataclasses import dataclass, field
+from json import dump, load
+from typing import Any, Iterable
+
+RECORDING_VERSION = 1
+
+
+class InvalidRecordingError(Exception):
+    """Exception to raise when a recording can't be read."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Invalid accessibility tree recording: {self.reason}"
+
+
+def get_state_mask(states: Iterable[int]) -> int:
+    """Get the bit mask of states (like Atspi.StateType values).
+
+    :param states: The states.
+    :return: Bit mask with a bit set for every state.
+    """
+    mask = 0
+
+    for state in states:
+        mask |= 1 << int(state)
+
+    return mask
+
+
+@dataclass
+class AccessibleTreeRecording:
+    """Accessible tree of a window, elements are indexes into the lists."""
+
+    # name used for per application rules
+    application_name: str
+    toolkit: str
+    toolkit_version: str
+    # a WindowSystemType value
+    window_system_type: str
+    window_extents: tuple[int, int, int, int]
+    # whether extents are relative to the window instead of the screen
+    window_coordinates: bool
+    # whether the application implements the Collection interface
+    collection: bool
+    parents: list[int] = field(default_factory=list)
+    roles: list[int] = field(default_factory=list)
+    # bit masks of Atspi.StateType
+    states: list[int] = field(default_factory=list)
+    # (x, y, width, height) as the application reported them
+    extents: list[tuple[int, int, int, int]] = field(default_factory=list)
+    # only the attributes application rules match on
+    attributes: list[dict[str, str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def add(
+        self,
+        parent: int,
+        role: int,
+        states: int,
+        extents: tuple[int, int, int, int],
+        attributes: dict[str, str],
+    ) -> int:
+        """Add an element, after its parent and preceding siblings.
+
+        :param parent: Index of the parent, -1 for the window.
+        :param role: Role of the element.
+        :param states: State mask of the element.
+        :param extents: Extents of the element.
+        :param attributes: Attributes of the element.
+        :return: Index of the element.
+        """
+        self.parents.append(parent)
+        self.roles.append(int(role))
+        self.states.append(states)
+        self.extents.append(extents)
+        self.attributes.append(attributes)
+
+        return len(self.parents) - 1
+
+    def get_children(self) -> list[list[int]]:
+        """Get the children of every element.
+
+        :return: Indexes of the children, by element index.
+        """
+        children: list[list[int]] = [[] for _ in self.parents]
+
+        for index, parent in enumerate(self.parents):
+            if parent >= 0:
+                children[parent].append(index)
+
+        return children
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the recording as it is stored.
+
+        :return: JSON serializable recording.
+        """
+        attribute_sets: dict[tuple[tuple[str, str], ...], int] = {}
+        attribute_indexes = [
+            attribute_sets.setdefault(
+                tuple(sorted(attributes.items())), len(attribute_sets)
+            )
+            for attributes in self.attributes
+        ]
+
+        return {
+            "version": RECORDING_VERSION,
+            "application_name": self.application_name,
+            "toolkit": self.toolkit,
+            "toolkit_version": self.toolkit_version,
+            "window_system_type": self.window_system_type,
+            "window_extents": list(self.window_extents),
+            "window_coordinates": self.window_coordinates,
+            "collection": self.collection,
+            "attribute_sets": [dict(attributes) for attributes in attribute_sets],
+            "elements": {
+                "parents": self.parents,
+                "roles": self.roles,
+                "states": self.states,
+                "extents": [list(extents) for extents in self.extents],
+                "attributes": attribute_indexes,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> AccessibleTreeRecording:
+        """Read a recording from how it is stored.
+
+        :param data: The stored recording.
+        :return: The recording.
+        :raises InvalidRecordingError: When the recording is malformed or
+            from an unsupported version.
+        """
+        try:
+            if data["version"] != RECORDING_VERSION:
+                raise InvalidRecordingError(
+                    f"version {data['version']} is not supported"
+                )
+
+            elements = data["elements"]
+            attribute_sets = [
+                {str(key): str(value) for key, value in attributes.items()}
+                for attributes in data["attribute_sets"]
+            ]
+            recording = cls(
+                application_name=str(data["application_name"]),
+                toolkit=str(data["toolkit"]),
+                toolkit_version=str(data["toolkit_version"]),
+                window_system_type=str(data["window_system_type"]),
+                window_extents=tuple(data["window_extents"]),  # type: ignore[arg-type]
+                window_coordinates=bool(data["window_coordinates"]),
+                collection=bool(data["collection"]),
+                parents=[int(parent) for parent in elements["parents"]],
+                roles=[int(role) for role in elements["roles"]],
+                states=[int(states) for states in elements["states"]],
+                extents=[
+                    (int(x), int(y), int(width), int(height))
+                    for x, y, width, height in elements["extents"]
+                ],
+                attributes=[attribute_sets[index] for index in elements["attributes"]],
+            )
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError) as error:
+            raise InvalidRecordingError(f"malformed recording ({error!r})") from error
+
+        if not (
+            len(recording.roles)
+            == len(recording.states)
+            == len(recording.extents)
+            == len(recording.attributes)
+            == len(recording)
+        ):
+            raise InvalidRecordingError("element lists have different lengths")
+
+        # elements come after their parents, so the tree has no cycles
+        if recording.parents[:1] not in ([], [-1]) or any(
+            not 0 <= parent < index
+            for index, parent in enumerate(recording.parents[1:], 1)
+        ):
+            raise InvalidRecordingError("elements are not in canonical order")
+
+        return recording
+
+    def save(self, path: str):
+        """Write the recording to a file.
+
+        :param path: Path of the file.
+        """
+        with gzip.open(path, "wt", encoding="utf-8") as _f:
+            dump(self.to_dict(), _f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> AccessibleTreeRecording:
+        """Read a recording from a file.
+
+        :param path: Path of the file.
+        :return: The recording.
+        :raises InvalidRecordingError: When the file is not a recording.
+        """
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as _f:
+                data = load(_f)
+        except (gzip.BadGzipFile, EOFError, UnicodeDecodeError, ValueError) as error:
+            raise InvalidRecordingError(str(error)) from error
+
+        if not isinstance(data, dict):
+            raise InvalidRecordingError("the file does not hold an object")
+
+        return cls.from_dict(data)
@@ -0,0 +1,310 @@
+"""Replay backend to get elements from a recorded accessible tree.
+
+Stands in for the Atspi backend with a recording (see
+hints.backends.recording), so traversal, label generation and layout can
+be measured offline against real application trees. Replays are
+deterministic: the same recording and config always give the same
+children.
+
+Applications that implement the Collection interface are replayed the way
+applications match collection rules (like at-spi2-atk does), the others
+the way the Atspi backend's recursive fallback walks the tree.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+from gi import require_version
+
+require_version("Atspi", "2.0")
+from gi.repository import Atspi
+
+from hints.backends.atspi import get_relative_and_absolute_extents
+from hints.backends.backend import HintsBackend
+from hints.backends.exceptions import AccessibleChildrenNotFoundError
+from hints.backends.matching import match_role, match_states
+from hints.backends.recording import get_state_mask
+from hints.child import Child
+from hints.window_systems.window_system import WindowSystem
+from hints.window_systems.window_system_type import WindowSystemType
+
+if TYPE_CHECKING:
+    from hints.backends.recording import AccessibleTreeRecording
+    from hints.utils import HintsConfig
+
+
+@dataclass
+class CollectionMatchRule:
+    """Collection match rule, matched the way applications match them."""
+
+    # bit masks of Atspi.StateType and Atspi.Role
+    states: int
+    states_match_type: int
+    attributes: dict[str, str]
+    attributes_match_type: int
+    roles: int
+    roles_match_type: int
+    invert: bool = False
+
+    def match_states(self, states: int) -> bool:
+        """Match the states of an element.
+
+        :param states: The state mask of the element.
+        :return: Whether the states match.
+        """
+        match self.states_match_type:
+            case Atspi.CollectionMatchType.ANY:
+                return not self.states or bool(states & self.states)
+            case Atspi.CollectionMatchType.NONE:
+                return not states & self.states
+            case _:
+                return states & self.states == self.states
+
+    def match_roles(self, role: int) -> bool:
+        """Match the role of an element.
+
+        :param role: The role of the element.
+        :return: Whether the role matches.
+        """
+        has_role = bool(self.roles >> role & 1)
+
+        match self.roles_match_type:
+            case Atspi.CollectionMatchType.ANY:
+                return not self.roles or has_role
+            case Atspi.CollectionMatchType.NONE:
+                return not has_role
+            case _:
+                # an element has one role, so "all" roles can only be one role
+                return not self.roles or self.roles == 1 << role
+
+    def match_attributes(self, attributes: dict[str, str]) -> bool:
+        """Match the attributes of an element.
+
+        :param attributes: The attributes of the element.
+        :return: Whether the attributes match.
+        """
+        matching = sum(
+            attributes.get(key) == value for key, value in self.attributes.items()
+        )
+
+        match self.attributes_match_type:
+            case Atspi.CollectionMatchType.ANY:
+                return not self.attributes or matching > 0
+            case Atspi.CollectionMatchType.NONE:
+                return not matching
+            case _:
+                return matching == len(self.attributes)
+
+    def match(self, states: int, role: int, attributes: dict[str, str]) -> bool:
+        """Match an element.
+
+        :param states: The state mask of the element.
+        :param role: The role of the element.
+        :param attributes: The attributes of the element.
+        :return: Whether the element matches.
+        """
+        matches = (
+            self.match_states(states)
+            and self.match_roles(role)
+            and self.match_attributes(attributes)
+        )
+
+        return matches != self.invert
+
+
+class ReplayWindowSystem(WindowSystem):
+    """Window system with the recorded window focused."""
+
+    def __init__(self, recording: AccessibleTreeRecording):
+        """Replay window system constructor.
+
+        :param recording: The recording.
+        """
+        self.recording = recording
+
+    @property
+    def window_system_type(self) -> WindowSystemType:
+        return WindowSystemType(self.recording.window_system_type)
+
+    @property
+    def window_system_name(self) -> str:
+        return "replay"
+
+    @property
+    def focused_window_extents(self) -> tuple[int, int, int, int]:
+        return self.recording.window_extents
+
+    @property
+    def focused_window_pid(self) -> int:
+        return 0
+
+    @property
+    def focused_applicaiton_name(self) -> str:
+        return self.recording.application_name
+
+
+class ReplayBackend(HintsBackend):
+    """Replay backend class."""
+
+    def __init__(
+        self,
+        config: HintsConfig,
+        window_system: WindowSystem,
+        recording: AccessibleTreeRecording,
+    ):
+        """Replay backend constructor.
+
+        :param config: Hints config.
+        :param window_system: Window system, usually a ReplayWindowSystem
+            for the recording.
+        :param recording: The recording to replay.
+        """
+        super().__init__(config, window_system)
+        # replays use the rules of the backend that was recorded
+        self.backend_name = "atspi"
+        self.recording = recording
+        self.element_children = recording.get_children()
+        # states to match, and the same states as a bit mask (for
+        # collection rules)
+        self.state_list: list[int] = []
+        self.states = 0
+        self.states_match_type = 0
+        self.attributes: dict[str, str] = {}
+        self.attributes_match_type = 0
+        self.roles: set[int] = set()
+        self.roles_match_type = 0
+        self.scale_factor = 1
+
+    def get_child(self, index: int) -> Child | None:
+        """Get the child for an element.
+
+        :param index: Index of the element.
+        :return: The child, None for elements that are not visible.
+        """
+        absolute_position, relative_position, size = get_relative_and_absolute_extents(
+            self.recording.extents[index],
+            self.recording.window_extents,
+            self.scale_factor,
+            self.recording.window_coordinates,
+        )
+
+        if relative_position[0] < 0 or relative_position[1] < 0:
+            return None
+
+        return Child(
+            relative_position=relative_position,
+            absolute_position=absolute_position,
+            width=size[0],
+            height=size[1],
+        )
+
+    def validate_match_conditions(
+        self, index: int, match_type: Literal["state", "role"]
+    ) -> bool:
+        """Validate matching conditions the way the Atspi backend's
+        recursive fallback does.
+
+        :param index: Index of the element.
+        :param match_type: The type of matching to do.
+        :return: Whether the element matches.
+        """
+        match match_type:
+            case "state":
+                states = self.recording.states[index]
+                return match_states(
+                    lambda state: bool(states >> state & 1),
+                    self.state_list,
+                    self.states_match_type,
+                )
+            case "role":
+                return match_role(
+                    self.recording.roles[index], self.roles, self.roles_match_type
+                )
+
+        return False
+
+    def get_matches(self, children: list[Child]):
+        """Get the children matching the application rules, the way
+        applications implementing the Collection interface match them.
+
+        :param children: List to add found children to.
+        """
+        match_rule = CollectionMatchRule(
+            states=self.states,
+            states_match_type=self.states_match_type,
+            attributes=self.attributes,
+            attributes_match_type=self.attributes_match_type,
+            roles=sum(1 << role for role in self.roles),
+            roles_match_type=self.roles_match_type,
+        )
+        recording = self.recording
+
+        # elements are recorded in canonical order, the window first
+        for index in range(1, len(recording)):
+            if not match_rule.match(
+                recording.states[index],
+                recording.roles[index],
+                recording.attributes[index],
+            ):
+                continue
+
+            child = self.get_child(index)
+
+            if child:
+                children.append(child)
+
+    def get_recursive_matches(self, children: list[Child]):
+        """Get the children matching the application rules, the way the
+        Atspi backend's recursive fallback finds them.
+
+        :param children: List to add found children to.
+        """
+        pending = [0]
+
+        while pending:
+            index = pending.pop()
+            child = self.get_child(index)
+
+            # elements that are not visible are skipped with their subtree
+            if not child:
+                continue
+
+            if self.validate_match_conditions(
+                index, "state"
+            ) and self.validate_match_conditions(index, "role"):
+                children.append(child)
+
+            pending.extend(reversed(self.element_children[index]))
+
+    def get_children(self) -> list[Child]:
+        """Get the children of the recorded tree.
+
+        :return: The children matching the application rules.
+        :raises AccessibleChildrenNotFoundError: When no children match.
+        """
+        children: list[Child] = []
+
+        if not self.recording.parents:
+            raise AccessibleChildrenNotFoundError(self.recording.application_name)
+
+        application_rules: dict[str, Any] = self.get_application_rules()
+        self.state_list = [int(state) for state in application_rules["states"]]
+        self.states = get_state_mask(self.state_list)
+        self.states_match_type = application_rules["states_match_type"]
+        self.attributes = application_rules["attributes"]
+        self.attributes_match_type = application_rules["attributes_match_type"]
+        self.roles = {int(role) for role in application_rules["roles"]}
+        self.roles_match_type = application_rules["roles_match_type"]
+        self.scale_factor = application_rules["scale_factor"]
+
+        if self.recording.collection:
+            self.get_matches(children)
+        else:
+            self.get_recursive_matches(children)
+
+        if not children:
+            raise AccessibleChildrenNotFoundError(self.recording.application_name)
+
+        return children
@@ -0,0 +1,101 @@
+"""Live config reloading.
+
+Long running processes (like hintsd) watch the config file and pick up
+changes without restarting. The config directory is watched instead of
+the file itself, since editors often save by replacing the file.
+"""
+
+from __future__ import annotations
+
+import logging
+from os import path
+from typing import Callable
+
+from gi import require_version
+
+from hints.constants import CONFIG_PATH
+from hints.utils import HintsConfig, InvalidConfigError, load_config
+
+require_version("Gio", "2.0")
+from gi.repository import Gio
+
+logger = logging.getLogger(__name__)
+
+RELOAD_EVENTS = {
+    Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+    Gio.FileMonitorEvent.CREATED,
+    Gio.FileMonitorEvent.DELETED,
+    Gio.FileMonitorEvent.MOVED_IN,
+    Gio.FileMonitorEvent.MOVED_OUT,
+    Gio.FileMonitorEvent.RENAMED,
+}
+
+
+class ConfigWatcher:
+    """Reload a config when the config file changes.
+
+    The config is updated in place, so everything holding it sees the
+    new values. Updates happen from the GLib main loop, between events,
+    so nothing sees a partially updated config. When the new config
+    can't be loaded, the last good config is kept.
+    """
+
+    def __init__(
+        self,
+        config: HintsConfig,
+        on_change: Callable[[HintsConfig], None] | None = None,
+    ):
+        """Config watcher constructor.
+
+        :param config: The loaded config, to update on changes.
+        :param on_change: Called with the config after it is updated.
+        """
+        self.config = config
+        self.on_change = on_change
+        self.config_file_name = path.basename(CONFIG_PATH)
+
+        self.monitor = Gio.File.new_for_path(
+            path.dirname(CONFIG_PATH)
+        ).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        self.monitor.connect("changed", self.on_changed)
+
+    def on_changed(
+        self,
+        _monitor: Gio.FileMonitor,
+        file: Gio.File,
+        other_file: Gio.File | None,
+        event_type: Gio.FileMonitorEvent,
+    ):
+        """Directory change event handler.
+
+        :param file: The file that changed.
+        :param other_file: The new file, for moves within the directory.
+        :param event_type: What changed.
+        """
+        if event_type not in RELOAD_EVENTS:
+            return
+
+        names = {file.get_basename()}
+        if other_file:
+            names.add(other_file.get_basename())
+
+        if self.config_file_name in names:
+            self.reload()
+
+    def reload(self):
+        """Load the config file and swap it in."""
+        try:
+            config = load_config()
+        except (InvalidConfigError, OSError) as error:
+            logger.warning("Keeping the current config. %s", error)
+            return
+
+        if config == self.config:
+            return
+
+        self.config.clear()
+        self.config.update(config)
+        logger.info("Reloaded the config.")
+
+        if self.on_change:
+            self.on_change(self.config)
@@ -0,0 +1,506 @@
+"""Focused window tracking for hintsd.
+
+Window systems used to query the compositor for the focused window every
+time hints starts. hintsd instead subscribes to focus events and keeps
+the focused window in memory, so hints only asks hintsd for a snapshot
+(see get_focused_window_snapshot in hints.mouse):
+
+- X11: PropertyNotify on _NET_ACTIVE_WINDOW (and structure changes of the
+  active window).
+- sway: window (focus, move and close changes), workspace, output and
+  binding events. Bindings run the commands that change the layout
+  (like resize, gaps or split) without sending window events.
+- Hyprland: .socket2.sock events.
+- KWin: a KWin script reporting over D-Bus, loaded while tracking.
+
+Snapshots hold the focused window in the form each window system keeps it
+in. Window systems query the compositor themselves when there is no
+snapshot (hintsd is not running, or can't track the focus).
+"""
+
+from __future__ import annotations
+
+import logging
+import socket
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import Any, Callable
+
+from gi import require_version
+
+require_version("GLib", "2.0")
+from gi.repository import GLib
+
+logger = logging.getLogger(__name__)
+
+FocusUpdate = Callable[[Any], None]
+
+# sway events have the high bit of the message type set
+SWAY_WINDOW_EVENT = 0x80000003
+# window event changes that can change the focused window or its geometry,
+# others (like "title" or "mark") are ignored
+SWAY_FOCUS_WINDOW_CHANGES = {
+    "focus",
+    "move",
+    "floating",
+    "fullscreen_mode",
+    "close",
+    "new",
+}
+# Hyprland events that can change the active window or its geometry
+HYPRLAND_ACTIVE_WINDOW_EVENTS = {
+    "activewindow",
+    "activewindowv2",
+    "openwindow",
+    "closewindow",
+    "movewindow",
+    "movewindowv2",
+    "changefloatingmode",
+    "fullscreen",
+    "workspace",
+    "workspacev2",
+    "activespecial",
+    "activespecialv2",
+    "focusedmon",
+    "focusedmonv2",
+    "monitoradded",
+    "monitoraddedv2",
+    "monitorremoved",
+    "monitorremovedv2",
+    "togglegroup",
+    "moveintogroup",
+    "moveoutofgroup",
+    "pin",
+    "configreloaded",
+}
+
+
+class FocusSource(ABC):
+    """Source of focused window updates for a window system."""
+
+    def __init__(self, on_update: FocusUpdate):
+        """Focus source constructor.
+
+        :param on_update: Called with the focused window whenever it
+            changes, or None when it is not known.
+        """
+        self.on_update = on_update
+        self.refresh_idle = 0
+        self.watch = 0
+
+    @abstractmethod
+    def start(self):
+        """Subscribe to focus events and get the focused window."""
+
+    def stop(self):
+        """Unsubscribe from focus events."""
+        for source_id in (self.refresh_idle, self.watch):
+            if source_id:
+                GLib.source_remove(source_id)
+
+        self.refresh_idle = 0
+        self.watch = 0
+
+    @abstractmethod
+    def get_focused_window(self) -> Any:
+        """Query the focused window.
+
+        :return: The focused window.
+        """
+
+    def schedule_refresh(self):
+        """Query the focused window once pending events are handled.
+
+        Events come in bursts (like a window closing and another one
+        getting focus), so this queries once per burst.
+        """
+        if not self.refresh_idle:
+            self.refresh_idle = GLib.idle_add(self.refresh)
+
+    def refresh(self):
+        """Query the focused window and report it."""
+        self.refresh_idle = 0
+
+        try:
+            focused_window = self.get_focused_window()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Could not get the focused window.")
+            focused_window = None
+
+        self.on_update(focused_window or None)
+
+        return GLib.SOURCE_REMOVE
+
+
+class X11FocusSource(FocusSource):
+    """Focused window updates from X11 property and structure events."""
+
+    def __init__(self, on_update: FocusUpdate):
+        super().__init__(on_update)
+        self.probe = None
+        self.active_window = 0
+
+    def start(self):
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.x11_probe import PROPERTY_CHANGE_MASK, X11Probe
+
+        self.probe = X11Probe()
+        self.probe.select_input(self.probe.root, PROPERTY_CHANGE_MASK)
+        self.watch = GLib.io_add_watch(
+            self.probe.fileno(), GLib.PRIORITY_DEFAULT, GLib.IO_IN, self.on_events
+        )
+        self.refresh()
+
+    def stop(self):
+        super().stop()
+
+        if self.probe:
+            self.probe.close()
+            self.probe = None
+
+    def get_focused_window(self) -> Any:
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.x11_probe import (
+            NO_EVENT_MASK,
+            STRUCTURE_NOTIFY_MASK,
+        )
+
+        active_window = self.probe.get_active_window()  # type: ignore[union-attr]
+
+        # follow moves and resizes of the active window only
+        if active_window.window != self.active_window:
+            # the previous active window is often destroyed already, which
+            # select_input handles without affecting later requests
+            if self.active_window:
+                self.probe.select_input(  # type: ignore[union-attr]
+                    self.active_window, NO_EVENT_MASK
+                )
+
+            selected = self.probe.select_input(  # type: ignore[union-attr]
+                active_window.window, STRUCTURE_NOTIFY_MASK
+            )
+            # the next refresh tries again when the window is already gone
+            self.active_window = active_window.window if selected else 0
+
+        return asdict(active_window)
+
+    def refresh(self):
+        super().refresh()
+
+        # events read while querying are not signaled on the connection
+        if self.probe and self.probe.drain_events():
+            self.schedule_refresh()
+
+        return GLib.SOURCE_REMOVE
+
+    def on_events(self, *_):
+        """Refresh when X11 events arrive."""
+        if self.probe.drain_events():  # type: ignore[union-attr]
+            self.schedule_refresh()
+
+        return GLib.SOURCE_CONTINUE
+
+
+class SwayFocusSource(FocusSource):
+    """Focused window updates from sway IPC events."""
+
+    def __init__(self, on_update: FocusUpdate):
+        super().__init__(on_update)
+        self.events = None
+        self.queries = None
+
+    def start(self):
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.sway_ipc import SwayIpcClient, SwayIpcMessageType
+
+        self.queries = SwayIpcClient()
+        self.events = SwayIpcClient()
+        self.events.send(
+            SwayIpcMessageType.SUBSCRIBE,
+            ["window", "workspace", "output", "binding"],
+        )
+        _, reply = self.events.receive()
+
+        if not reply.get("success"):
+            raise RuntimeError("sway refused the event subscription")
+
+        self.watch = GLib.io_add_watch(
+            self.events.connection.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_ERR | GLib.IO_HUP,
+            self.on_events,
+        )
+        self.refresh()
+
+    def stop(self):
+        super().stop()
+
+        for client in (self.events, self.queries):
+            if client:
+                client.close()
+
+        self.events = None
+        self.queries = None
+
+    def get_focused_window(self) -> Any:
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.sway import get_sway_focus
+
+        focused_window, bar_height = get_sway_focus(
+            self.queries  # type: ignore[arg-type]
+        )
+
+        if not focused_window:
+            return None
+
+        return {
+            "window": {
+                key: focused_window.get(key) for key in ("rect", "pid", "app_id")
+            },
+            "bar_height": bar_height,
+        }
+
+    def on_events(self, *_):
+        """Refresh when sway sends an event that affects the focused window.
+
+        Workspace, output and binding events always refresh, window
+        events only for changes in SWAY_FOCUS_WINDOW_CHANGES.
+        """
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.sway_ipc import SwayIpcError
+
+        try:
+            # sway writes whole events, this only blocks until the rest of
+            # an event that is being written arrives
+            event_type, event = self.events.receive()  # type: ignore[union-attr]
+        except SwayIpcError:
+            logger.warning("Lost the connection to sway, not tracking focus.")
+            self.watch = 0
+            self.stop()
+            self.on_update(None)
+            return GLib.SOURCE_REMOVE
+
+        if (
+            event_type != SWAY_WINDOW_EVENT
+            or event.get("change") in SWAY_FOCUS_WINDOW_CHANGES
+        ):
+            self.schedule_refresh()
+
+        return GLib.SOURCE_CONTINUE
+
+
+class HyprlandEventReader:
+    """Incremental reader for Hyprland events.
+
+    Events are lines of "EVENT>>DATA", data can be fed in chunks of any
+    size.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[tuple[str, str]]:
+        """Feed data read from the event socket.
+
+        :param data: Received data.
+        :return: Complete events (name, data).
+        """
+        self.buffer += data
+        *lines, rest = self.buffer.split(b"\n")
+        self.buffer = bytearray(rest)
+        events = []
+
+        for line in lines:
+            name, _, event_data = line.decode("utf-8", "replace").partition(">>")
+            events.append((name, event_data))
+
+        return events
+
+
+class HyprlandFocusSource(FocusSource):
+    """Focused window updates from Hyprland events."""
+
+    def __init__(self, on_update: FocusUpdate):
+        super().__init__(on_update)
+        self.events: socket.socket | None = None
+        self.reader = None
+
+    def start(self):
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.hyprland_ipc import (
+            EVENT_SOCKET,
+            connect_hyprland_socket,
+        )
+
+        self.events = connect_hyprland_socket(EVENT_SOCKET)
+        self.events.setblocking(False)
+        self.reader = HyprlandEventReader()
+        self.watch = GLib.io_add_watch(
+            self.events.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN | GLib.IO_ERR | GLib.IO_HUP,
+            self.on_events,
+        )
+        self.refresh()
+
+    def stop(self):
+        super().stop()
+
+        if self.events:
+            self.events.close()
+            self.events = None
+
+    def get_focused_window(self) -> Any:
+        # pylint: disable=import-outside-toplevel
+        from hints.window_systems.hyprland_ipc import get_active_window
+
+        return get_active_window()
+
+    def on_events(self, *_):
+        """Refresh when Hyprland sends events that affect the active window."""
+        try:
+            data = self.events.recv(65536)  # type: ignore[union-attr]
+        except BlockingIOError:
+            return GLib.SOURCE_CONTINUE
+        except OSError:
+            data = b""
+
+        if not data:
+            logger.warning("Lost the connection to Hyprland, not tracking focus.")
+            self.watch = 0
+            self.stop()
+            self.on_update(None)
+            return GLib.SOURCE_REMOVE
+
+        events = self.reader.feed(data)  # type: ignore[union-attr]
+
+        if any(name in HYPRLAND_ACTIVE_WINDOW_EVENTS for name, _ in events):
+            self.schedule_refresh()
+
+        return GLib.SOURCE_CONTINUE
+
+
+class KWinFocusSource(FocusSource):
+    """Focused window updates from the KWin script, loaded while
+    tracking.
+    """
+
+    def __init__(self, on_update: FocusUpdate):
+        super().__init__(on_update)
+        self.receiver = None
+
+    def start(self):
+        # pylint: disable=import-outside-toplevel
+        import dbus
+        from dbus.mainloop.glib import DBusGMainLoop
+
+        from hints.window_systems.kwin_reporter import (
+            ActiveWindowReceiver,
+            load_kwin_script,
+            request_report,
+        )
+
+        DBusGMainLoop(set_as_default=True)
+        bus = dbus.SessionBus()
+        # the script reports to the receiver from now on
+        self.receiver = ActiveWindowReceiver(bus, self.on_update)
+
+        if not load_kwin_script(bus):
+            request_report(bus)
+
+    def get_focused_window(self) -> Any:
+        # the script pushes reports, this is the last one
+        return self.receiver.active_window if self.receiver else None
+
+    def stop(self):
+        super().stop()
+
+        if self.receiver:
+            # pylint: disable=import-outside-toplevel
+            import dbus
+
+            from hints.window_systems.kwin_reporter import (
+                HINTS_DBUS_SERVICE,
+                unload_kwin_script,
+            )
+
+            bus = self.receiver.bus_name.get_bus()
+
+            try:
+                unload_kwin_script(bus)
+            except dbus.DBusException:
+                logger.warning("Could not unload the KWin script.", exc_info=True)
+
+            self.receiver.remove_from_connection()
+            bus.release_name(HINTS_DBUS_SERVICE)
+            self.receiver = None
+
+
+class FocusTracker:
+    """Keep the focused window of a window system in memory."""
+
+    def __init__(self, window_system_id: str):
+        """Focus tracker constructor.
+
+        :param window_system_id: The window system to track the focus
+            for (see SupportedWindowSystems).
+        """
+        self.window_system_id = window_system_id
+        self.focused_window: Any = None
+        self.source: FocusSource | None = None
+
+    def start(self):
+        """Start tracking the focus, if the window system is supported."""
+        sources: dict[str, type[FocusSource]] = {
+            "x11": X11FocusSource,
+            "sway": SwayFocusSource,
+            "hyprland": HyprlandFocusSource,
+            "plasmashell": KWinFocusSource,
+        }
+        source_class = sources.get(self.window_system_id)
+
+        if not source_class:
+            return
+
+        self.source = source_class(self.on_update)
+
+        try:
+            self.source.start()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.warning(
+                "Could not track the focus for '%s', window systems will query"
+                " it themselves.",
+                self.window_system_id,
+                exc_info=True,
+            )
+            self.stop()
+
+    def stop(self):
+        """Stop tracking the focus."""
+        if self.source:
+            self.source.stop()
+
+        self.source = None
+        self.focused_window = None
+
+    def on_update(self, focused_window: Any):
+        """Focused window update handler.
+
+        :param focused_window: The focused window, None when it is not
+            known.
+        """
+        self.focused_window = focused_window
+
+    def get_snapshot(self) -> dict[str, Any] | None:
+        """Get the focused window.
+
+        :return: The window system and its focused window, None when the
+            focused window is not known.
+        """
+        if self.focused_window is None:
+            return None
+
+        return {
+            "window_system": self.window_system_id,
+            "focused_window": self.focused_window,
+        }
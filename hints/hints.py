@@ -2,9 +2,6 @@ from __future__ import annotations
 
 import logging
 from argparse import ArgumentParser
-from itertools import product
-from math import ceil, log
-from subprocess import run
 from time import time
 from typing import TYPE_CHECKING, Any, Iterable, Type, get_args
 
@@ -14,8 +11,10 @@ from hints.backends.atspi import AtspiBackend
 from hints.backends.exceptions import AccessibleChildrenNotFoundError
 from hints.backends.opencv import OpenCV
 from hints.huds.interceptor import InterceptorWindow
+from hints.huds.layout import get_visible_children
 from hints.huds.overlay import OverlayWindow
-from hints.mouse import click
+from hints.labels import get_labels, prioritize_children
+from hints.mouse import click, drag
 from hints.mouse_enums import MouseButton, MouseButtonState
 from hints.utils import HintsConfig, load_config
 from hints.window_systems.exceptions import WindowSystemNotSupported
@@ -23,11 +22,12 @@ from hints.window_systems.window_system import WindowSystem
 from hints.window_systems.window_system_type import (
     SupportedWindowSystems,
     WindowSystemType,
-    get_window_system_type,
+    get_window_system_id,
 )
 
 if TYPE_CHECKING:
     from hints.child import Child
+    from hints.labels import HintLabelPriority
     from hints.window_systems.window_system import WindowSystem
 
 
@@ -113,26 +113,24 @@ def display_gtk_window(
     Gtk.main()
 
 
-def get_hints(children: list[Child], alphabet: str) -> dict[str, Child]:
+def get_hints(
+    children: list[Child], alphabet: str, priority: HintLabelPriority = ""
+) -> dict[str, Child]:
     """Get hints.
 
     :param children: The children elements of windown that indicate the
         absolute position of those elements.
     :param alphabet: The alphabet used to create hints
-    :return: The hints. Ex {"ab": Child, "ac": Child}
+    :param priority: Which children get the shortest hints (see
+        hints.labels.prioritize_children).
+    :return: The hints. Ex {"a": Child, "sd": Child}
     """
-    hints: dict[str, Child] = {}
-
-    if len(children) == 0:
-        return hints
-
-    for child, hint in zip(
-        children,
-        product(alphabet, repeat=ceil(log(len(children)) / log(len(alphabet)))),
-    ):
-        hints["".join(hint)] = child
-
-    return hints
+    return dict(
+        zip(
+            get_labels(len(children), alphabet),
+            prioritize_children(children, priority),
+        )
+    )
 
 
 def hint_mode(config: HintsConfig, window_system: WindowSystem):
@@ -162,13 +160,15 @@ def hint_mode(config: HintsConfig, window_system: WindowSystem):
             logger.debug("Gathering hints took %f seconds", time() - start)
             logger.debug("Gathered %d hints", len(children))
 
+            window_extents = current_backend.window_system.focused_window_extents
+            _, _, window_width, window_height = window_extents
+
             hints = get_hints(
-                children,
+                get_visible_children(children, window_width, window_height),
                 alphabet=config["alphabet"],
+                priority=config["hint_label_priority"],
             )
 
-            window_extents = current_backend.window_system.focused_window_extents
-
         except AccessibleChildrenNotFoundError:
             logger.debug(
                 "No acceessible children found with the '%s' backend.",
@@ -247,6 +247,42 @@ def hint_mode(config: HintsConfig, window_system: WindowSystem):
                                 == WindowSystemType.WAYLAND,
                             },
                         )
+                    case "drag":
+                        # choose the hint to drop on
+                        drop_action: dict[str, Any] = {}
+
+                        display_gtk_window(
+                            window_system,
+                            OverlayWindow,
+                            x,
+                            y,
+                            width,
+                            height,
+                            gkt_window_args=(
+                                config,
+                                hints,
+                                drop_action,
+                            ),
+                            gtk_window_kwargs={
+                                "is_wayland": window_system.window_system_type
+                                == WindowSystemType.WAYLAND,
+                            },
+                            overlay_x_offset=config["overlay_x_offset"],
+                            overlay_y_offset=config["overlay_y_offset"],
+                        )
+
+                        # the overlay also records keys typed before
+                        # leaving it (like a repeat count), the drop target
+                        # is only there once a hint was picked
+                        if "x" in drop_action and "y" in drop_action:
+                            drag(
+                                mouse_action["x"] + mouse_x_offset,
+                                mouse_action["y"] + mouse_y_offset,
+                                drop_action["x"] + mouse_x_offset,
+                                drop_action["y"] + mouse_y_offset,
+                                config["drag_duration"],
+                                mouse_action["button"],
+                            )
 
             # no need to use the next backend if the current one succeeded
             break
@@ -286,27 +322,7 @@ def get_window_system(window_system_id: str = "") -> Type[WindowSystem]:
     """
 
     if not window_system_id:
-
-        window_system_type = get_window_system_type()
-
-        if window_system_type == WindowSystemType.X11:
-            window_system_id = "x11"
-        if window_system_type == WindowSystemType.WAYLAND:
-
-            # add new waland wms here, then add a match case below to import the class
-            supported_wayland_wms = {"sway", "Hyprland", "plasmashell"}
-
-            # Check if there is a process running that matches the supported_wayland_wms
-            window_system_id = (
-                run(
-                    "ps -e -o comm | grep -m 1 -o -E "
-                    + " ".join([f"-e '^{wm}$'" for wm in supported_wayland_wms]),
-                    capture_output=True,
-                    shell=True,
-                )
-                .stdout.decode("utf-8")
-                .strip()
-            ).lower()
+        window_system_id = get_window_system_id()
 
     window_system = get_window_system_class(window_system_id)
 
@@ -345,6 +361,15 @@ def main():
         " for setting up configuration.",
     )
 
+    parser.add_argument(
+        "--record-tree",
+        type=str,
+        metavar="PATH",
+        help="Record the accessible tree of the focused window to PATH (roles,"
+        " states, extents and attributes, no text) and exit. Useful for"
+        " reporting performance issues with an application.",
+    )
+
     args = parser.parse_args()
 
     custom_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -356,6 +381,17 @@ def main():
 
     window_system = get_window_system(config["window_system"])()
 
+    if args.record_tree:
+        recording = AtspiBackend(config, window_system).record_tree()
+        recording.save(args.record_tree)
+        logger.info(
+            "Recorded %d elements of '%s' to %s.",
+            len(recording),
+            window_system.focused_applicaiton_name,
+            args.record_tree,
+        )
+        return
+
     match args.mode:
         case "hint":
             hint_mode(config, window_system)
@@ -16,7 +16,12 @@ from typing import Any
 
 from gi import require_foreign, require_version
 
-from hints.mouse import click, do_mouse_action, move
+from hints.mouse import (
+    MouseScript,
+    click,
+    start_mouse_motion,
+    stop_mouse_motion,
+)
 from hints.mouse_enums import MouseButton, MouseButtonState, MouseMode
 from hints.utils import HintsConfig
 
@@ -55,7 +60,22 @@ class InterceptorWindow(Gtk.Window):
         self.height = height
         self.mouse_action = mouse_action
         self.config = config
-        self.key_press_state: dict[str, Any] = {}
+        self.held_keys: set[str] = set()
+        # keys that move or scroll, other keys (like modifiers) do nothing
+        self.motion_keys = {
+            "grab": {
+                config["mouse_move_left"],
+                config["mouse_move_right"],
+                config["mouse_move_up"],
+                config["mouse_move_down"],
+            },
+            "scroll": {
+                config["mouse_scroll_left"],
+                config["mouse_scroll_right"],
+                config["mouse_scroll_up"],
+                config["mouse_scroll_down"],
+            },
+        }
         self.is_wayland = is_wayland
         self.first_move = True
 
@@ -77,13 +97,12 @@ class InterceptorWindow(Gtk.Window):
         self.connect("key-release-event", self.on_key_release)
         self.connect("show", self.on_grab)
 
-    def on_key_release(self, *_):
-        """Handle key releases."""
-        self.key_press_state.clear()
-
-    def on_key_press(self, _, event):
-        """Handle key presses :param event: Event object."""
+    def get_key(self, event) -> int:
+        """Get the (lowercase) key value of a key event.
 
+        :param event: Event object.
+        :return: The key value.
+        """
         keymap = Gdk.Keymap.get_for_display(Gdk.Display.get_default())
 
         # if keyval is bound, keyval, effective_group, level, consumed_modifiers
@@ -93,9 +112,23 @@ class InterceptorWindow(Gtk.Window):
             1,
         )
 
-        keyval_lower = Gdk.keyval_to_lower(keyval)
+        return Gdk.keyval_to_lower(keyval)
+
+    def on_key_release(self, _, event):
+        """Handle key releases :param event: Event object."""
+        keyval_lower = self.get_key(event)
+
+        if keyval_lower and chr(keyval_lower) in self.held_keys:
+            self.held_keys.discard(chr(keyval_lower))
+            stop_mouse_motion(chr(keyval_lower))
+
+    def on_key_press(self, _, event):
+        """Handle key presses :param event: Event object."""
+
+        keyval_lower = self.get_key(event)
 
         if keyval_lower == self.config["exit_key"]:
+            stop_mouse_motion()
             click(0, 0, MouseButton.LEFT, (MouseButtonState.UP,), absolute=False)
             Gtk.main_quit()
 
@@ -103,24 +136,18 @@ class InterceptorWindow(Gtk.Window):
             # Some window system like Hyprland require mouse movemovement to
             # focus the window being interacted with. So we do a very small move to
             # refocus the window
-            move(0, 1, absolute=False)
-            move(0, -1, absolute=False)
+            MouseScript().move(0, 1, absolute=False).move(0, -1, absolute=False).run()
             self.first_move = False
 
-        if keyval_lower:
-            match self.mouse_action["action"]:
-                case "grab":
-                    self.key_press_state = do_mouse_action(
-                        self.key_press_state,
-                        chr(keyval_lower),
-                        MouseMode.MOVE,
-                    )
-                case "scroll":
-                    self.key_press_state = do_mouse_action(
-                        self.key_press_state,
-                        chr(keyval_lower),
-                        MouseMode.SCROLL,
-                    )
+        action = self.mouse_action["action"]
+        key = chr(keyval_lower) if keyval_lower else ""
+
+        # key repeats are ignored, hintsd keeps moving until the key is released
+        if key in self.motion_keys.get(action, ()) and key not in self.held_keys:
+            self.held_keys.add(key)
+            start_mouse_motion(
+                key, MouseMode.SCROLL if action == "scroll" else MouseMode.MOVE
+            )
 
     def on_grab(self, window):
         """Force keyboard grab to listen for keybaord events.
@@ -0,0 +1,211 @@
+"""Pre-rendered hint label surfaces.
+
+Hint labels are rendered once into their own Cairo surfaces when hints
+are assigned, so drawing the overlay only has to blit those surfaces.
+The typed prefix is highlighted by blitting one small surface per prefix
+over the label text.
+"""
+
+from __future__ import annotations
+
+from math import ceil
+from typing import TYPE_CHECKING
+
+from gi import require_foreign
+
+require_foreign("cairo")
+from cairo import (
+    FONT_SLANT_NORMAL,
+    FONT_WEIGHT_BOLD,
+    FORMAT_ARGB32,
+    Context,
+    ImageSurface,
+)
+
+if TYPE_CHECKING:
+    from hints.utils import HintsConfig
+
+# Space around the prefix text in prefix surfaces, so that antialiased
+# glyph edges are not clipped.
+PREFIX_SURFACE_MARGIN = 2
+
+
+class RenderedLabel:
+    """Text rendered to a surface.
+
+    text_x and text_y are the position of the text origin (baseline)
+    inside the surface. They are whole pixels so that prefixes can be
+    blitted over labels without resampling.
+    """
+
+    __slots__ = ("surface", "width", "height", "text_x", "text_y")
+
+    def __init__(
+        self,
+        surface: ImageSurface,
+        width: float,
+        height: float,
+        text_x: int,
+        text_y: int,
+    ):
+        self.surface = surface
+        self.width = width
+        self.height = height
+        self.text_x = text_x
+        self.text_y = text_y
+
+
+class LabelSurfaceCache:
+    """Cache of rendered hint labels and highlighted prefixes."""
+
+    def __init__(self, config: HintsConfig, scale: int = 1):
+        """Label surface cache constructor.
+
+        :param config: Hints config.
+        :param scale: Device scale of the window the surfaces are drawn
+            on.
+        """
+        hints_config = config["hints"]
+        self.scale = scale
+        self.hint_height = hints_config["hint_height"]
+        self.hint_width_padding = hints_config["hint_width_padding"]
+        self.hint_font_size = hints_config["hint_font_size"]
+        self.hint_font_face = hints_config["hint_font_face"]
+        self.hint_font_rgba = (
+            hints_config["hint_font_r"],
+            hints_config["hint_font_g"],
+            hints_config["hint_font_b"],
+            hints_config["hint_font_a"],
+        )
+        self.hint_pressed_font_rgba = (
+            hints_config["hint_pressed_font_r"],
+            hints_config["hint_pressed_font_g"],
+            hints_config["hint_pressed_font_b"],
+            hints_config["hint_pressed_font_a"],
+        )
+        self.hint_background_rgba = (
+            hints_config["hint_background_r"],
+            hints_config["hint_background_g"],
+            hints_config["hint_background_b"],
+            hints_config["hint_background_a"],
+        )
+        self.hint_upercase = hints_config["hint_upercase"]
+
+        self.labels: dict[str, RenderedLabel] = {}
+        self.prefixes: dict[str, RenderedLabel] = {}
+
+        # context used only to measure text
+        self._measure_context = self._create_context(ImageSurface(FORMAT_ARGB32, 1, 1))
+
+    def _create_surface(self, width: float, height: float) -> ImageSurface:
+        """Create a surface matching the window device scale.
+
+        :param width: Surface width in window pixels.
+        :param height: Surface height in window pixels.
+        :return: The surface.
+        """
+        surface = ImageSurface(
+            FORMAT_ARGB32,
+            max(1, ceil(width * self.scale)),
+            max(1, ceil(height * self.scale)),
+        )
+        surface.set_device_scale(self.scale, self.scale)
+        return surface
+
+    def _create_context(self, surface: ImageSurface) -> Context:
+        """Create a context with the hint font selected.
+
+        :param surface: Surface to draw on.
+        :return: The context.
+        """
+        cr = Context(surface)
+        cr.select_font_face(self.hint_font_face, FONT_SLANT_NORMAL, FONT_WEIGHT_BOLD)
+        cr.set_font_size(self.hint_font_size)
+        return cr
+
+    def set_scale(self, scale: int):
+        """Change the device scale, re-rendering the rendered labels.
+
+        :param scale: Device scale of the window the surfaces are drawn
+            on.
+        """
+        if scale == self.scale:
+            return
+
+        self.scale = scale
+        labels = list(self.labels)
+        self.labels = {}
+        self.prefixes = {}
+        self.render_labels(labels)
+
+    def render_labels(self, labels: list[str]):
+        """Render labels that have not been rendered yet.
+
+        :param labels: Hint labels.
+        """
+        for label in labels:
+            if label not in self.labels:
+                self.labels[label] = self.render_label(label)
+
+    def render_label(self, label: str) -> RenderedLabel:
+        """Render a hint label (background and text).
+
+        :param label: Hint label.
+        :return: The rendered label.
+        """
+        utf8 = label.upper() if self.hint_upercase else label
+        hint_height = self.hint_height
+
+        x_bearing, y_bearing, width, height, _, _ = self._measure_context.text_extents(
+            utf8
+        )
+        hint_width = width + self.hint_width_padding
+
+        # text centered in the hint
+        text_x = round((hint_width / 2) - (width / 2 + x_bearing))
+        text_y = round((hint_height / 2) - (height / 2 + y_bearing))
+
+        surface = self._create_surface(hint_width, hint_height)
+        cr = self._create_context(surface)
+
+        cr.rectangle(0, 0, hint_width, hint_height)
+        cr.set_source_rgba(*self.hint_background_rgba)
+        cr.fill()
+
+        cr.move_to(text_x, text_y)
+        cr.set_source_rgba(*self.hint_font_rgba)
+        cr.show_text(utf8)
+
+        surface.flush()
+
+        return RenderedLabel(surface, hint_width, hint_height, text_x, text_y)
+
+    def get_prefix(self, prefix: str) -> RenderedLabel:
+        """Get the highlight for a typed prefix, rendering it if needed.
+
+        :param prefix: The typed prefix (hint selector state).
+        :return: The prefix rendered in the pressed font color on a
+            transparent surface.
+        """
+        if prefix not in self.prefixes:
+            utf8 = prefix.upper() if self.hint_upercase else prefix
+            ascent, descent, _, _, _ = self._measure_context.font_extents()
+            _, _, _, _, x_advance, _ = self._measure_context.text_extents(utf8)
+
+            text_x = PREFIX_SURFACE_MARGIN
+            text_y = ceil(ascent) + PREFIX_SURFACE_MARGIN
+            width = ceil(x_advance) + 2 * PREFIX_SURFACE_MARGIN
+            height = ceil(ascent + descent) + 2 * PREFIX_SURFACE_MARGIN
+
+            surface = self._create_surface(width, height)
+            cr = self._create_context(surface)
+            cr.move_to(text_x, text_y)
+            cr.set_source_rgba(*self.hint_pressed_font_rgba)
+            cr.show_text(utf8)
+            surface.flush()
+
+            self.prefixes[prefix] = RenderedLabel(
+                surface, width, height, text_x, text_y
+            )
+
+        return self.prefixes[prefix]
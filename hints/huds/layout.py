@@ -0,0 +1,298 @@
+"""Hint layout.
+
+Hints are centered on their elements, unless that would make them overlap
+hints that have already been placed, in which case they are nudged to a
+nearby free spot. Placed hints are kept in a uniform grid so that
+collision checks only look at hints close by.
+"""
+
+from __future__ import annotations
+
+from math import ceil
+from statistics import median
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from hints.child import Child
+
+Rectangle = tuple[int, int, int, int]
+
+# Positions to try for a hint, in order of preference, as multiples of the
+# hint size relative to the centered position.
+HINT_NUDGES = (
+    (0, 0),
+    (0, 1),
+    (0, -1),
+    (1, 0),
+    (-1, 0),
+    (1, 1),
+    (-1, 1),
+    (1, -1),
+    (-1, -1),
+)
+
+
+class SpatialGrid:
+    """Uniform grid of rectangles for fast overlap queries."""
+
+    def __init__(self, cell_size: int):
+        """Spatial grid constructor.
+
+        :param cell_size: Width and height of grid cells. Works best
+            close to the size of the rectangles stored.
+        """
+        self.cell_size = max(1, cell_size)
+        self.cells: dict[tuple[int, int], list[tuple[int, int, int, int]]] = {}
+
+    def overlaps(self, rectangle: Rectangle) -> bool:
+        """Check if a rectangle overlaps any rectangle in the grid.
+
+        Rectangles that only share an edge do not overlap.
+
+        :param rectangle: The rectangle (x, y, width, height).
+        :return: Whether the rectangle overlaps another rectangle.
+        """
+        x, y, width, height = rectangle
+        x2 = x + width
+        y2 = y + height
+        cell_size = self.cell_size
+        cells = self.cells
+
+        for column in range(x // cell_size, x2 // cell_size + 1):
+            for row in range(y // cell_size, y2 // cell_size + 1):
+                for other_x, other_y, other_x2, other_y2 in cells.get(
+                    (column, row), ()
+                ):
+                    if x < other_x2 and other_x < x2 and y < other_y2 and other_y < y2:
+                        return True
+
+        return False
+
+    def get_nearby(self, rectangle: Rectangle) -> list[tuple[int, int, int, int]]:
+        """Get the rectangles in the grid cells a rectangle covers.
+
+        :param rectangle: The rectangle (x, y, width, height).
+        :return: Corners (x1, y1, x2, y2) of rectangles that may overlap
+            it. Rectangles spanning several cells are listed once per
+            cell.
+        """
+        x, y, width, height = rectangle
+        cell_size = self.cell_size
+        cells = self.cells
+        nearby: list[tuple[int, int, int, int]] = []
+
+        for column in range(x // cell_size, (x + width) // cell_size + 1):
+            for row in range(y // cell_size, (y + height) // cell_size + 1):
+                nearby.extend(cells.get((column, row), ()))
+
+        return nearby
+
+    def insert(self, rectangle: Rectangle):
+        """Add a rectangle to the grid.
+
+        :param rectangle: The rectangle (x, y, width, height).
+        """
+        x, y, width, height = rectangle
+        x2 = x + width
+        y2 = y + height
+        cell_size = self.cell_size
+        # stored as corners, which is what overlap checks need
+        corners = (x, y, x2, y2)
+
+        for column in range(x // cell_size, x2 // cell_size + 1):
+            for row in range(y // cell_size, y2 // cell_size + 1):
+                self.cells.setdefault((column, row), []).append(corners)
+
+
+def overlaps_any(
+    rectangle: Rectangle, others: Iterable[tuple[int, int, int, int]]
+) -> bool:
+    """Check if a rectangle overlaps any other rectangle.
+
+    Rectangles that only share an edge do not overlap.
+
+    :param rectangle: The rectangle (x, y, width, height).
+    :param others: Corners (x1, y1, x2, y2) of the other rectangles.
+    :return: Whether the rectangle overlaps another rectangle.
+    """
+    x, y, width, height = rectangle
+    x2 = x + width
+    y2 = y + height
+
+    for other_x, other_y, other_x2, other_y2 in others:
+        if x < other_x2 and other_x < x2 and y < other_y2 and other_y < y2:
+            return True
+
+    return False
+
+
+class HintLayout:
+    """Where hints are drawn and where selecting them clicks."""
+
+    def __init__(self):
+        # hint rectangles relative to the window (x, y, width, height)
+        self.rectangles: dict[str, Rectangle] = {}
+        # absolute click positions (x, y)
+        self.click_points: dict[str, tuple[float, float]] = {}
+
+
+def get_visible_area(
+    child: Child, window_width: float, window_height: float
+) -> tuple[float, float, float, float] | None:
+    """Get the part of an element inside the window.
+
+    :param child: The element.
+    :param window_width: Window width.
+    :param window_height: Window height.
+    :return: The corners (x1, y1, x2, y2) of the visible part relative to
+        the window, None when the element is outside of the window.
+    """
+    x_loc, y_loc = child.relative_position
+    visible_x1 = max(x_loc, 0)
+    visible_y1 = max(y_loc, 0)
+    visible_x2 = min(x_loc + child.width, window_width)
+    visible_y2 = min(y_loc + child.height, window_height)
+
+    if visible_x1 >= visible_x2 or visible_y1 >= visible_y2:
+        return None
+
+    return visible_x1, visible_y1, visible_x2, visible_y2
+
+
+def get_visible_children(
+    children: list[Child], window_width: float, window_height: float
+) -> list[Child]:
+    """Get the elements that are at least partly inside the window.
+
+    Elements outside of the window can't get a hint, so they are dropped
+    before labels are assigned instead of taking short labels.
+
+    :param children: The elements.
+    :param window_width: Window width.
+    :param window_height: Window height.
+    :return: The elements inside the window.
+    """
+    return [
+        child
+        for child in children
+        if get_visible_area(child, window_width, window_height)
+    ]
+
+
+def layout_hints(
+    hints: dict[str, Child],
+    hint_sizes: dict[str, tuple[float, float]],
+    window_width: float,
+    window_height: float,
+) -> HintLayout:
+    """Place hints so that they do not overlap.
+
+    Hints are placed in order, so hints earlier in the dict (the ones
+    with the shortest labels) get the best spots. Hints for elements
+    outside of the window are skipped.
+
+    :param hints: The hints. Ex {"a": Child, "sd": Child}
+    :param hint_sizes: The size of each hint (width, height).
+    :param window_width: Window width.
+    :param window_height: Window height.
+    :return: The hint layout.
+    """
+    layout = HintLayout()
+
+    if not hints:
+        return layout
+
+    # cells about the size of a typical hint keep the rectangles per cell
+    # (and so the work per hint) about the same for any number of hints
+    grid = SpatialGrid(
+        ceil(median(max(width, height) for width, height in hint_sizes.values()))
+    )
+
+    window_right = int(window_width)
+    window_bottom = int(window_height)
+
+    for hint_value, child in hints.items():
+        visible_area = get_visible_area(child, window_width, window_height)
+
+        if not visible_area:
+            continue
+
+        x_loc, y_loc = child.relative_position
+        visible_x1, visible_y1, visible_x2, visible_y2 = visible_area
+        center_x = (visible_x1 + visible_x2) / 2
+        center_y = (visible_y1 + visible_y2) / 2
+
+        # whole pixels that cover the drawn label, so that hints placed
+        # next to each other don't overlap
+        hint_width, hint_height = hint_sizes[hint_value]
+        hint_width = ceil(hint_width)
+        hint_height = ceil(hint_height)
+
+        # keep hints inside of the window
+        max_x = max(0, window_right - hint_width)
+        max_y = max(0, window_bottom - hint_height)
+        centered_x = round(center_x - hint_width / 2)
+        centered_y = round(center_y - hint_height / 2)
+
+        rectangle = (
+            min(max(centered_x, 0), max_x),
+            min(max(centered_y, 0), max_y),
+            hint_width,
+            hint_height,
+        )
+
+        # hints usually fit centered, which only needs the grid cells under
+        # that spot. Otherwise, every other candidate position is within
+        # one hint size of it, so the cells around it are gathered once for
+        # all of them
+        if grid.overlaps(rectangle):
+            # candidate positions, indexed by their offset (-1, 0 or 1) in
+            # hint sizes from the centered position
+            candidate_xs = (
+                rectangle[0],
+                min(centered_x + hint_width, max_x),
+                max(centered_x - hint_width, 0),
+            )
+            candidate_ys = (
+                rectangle[1],
+                min(centered_y + hint_height, max_y),
+                max(centered_y - hint_height, 0),
+            )
+            nearby = grid.get_nearby(
+                (
+                    candidate_xs[-1],
+                    candidate_ys[-1],
+                    candidate_xs[1] - candidate_xs[-1] + hint_width,
+                    candidate_ys[1] - candidate_ys[-1] + hint_height,
+                )
+            )
+
+            for nudge_x, nudge_y in HINT_NUDGES[1:]:
+                candidate = (
+                    candidate_xs[nudge_x],
+                    candidate_ys[nudge_y],
+                    hint_width,
+                    hint_height,
+                )
+
+                if not overlaps_any(candidate, nearby):
+                    rectangle = candidate
+                    grid.insert(rectangle)
+                    break
+
+            # when no candidate is free the hint is centered anyway,
+            # overlapping is better than not showing it. It is left out of
+            # the grid: crowded spots would otherwise pile up rectangles
+            # that every later hint around them has to check
+        else:
+            grid.insert(rectangle)
+
+        layout.rectangles[hint_value] = rectangle
+
+        absolute_x, absolute_y = child.absolute_position
+        layout.click_points[hint_value] = (
+            absolute_x + center_x - x_loc,
+            absolute_y + center_y - y_loc,
+        )
+
+    return layout
@@ -2,23 +2,29 @@
 
 from __future__ import annotations
 
+from math import ceil, floor
 from typing import TYPE_CHECKING, Any
 
 from gi import require_foreign, require_version
 
+from hints.labels import HintTrie
 from hints.mouse_enums import MouseButton
 from hints.utils import HintsConfig
 
 require_version("Gdk", "3.0")
 require_version("Gtk", "3.0")
 require_foreign("cairo")
-from cairo import FONT_SLANT_NORMAL, FONT_WEIGHT_BOLD
+from cairo import RectangleInt, Region
 from gi.repository import Gdk, Gtk
 
+from hints.huds.label_surfaces import LabelSurfaceCache
+from hints.huds.layout import layout_hints
+
 if TYPE_CHECKING:
     from cairo import Context
 
     from hints.child import Child
+    from hints.huds.label_surfaces import RenderedLabel
 
 
 class OverlayWindow(Gtk.Window):
@@ -49,40 +55,43 @@ class OverlayWindow(Gtk.Window):
 
         self.width = width
         self.height = height
-        self.hints = hints
         self.hint_selector_state = ""
         self.mouse_action = mouse_action
         self.is_wayland = is_wayland
 
-        # hint settings
-        hints_config = config["hints"]
-        self.hint_height = hints_config["hint_height"]
-        self.hint_width_padding = hints_config["hint_width_padding"]
-
-        self.hint_font_size = hints_config["hint_font_size"]
-        self.hint_font_face = hints_config["hint_font_face"]
-        self.hint_font_r = hints_config["hint_font_r"]
-        self.hint_font_g = hints_config["hint_font_g"]
-        self.hint_font_b = hints_config["hint_font_b"]
-        self.hint_font_a = hints_config["hint_font_a"]
-
-        self.hint_pressed_font_r = hints_config["hint_pressed_font_r"]
-        self.hint_pressed_font_g = hints_config["hint_pressed_font_g"]
-        self.hint_pressed_font_b = hints_config["hint_pressed_font_b"]
-        self.hint_pressed_font_a = hints_config["hint_pressed_font_a"]
-        self.hint_upercase = hints_config["hint_upercase"]
-
-        self.hint_background_r = hints_config["hint_background_r"]
-        self.hint_background_g = hints_config["hint_background_g"]
-        self.hint_background_b = hints_config["hint_background_b"]
-        self.hint_background_a = hints_config["hint_background_a"]
+        # hint labels are rendered once, drawing only blits them. The scale
+        # factor is only known once the window is on a monitor, labels are
+        # rendered again if it differs (see on_scale_factor_changed)
+        self.label_surfaces = LabelSurfaceCache(config, self.get_scale_factor())
+        self.label_surfaces.render_labels(list(hints))
+
+        self.hint_layout = layout_hints(
+            hints,
+            {
+                hint: (label.width, label.height)
+                for hint, label in self.label_surfaces.labels.items()
+            },
+            width,
+            height,
+        )
+        # hints that could not be placed (outside of the window) can't be
+        # selected
+        self.hints = {
+            hint: child
+            for hint, child in hints.items()
+            if hint in self.hint_layout.rectangles
+        }
+        self.hint_trie = HintTrie(self.hints)
 
         # key settings
         self.exit_key = config["exit_key"]
         self.hover_modifier = config["hover_modifier"]
         self.grab_modifier = config["grab_modifier"]
+        self.drag_modifier = config["drag_modifier"]
 
-        self.hints_drawn_offsets: dict[str, tuple[float, float]] = {}
+        # area covered by each drawn hint (x, y, width, height), used to only
+        # redraw the hints that change
+        self.hints_drawn_rectangles: dict[str, tuple[int, int, int, int]] = {}
 
         # composite setup
         screen = self.get_screen()
@@ -102,6 +111,8 @@ class OverlayWindow(Gtk.Window):
         self.connect("destroy", Gtk.main_quit)
         self.connect("key-press-event", self.on_key_press)
         self.connect("show", self.on_show)
+        self.connect("realize", self.on_scale_factor_changed)
+        self.connect("notify::scale-factor", self.on_scale_factor_changed)
         self.drawing_area.connect("draw", self.on_draw)
 
         def put_in_frame(widget):
@@ -116,82 +127,90 @@ class OverlayWindow(Gtk.Window):
         self.add(vpaned)
         vpaned.pack1(put_in_frame(self.drawing_area), True, True)
 
+    def on_scale_factor_changed(self, *_):
+        """Render labels again for the scale factor of the monitor the
+        window is on.
+        """
+        scale_factor = self.get_scale_factor()
+
+        if scale_factor != self.label_surfaces.scale:
+            # label sizes are in window pixels, so the layout stays valid
+            self.label_surfaces.set_scale(scale_factor)
+            self.drawing_area.queue_draw()
+
     def on_draw(self, _, cr: Context):
         """Draw hints.
 
         :param cr: Cairo Context.
         """
-        hint_height = self.hint_height
-
-        cr.select_font_face(self.hint_font_face, FONT_SLANT_NORMAL, FONT_WEIGHT_BOLD)
-        cr.set_font_size(self.hint_font_size)
-
-        for hint_value, child in self.hints.items():
-            x_loc, y_loc = child.relative_position
-            if x_loc >= 0 and y_loc >= 0:
-                cr.save()
-                utf8 = hint_value.upper() if self.hint_upercase else hint_value
-                hint_state = (
-                    self.hint_selector_state.upper()
-                    if self.hint_upercase
-                    else self.hint_selector_state
-                )
-
-                x_bearing, y_bearing, width, height, _, _ = cr.text_extents(utf8)
-                hint_width = width + self.hint_width_padding
-
-                cr.new_path()
-                # offset to bring top left corner of a hint to the correct possition
-                # so that the hint is centered on the object
-                hint_x_offset = child.width / 2 - hint_width / 2
-                hint_y_offset = child.height / 2 - hint_height / 2
-
-                hint_x = x_loc + hint_x_offset
-                hint_y = y_loc + hint_y_offset
-
-                cr.translate(hint_x, hint_y)
-                # adding offsets so that clicks sent happen in center of hints
-                # (matching the position of hints on elements)
-                self.hints_drawn_offsets[hint_value] = (
-                    hint_x_offset + hint_width / 2,
-                    hint_y_offset + hint_height / 2,
-                )
+        labels = self.label_surfaces.labels
+        prefix = (
+            self.label_surfaces.get_prefix(self.hint_selector_state)
+            if self.hint_selector_state
+            else None
+        )
+        clip_x1, clip_y1, clip_x2, clip_y2 = cr.clip_extents()
+
+        for hint_value in self.hints:
+            label = labels[hint_value]
+            hint_x, hint_y, _, _ = self.hint_layout.rectangles[hint_value]
+            drawn_rectangle = self.get_drawn_rectangle(hint_value, prefix)
+            self.hints_drawn_rectangles[hint_value] = drawn_rectangle
+            rectangle_x1, rectangle_y1, rectangle_width, rectangle_height = (
+                drawn_rectangle
+            )
 
-                cr.rectangle(0, 0, hint_width, hint_height)
-                cr.set_source_rgba(
-                    self.hint_background_r,
-                    self.hint_background_g,
-                    self.hint_background_b,
-                    self.hint_background_a,
-                )
+            # skip hints outside of the area being redrawn
+            if (
+                rectangle_x1 + rectangle_width <= clip_x1
+                or rectangle_y1 + rectangle_height <= clip_y1
+                or rectangle_x1 >= clip_x2
+                or rectangle_y1 >= clip_y2
+            ):
+                continue
+
+            cr.set_source_surface(label.surface, hint_x, hint_y)
+            cr.rectangle(hint_x, hint_y, label.width, label.height)
+            cr.fill()
+
+            if prefix:
+                prefix_x = hint_x + label.text_x - prefix.text_x
+                prefix_y = hint_y + label.text_y - prefix.text_y
+                cr.set_source_surface(prefix.surface, prefix_x, prefix_y)
+                cr.rectangle(prefix_x, prefix_y, prefix.width, prefix.height)
                 cr.fill()
 
-                hint_text_position = (
-                    (hint_width / 2) - (width / 2 + x_bearing),
-                    (hint_height / 2) - (height / 2 + y_bearing),
-                )
+    def get_drawn_rectangle(
+        self, hint_value: str, prefix: RenderedLabel | None
+    ) -> tuple[int, int, int, int]:
+        """Get the area a hint covers when drawn.
 
-                # draw hint
-                cr.move_to(*hint_text_position)
-                cr.set_source_rgba(
-                    self.hint_font_r,
-                    self.hint_font_g,
-                    self.hint_font_b,
-                    self.hint_font_a,
-                )
-                cr.show_text(utf8)
-
-                cr.move_to(*hint_text_position)
-                cr.set_source_rgba(
-                    self.hint_pressed_font_r,
-                    self.hint_pressed_font_g,
-                    self.hint_pressed_font_b,
-                    self.hint_pressed_font_a,
-                )
-                cr.show_text(hint_state)
-
-                cr.close_path()
-                cr.restore()
+        :param hint_value: The hint.
+        :param prefix: The highlighted prefix drawn over the hint, if any.
+        :return: The area (x, y, width, height) in whole pixels.
+        """
+        label = self.label_surfaces.labels[hint_value]
+        hint_x, hint_y, _, _ = self.hint_layout.rectangles[hint_value]
+
+        rectangle_x1, rectangle_y1 = hint_x, hint_y
+        rectangle_x2 = hint_x + label.width
+        rectangle_y2 = hint_y + label.height
+
+        # the highlight can be larger than the label
+        if prefix:
+            prefix_x = hint_x + label.text_x - prefix.text_x
+            prefix_y = hint_y + label.text_y - prefix.text_y
+            rectangle_x1 = min(rectangle_x1, prefix_x)
+            rectangle_y1 = min(rectangle_y1, prefix_y)
+            rectangle_x2 = max(rectangle_x2, prefix_x + prefix.width)
+            rectangle_y2 = max(rectangle_y2, prefix_y + prefix.height)
+
+        return (
+            floor(rectangle_x1),
+            floor(rectangle_y1),
+            ceil(rectangle_x2) - floor(rectangle_x1),
+            ceil(rectangle_y2) - floor(rectangle_y1),
+        )
 
     def update_hints(self, next_char: str):
         """Update hints on screen to eliminate options.
@@ -199,17 +218,32 @@ class OverlayWindow(Gtk.Window):
         :param next_char: Next character for hint_selector_state.
         """
 
-        updated_hints = {
-            hint: child
-            for hint, child in self.hints.items()
-            if hint.startswith(self.hint_selector_state + next_char)
-        }
+        hint_trie = self.hint_trie.descend(next_char)
+
+        if hint_trie:
+            # every hint on screen either disappears or gets a longer
+            # highlighted prefix, so only the areas they cover (before and
+            # after the highlight changes) need redrawing
+            damaged_region = Region(
+                [
+                    RectangleInt(*self.hints_drawn_rectangles[hint])
+                    for hint in self.hints
+                    if hint in self.hints_drawn_rectangles
+                ]
+            )
 
-        if updated_hints:
-            self.hints = updated_hints
+            self.hint_trie = hint_trie
+            self.hints = hint_trie.hints
             self.hint_selector_state += next_char
 
-        self.drawing_area.queue_draw()
+            prefix = self.label_surfaces.get_prefix(self.hint_selector_state)
+
+            for hint in self.hints:
+                damaged_region.union(
+                    RectangleInt(*self.get_drawn_rectangle(hint, prefix))
+                )
+
+            self.drawing_area.queue_draw_region(damaged_region)
 
     def on_key_press(self, _, event):
         """Handle key presses :param event: Event object."""
@@ -240,6 +274,9 @@ class OverlayWindow(Gtk.Window):
         if modifiers == self.grab_modifier:
             self.mouse_action.update({"action": "grab"})
 
+        if modifiers == self.drag_modifier:
+            self.mouse_action.update({"action": "drag"})
+
         if keyval_lower != keyval:
             self.mouse_action.update({"action": "click", "button": MouseButton.RIGHT})
 
@@ -255,13 +292,13 @@ class OverlayWindow(Gtk.Window):
         if len(self.hints) == 1:
             Gdk.keyboard_ungrab(event.time)
             self.destroy()
-            x, y = self.hints[self.hint_selector_state].absolute_position
-            x_offset, y_offset = self.hints_drawn_offsets[self.hint_selector_state]
+            hint_value = next(iter(self.hints))
+            x, y = self.hint_layout.click_points[hint_value]
             self.mouse_action.update(
                 {
                     "action": self.mouse_action.get("action", "click"),
-                    "x": x + x_offset,
-                    "y": y + y_offset,
+                    "x": x,
+                    "y": y,
                     "repeat": self.mouse_action.get("repeat", 1),
                     "button": self.mouse_action.get("button", MouseButton.LEFT),
                 }
@@ -0,0 +1,85 @@
+"""Framed messages for Interprocess Communication between hints and hintsd.
+
+Every message is a fixed size header (payload length and request id)
+followed by a compact JSON payload. Framing lets a single long lived
+connection carry any number of messages of any size, and request ids let
+clients send several requests before reading their replies (pipelining).
+"""
+
+from __future__ import annotations
+
+from json import dumps, loads
+from struct import Struct
+from typing import Any
+
+# payload length, request id
+MESSAGE_HEADER = Struct("!II")
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+MAX_REQUEST_ID = 2**32 - 1
+
+
+class InvalidMessageError(Exception):
+    """Exception to raise when a peer sends a message that can't be read."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Received an invalid message: {self.reason}"
+
+
+def encode_message(request_id: int, payload: Any) -> bytes:
+    """Encode a message.
+
+    :param request_id: The id of the request the message belongs to.
+    :param payload: JSON serializable payload.
+    :return: The framed message.
+    """
+    data = dumps(payload, separators=(",", ":")).encode("utf-8")
+    return MESSAGE_HEADER.pack(len(data), request_id) + data
+
+
+class MessageReader:
+    """Incremental reader for framed messages.
+
+    Data can be fed in chunks of any size, messages are returned once
+    they are complete.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[tuple[int, Any]]:
+        """Feed received data.
+
+        :param data: Received data.
+        :return: Complete messages (request_id, payload).
+        :raises InvalidMessageError: When a message is too large or its
+            payload can't be decoded.
+        """
+        self.buffer += data
+        messages = []
+        offset = 0
+
+        while len(self.buffer) - offset >= MESSAGE_HEADER.size:
+            size, request_id = MESSAGE_HEADER.unpack_from(self.buffer, offset)
+
+            if size > MAX_MESSAGE_SIZE:
+                raise InvalidMessageError(f"message size {size} is too large")
+
+            end = offset + MESSAGE_HEADER.size + size
+            if len(self.buffer) < end:
+                break
+
+            try:
+                payload = loads(self.buffer[offset + MESSAGE_HEADER.size : end])
+            except ValueError as error:
+                raise InvalidMessageError(str(error)) from error
+
+            messages.append((request_id, payload))
+            offset = end
+
+        del self.buffer[:offset]
+
+        return messages
@@ -0,0 +1,121 @@
+"""Hint label generation and lookup.
+
+Labels are generated as a prefix-free code over the hint alphabet (no
+label is the prefix of another label), which lets hints use as many one
+key labels as possible while keeping every label unambiguous. This is the
+same approach Vimium uses for link hints.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+if TYPE_CHECKING:
+    from hints.child import Child
+
+HintLabelPriority = Literal["", "size", "reading_order"]
+
+
+def get_labels(count: int, alphabet: str) -> list[str]:
+    """Get prefix-free labels, shortest labels first.
+
+    The labels are the leaves of a tree where every node has one child
+    per character of the alphabet. Starting from the root, the shallowest
+    leaf is expanded (breadth first) until there are enough leaves. This
+    takes time linear in the number of labels.
+
+    :param count: The number of labels to generate.
+    :param alphabet: The alphabet used to create labels.
+    :return: Labels sorted by length. Ex: ["s", "d", ..., "aa", "as"]
+    :raises ValueError: When the alphabet has less than two unique
+        characters.
+    """
+    characters = "".join(dict.fromkeys(alphabet))
+
+    if len(characters) < 2:
+        raise ValueError("The hint alphabet needs at least two unique characters.")
+
+    labels = [""]
+    offset = 0
+
+    while len(labels) - offset < count or offset == 0:
+        prefix = labels[offset]
+        offset += 1
+        labels.extend(prefix + character for character in characters)
+
+    return labels[offset : offset + count]
+
+
+def prioritize_children(
+    children: list[Child], priority: HintLabelPriority = ""
+) -> list[Child]:
+    """Order children so that the most important ones come first.
+
+    The first children get the shortest labels.
+
+    :param children: The children to order.
+    :param priority: "size" to favour the largest elements,
+        "reading_order" to favour elements top to bottom, left to right,
+        or "" to keep the order the backend found children in.
+    :return: The ordered children.
+    """
+    match priority:
+        case "size":
+            return sorted(
+                children, key=lambda child: child.width * child.height, reverse=True
+            )
+        case "reading_order":
+            return sorted(
+                children,
+                key=lambda child: (
+                    child.relative_position[1],
+                    child.relative_position[0],
+                ),
+            )
+
+    return children
+
+
+class HintTrie:
+    """Trie of hint labels.
+
+    Every node keeps the hints of its whole subtree, so narrowing down
+    hints by one typed character is a single dictionary lookup no matter
+    how many hints there are.
+    """
+
+    __slots__ = ("children", "hints")
+
+    def __init__(self, hints: dict[str, Child] | None = None):
+        """Hint trie constructor.
+
+        :param hints: Hints to add to the trie. Ex {"a": Child, "sd":
+            Child}
+        """
+        self.children: dict[str, HintTrie] = {}
+        self.hints: dict[str, Child] = {}
+
+        for label, child in (hints or {}).items():
+            self.add(label, child)
+
+    def add(self, label: str, child: Child):
+        """Add a hint to the trie.
+
+        :param label: The hint label.
+        :param child: The child the label points to.
+        """
+        node = self
+        node.hints[label] = child
+
+        for character in label:
+            node = node.children.setdefault(character, HintTrie())
+            node.hints[label] = child
+
+    def descend(self, character: str) -> HintTrie | None:
+        """Get the subtree of hints continuing with a character.
+
+        :param character: The next typed character.
+        :return: The subtree, or None when no hint continues with the
+            character.
+        """
+        return self.children.get(character)
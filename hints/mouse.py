@@ -8,11 +8,11 @@ Communication.
 
 from __future__ import annotations
 
-from pickle import dumps, loads
-from socket import AF_UNIX, SOCK_STREAM, socket
+from socket import AF_UNIX, MSG_DONTWAIT, SOCK_STREAM, socket
 from typing import TYPE_CHECKING, Any
 
-from hints.constants import SOCKET_MESSAGE_SIZE, UNIX_DOMAIN_SOCKET_FILE
+from hints.constants import SOCKET_READ_SIZE, UNIX_DOMAIN_SOCKET_FILE
+from hints.ipc import MAX_REQUEST_ID, MessageReader, encode_message
 
 KEY_PRESS_STATE: dict[str, Any] = {}
 
@@ -27,6 +27,177 @@ class CouldNotCommunicateWithTheMouseService(Exception):
         return "Could not communicate with the hintsd service. Is it running?"
 
 
+class MouseServiceError(Exception):
+    """Exception to raise when the mouse service fails to handle a request."""
+
+    def __init__(self, method: str, error: str):
+        super().__init__(method, error)
+        self.method = method
+        self.error = error
+
+    def __str__(self):
+        return f"hintsd could not perform '{self.method}': {self.error}"
+
+
+class MouseServiceClient:
+    """Long lived connection to the hintsd service.
+
+    Requests are tagged with an id, so several requests can be sent
+    before their replies are read.
+    """
+
+    def __init__(self, socket_file: str = UNIX_DOMAIN_SOCKET_FILE):
+        """Mouse service client constructor.
+
+        :param socket_file: The hintsd Unix Domain Socket file.
+        """
+        self.socket_file = socket_file
+        self.connection: socket | None = None
+        self.reader = MessageReader()
+        self.last_request_id = 0
+        # request id -> method, for requests that have not been replied to
+        self.pending: dict[int, str] = {}
+        # replies received while waiting for a different request
+        self.replies: dict[int, Any] = {}
+        # requests sent without waiting for their replies
+        self.ignored: set[int] = set()
+
+    def connect(self):
+        """Connect to the mouse service.
+
+        :raises CouldNotCommunicateWithTheMouseService: When the mouse
+            service can't be reached.
+        """
+        self.close()
+        connection = socket(AF_UNIX, SOCK_STREAM)
+
+        try:
+            connection.connect(self.socket_file)
+        except OSError as error:
+            connection.close()
+            raise CouldNotCommunicateWithTheMouseService() from error
+
+        self.connection = connection
+
+    def close(self):
+        """Close the connection, dropping any pending requests."""
+        if self.connection:
+            self.connection.close()
+
+        self.connection = None
+        self.reader = MessageReader()
+        self.pending.clear()
+        self.replies.clear()
+        self.ignored.clear()
+
+    def send(self, method: str, *args, **kwargs) -> int:
+        """Send a request without waiting for its reply.
+
+        :param method: The name of the method to call.
+        :param args: args for the method.
+        :param kwargs: kwargs for the method.
+        :return: The request id, to get the reply with receive.
+        :raises CouldNotCommunicateWithTheMouseService: When the mouse
+            service can't be reached.
+        """
+        self.last_request_id = self.last_request_id % MAX_REQUEST_ID + 1
+        request_id = self.last_request_id
+        message = encode_message(
+            request_id, {"method": method, "args": args, "kwargs": kwargs}
+        )
+
+        # reconnect once, the service might have been restarted since the
+        # last request
+        for attempt in range(2):
+            if not self.connection:
+                self.connect()
+
+            try:
+                self.connection.sendall(message)  # type: ignore[union-attr]
+                break
+            except OSError as error:
+                self.close()
+                if attempt:
+                    raise CouldNotCommunicateWithTheMouseService() from error
+
+        self.pending[request_id] = method
+
+        return request_id
+
+    def post(self, method: str, *args, **kwargs):
+        """Send a request and ignore its reply.
+
+        :param method: The name of the method to call.
+        :param args: args for the method.
+        :param kwargs: kwargs for the method.
+        """
+        self.ignored.add(self.send(method, *args, **kwargs))
+        # discard replies that already arrived, without waiting for more
+        self.read_replies(block=False)
+
+    def read_replies(self, block: bool = True):
+        """Read replies from the connection.
+
+        :param block: Whether to wait for data.
+        :raises CouldNotCommunicateWithTheMouseService: When the
+            connection to the mouse service is lost.
+        """
+        try:
+            data = self.connection.recv(  # type: ignore[union-attr]
+                SOCKET_READ_SIZE, 0 if block else MSG_DONTWAIT
+            )
+        except BlockingIOError:
+            return
+        except (AttributeError, OSError) as error:
+            self.close()
+            raise CouldNotCommunicateWithTheMouseService() from error
+
+        if not data:
+            self.close()
+            raise CouldNotCommunicateWithTheMouseService()
+
+        for reply_id, reply in self.reader.feed(data):
+            if reply_id in self.ignored:
+                self.ignored.discard(reply_id)
+                self.pending.pop(reply_id, None)
+            else:
+                self.replies[reply_id] = reply
+
+    def receive(self, request_id: int) -> Any:
+        """Wait for the reply to a request.
+
+        :param request_id: The id returned by send.
+        :return: The payload sent back from the mouse service.
+        :raises CouldNotCommunicateWithTheMouseService: When the
+            connection to the mouse service is lost.
+        :raises MouseServiceError: When the mouse service could not
+            handle the request.
+        """
+        while request_id not in self.replies:
+            self.read_replies()
+
+        reply = self.replies.pop(request_id)
+        method = self.pending.pop(request_id, "")
+
+        if "error" in reply:
+            raise MouseServiceError(method, reply["error"])
+
+        return reply.get("result")
+
+    def request(self, method: str, *args, **kwargs) -> Any:
+        """Send a request and wait for its reply.
+
+        :param method: The name of the method to call.
+        :param args: args for the method.
+        :param kwargs: kwargs for the method.
+        :return: The payload sent back from the mouse service.
+        """
+        return self.receive(self.send(method, *args, **kwargs))
+
+
+MOUSE_SERVICE_CLIENT = MouseServiceClient()
+
+
 def send_message(method: str, *args, **kwargs) -> Any:
     """Send message to hint-mouse service.
 
@@ -37,18 +208,7 @@ def send_message(method: str, *args, **kwargs) -> Any:
     :raises CouldNotCommunicateWithTheMouseService: When the sock file
         does not exist (the mouse service creates this file).
     """
-    with socket(AF_UNIX, SOCK_STREAM) as client:
-        client.connect(UNIX_DOMAIN_SOCKET_FILE)
-        client.sendall(
-            dumps(
-                {
-                    "method": method,
-                    "args": args,
-                    "kwargs": kwargs,
-                }
-            )
-        )
-        return loads(client.recv(SOCKET_MESSAGE_SIZE))
+    return MOUSE_SERVICE_CLIENT.request(method, *args, **kwargs)
 
 
 def scroll(x: int, y: int, *_args, **_kwargs):
@@ -103,16 +263,141 @@ def click(
     )
 
 
-def do_mouse_action(
-    key_press_state: dict[str, Any],
-    key: str,
-    mode: MouseMode,
+def drag(
+    start_x: int,
+    start_y: int,
+    end_x: int,
+    end_y: int,
+    duration: float,
+    button: MouseButton,
 ):
-    """Perform mouse action.
+    """Drag from one position to another.
+
+    hintsd presses the button, moves through interpolated positions and
+    releases the button, from this single request.
+
+    :param start_x: X position to start dragging from.
+    :param start_y: Y position to start dragging from.
+    :param end_x: X position to drop at.
+    :param end_y: Y position to drop at.
+    :param duration: Seconds to move from the start to the end.
+    :param button: Button to drag with.
+    """
+    send_message("drag", start_x, start_y, end_x, end_y, duration, button.value)
+
+
+def start_mouse_motion(key: str, mode: MouseMode):
+    """Start moving or scrolling in the direction of a key until it is
+    released.
 
-    :param key_press_state: State containing key press event data used
-        for ramping up speeds.
-    :param key: The key to perform a mouse action for.
+    :param key: The direction key that went down.
     :param mode: The mouse mode.
     """
-    return send_message("do_mouse_action", key_press_state, key, mode.value)
+    MOUSE_SERVICE_CLIENT.post("start_mouse_motion", key, mode.value)
+
+
+def stop_mouse_motion(key: str | None = None):
+    """Stop moving or scrolling in the direction of a key.
+
+    :param key: The direction key that went up, or None to stop all
+        motion.
+    """
+    MOUSE_SERVICE_CLIENT.post("stop_mouse_motion", key)
+
+
+def get_focused_window_snapshot(window_system_id: str) -> Any:
+    """Get what the hintsd focus tracker knows about the focused window.
+
+    Window systems use this before querying the compositor themselves.
+
+    :param window_system_id: The id of the window system asking.
+    :return: The focused window, in the form the window system tracks it
+        in (see hints.focus_tracker), or None when hintsd is not tracking
+        the focus for this window system.
+    """
+    try:
+        snapshot = send_message("get_focused_window")
+    except (CouldNotCommunicateWithTheMouseService, MouseServiceError):
+        return None
+
+    if snapshot and snapshot["window_system"] == window_system_id:
+        return snapshot["focused_window"]
+
+    return None
+
+
+def get_mouse_service_stats() -> dict[str, Any]:
+    """Get latency and write statistics from the mouse service.
+
+    :return: The statistics (see MouseServiceStats.to_dict).
+    """
+    return send_message("stats")
+
+
+class MouseScript:
+    """Ordered mouse operations that hintsd performs from a single message.
+
+    Operations can be chained, for example:
+    MouseScript().move(0, 1, absolute=False).move(0, -1, absolute=False).run()
+    """
+
+    def __init__(self):
+        self.operations: list[list[Any]] = []
+
+    def move(self, x: int, y: int, absolute: bool = True) -> MouseScript:
+        """Move the mouse.
+
+        :param x: X move direction / position.
+        :param y: Y move direction / position.
+        :param absolute: Whether to move the mouse using an absolute
+            position.
+        :return: The script.
+        """
+        self.operations.append(["move", x, y, absolute])
+        return self
+
+    def button(
+        self, button: MouseButton, button_state: MouseButtonState
+    ) -> MouseScript:
+        """Press or release a button.
+
+        :param button: Button to use.
+        :param button_state: Button state (button down / button up).
+        :return: The script.
+        """
+        self.operations.append(["button", button.value, button_state.value])
+        return self
+
+    def scroll(self, x: int, y: int) -> MouseScript:
+        """Scroll.
+
+        :param x: X scroll direction.
+        :param y: Y scroll direction.
+        :return: The script.
+        """
+        self.operations.append(["scroll", x, y])
+        return self
+
+    def wait(self, seconds: float) -> MouseScript:
+        """Wait before the next operation.
+
+        :param seconds: Seconds to wait. hintsd shortens waits longer than
+            the "mouse_script_max_wait" setting.
+        :return: The script.
+        """
+        self.operations.append(["wait", seconds])
+        return self
+
+    def repeat(self, times: int, script: MouseScript) -> MouseScript:
+        """Repeat the operations of another script.
+
+        :param times: Times to repeat the script.
+        :param script: The script to repeat.
+        :return: The script.
+        """
+        self.operations.append(["repeat", times, script.operations])
+        return self
+
+    def run(self):
+        """Send the script to hintsd to perform it."""
+        send_message("run_script", self.operations)
@@ -0,0 +1,212 @@
+"""Continuous mouse motion for hintsd.
+
+Clients tell hintsd when a direction key goes down and up, and hintsd
+moves or scrolls at a fixed frame rate while the key is held, speeding
+up the same way key repeats used to. This
+keeps motion smooth regardless of the keyboard repeat rate, with two
+messages per key press instead of one per key repeat.
+
+Scrolling uses high resolution scroll events and, once keys are released,
+keeps going while slowing down (inertia).
+"""
+
+from __future__ import annotations
+
+from math import exp
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from gi import require_version
+
+from hints.constants import HI_RES_SCROLL_UNITS
+from hints.mouse_enums import MouseMode
+
+require_version("GLib", "2.0")
+from gi.repository import GLib
+
+if TYPE_CHECKING:
+    from hints.mouse_service import Mouse
+    from hints.utils import HintsConfig
+
+# Key repeats per second the sensitivity settings were tuned for, used to
+# turn "pixels per key repeat" into pixels per second.
+KEY_REPEAT_RATE = 25
+# inertial scrolling stops below this speed (wheel notches per second)
+MIN_INERTIA_SPEED = 0.5
+
+
+class MouseMotion:
+    """Move or scroll the mouse while direction keys are held."""
+
+    def __init__(self, mouse: Mouse, config: HintsConfig):
+        """Mouse motion constructor.
+
+        :param mouse: Mouse to move.
+        :param config: Hints config.
+        """
+        self.mouse = mouse
+        self.config = config
+        # key -> direction (x, y)
+        self.held_keys: dict[str, tuple[int, int]] = {}
+        self.mode = MouseMode.MOVE
+        self.start_time = 0.0
+        self.last_frame_time = 0.0
+        # sub unit motion carried over to the next frame
+        self.remainder_x = 0.0
+        self.remainder_y = 0.0
+        # speed per axis in the last frame (units per second)
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+        self.timeout = 0
+
+    def get_directions(self, mode: MouseMode) -> dict[str, tuple[int, int]]:
+        """Get the direction for each motion key of a mode.
+
+        :param mode: The mouse mode.
+        :return: Key -> direction (x, y).
+        """
+        config = self.config
+
+        if mode == MouseMode.SCROLL:
+            return {
+                config["mouse_scroll_left"]: (-1, 0),
+                config["mouse_scroll_right"]: (1, 0),
+                config["mouse_scroll_up"]: (0, 1),
+                config["mouse_scroll_down"]: (0, -1),
+            }
+
+        return {
+            config["mouse_move_left"]: (-1, 0),
+            config["mouse_move_right"]: (1, 0),
+            config["mouse_move_up"]: (0, -1),
+            config["mouse_move_down"]: (0, 1),
+        }
+
+    def get_speed(self, elapsed: float) -> float:
+        """Get the speed for how long keys have been held.
+
+        :param elapsed: Seconds since motion started.
+        :return: Speed in pixels (or scroll units) per second.
+        """
+        if self.mode == MouseMode.SCROLL:
+            sensitivity = self.config["mouse_scroll_pixel_sensitivity"]
+            rampup_time = self.config["mouse_scroll_rampup_time"]
+        else:
+            sensitivity = self.config["mouse_move_pixel_sensitivity"]
+            rampup_time = self.config["mouse_move_rampup_time"]
+
+        # after the rampup time, every key repeat added the sensitivity to
+        # the distance of the next step
+        step = sensitivity * (1 + max(0, elapsed - rampup_time) * KEY_REPEAT_RATE)
+
+        return step * KEY_REPEAT_RATE
+
+    def start(self, key: str, mode: MouseMode | int):
+        """Start moving in the direction of a key.
+
+        :param key: The direction key that went down.
+        :param mode: The mouse mode.
+        """
+        mode = MouseMode(mode)
+        direction = self.get_directions(mode).get(key)
+
+        if not direction:
+            return
+
+        if not self.held_keys or mode != self.mode:
+            self.stop()
+            self.mode = mode
+            self.start_time = monotonic()
+            self.last_frame_time = self.start_time
+
+        self.held_keys[key] = direction
+
+        if not self.timeout:
+            # move right away instead of waiting for the first frame
+            self.on_frame(first_frame=True)
+            self.timeout = GLib.timeout_add(
+                max(1, round(1000 / self.config["mouse_motion_frame_rate"])),
+                self.on_frame,
+                priority=GLib.PRIORITY_HIGH,
+            )
+
+    def stop(self, key: str | None = None):
+        """Stop moving in the direction of a key.
+
+        When the last key is released while scrolling, scrolling slows
+        down before stopping (if inertia is enabled).
+
+        :param key: The direction key that went up, or None to stop all
+            motion right away.
+        """
+        if key is None:
+            self.held_keys.clear()
+        else:
+            self.held_keys.pop(key, None)
+
+        coasting = (
+            key is not None
+            and self.mode == MouseMode.SCROLL
+            and self.config["mouse_scroll_inertia"]
+        )
+
+        if not self.held_keys and not coasting:
+            self.halt()
+
+    def halt(self):
+        """Stop all motion right away."""
+        if self.timeout:
+            GLib.source_remove(self.timeout)
+            self.timeout = 0
+
+        self.held_keys.clear()
+        self.remainder_x = 0.0
+        self.remainder_y = 0.0
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+
+    def on_frame(self, first_frame: bool = False):
+        """Move for the time elapsed since the last frame.
+
+        :param first_frame: Whether this is the frame for a key that just
+            went down, which moves one key repeat worth of distance.
+        """
+        now = monotonic()
+        elapsed = (1 / KEY_REPEAT_RATE) if first_frame else now - self.last_frame_time
+        self.last_frame_time = now
+
+        if self.held_keys:
+            speed = self.get_speed(now - self.start_time)
+            self.velocity_x = speed * sum(x for x, _ in self.held_keys.values())
+            self.velocity_y = speed * sum(y for _, y in self.held_keys.values())
+        else:
+            # coasting after keys were released
+            friction = exp(-self.config["mouse_scroll_inertia_friction"] * elapsed)
+            self.velocity_x *= friction
+            self.velocity_y *= friction
+
+            if max(abs(self.velocity_x), abs(self.velocity_y)) < MIN_INERTIA_SPEED:
+                # returning SOURCE_REMOVE removes the timeout calling this
+                self.timeout = 0
+                self.halt()
+                return GLib.SOURCE_REMOVE
+
+        # scroll speeds are in wheel notches, scroll in fractions of a notch
+        units = HI_RES_SCROLL_UNITS if self.mode == MouseMode.SCROLL else 1
+
+        self.remainder_x += self.velocity_x * elapsed * units
+        self.remainder_y += self.velocity_y * elapsed * units
+        x = int(self.remainder_x)
+        y = int(self.remainder_y)
+        self.remainder_x -= x
+        self.remainder_y -= y
+
+        if x or y:
+            if self.mode == MouseMode.SCROLL:
+                self.mouse.execute(self.mouse.get_hi_res_scroll_steps(x, y))
+            else:
+                self.mouse.execute(
+                    self.mouse.get_move_steps(x, y, absolute=False, pause=0)
+                )
+
+        return GLib.SOURCE_CONTINUE
@@ -0,0 +1,109 @@
+"""Timed mouse event scheduler for hintsd.
+
+Some window systems need a pause between mouse device writes to register
+them. Instead of sleeping (which blocks hintsd and every client waiting
+on it), steps are queued and written from GLib timeouts on a monotonic
+clock.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from math import ceil
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from gi import require_version
+
+require_version("GLib", "2.0")
+from gi.repository import GLib
+
+if TYPE_CHECKING:
+    from evdev import UInput
+
+    from hints.mouse_stats import CommandRecord, MouseServiceStats
+
+# device to write to (None to only pause), events (type, code, value), and
+# seconds to pause after writing
+MouseStep = tuple["UInput | None", list[tuple[int, int, int]], float]
+
+
+class MouseStepScheduler:
+    """Write mouse steps in order, pausing between them without blocking."""
+
+    def __init__(self, stats: MouseServiceStats | None = None):
+        """Mouse step scheduler constructor.
+
+        :param stats: Statistics to count writes in.
+        """
+        self.stats = stats
+        # command steps scheduled now belong to (see MouseServiceStats)
+        self.current_command: CommandRecord | None = None
+        self.steps: deque[tuple[MouseStep, CommandRecord | None]] = deque()
+        # monotonic time the next step can be written at
+        self.next_step_time = 0.0
+        self.timeout = 0
+
+    def schedule(self, steps: list[MouseStep]):
+        """Queue steps to write after any steps already queued.
+
+        Steps that are due are written right away.
+
+        :param steps: Steps to write, in order.
+        """
+        command = self.current_command
+
+        if command:
+            command.pending_steps += len(steps)
+
+        self.steps.extend((step, command) for step in steps)
+
+        if not self.timeout:
+            self.write_due_steps()
+
+    def clear(self):
+        """Drop queued steps.
+
+        The commands they belong to are recorded as cancelled.
+        """
+        if self.timeout:
+            GLib.source_remove(self.timeout)
+            self.timeout = 0
+
+        while self.steps:
+            _, command = self.steps.popleft()
+
+            if command:
+                command.step_dropped()
+
+    def write_due_steps(self):
+        """Write steps until one needs a pause, then wait for it."""
+        self.timeout = 0
+
+        while self.steps:
+            now = monotonic()
+
+            if now < self.next_step_time:
+                self.timeout = GLib.timeout_add(
+                    ceil((self.next_step_time - now) * 1000),
+                    self.write_due_steps,
+                    priority=GLib.PRIORITY_HIGH,
+                )
+                break
+
+            (device, events, pause), command = self.steps.popleft()
+
+            if device:
+                for event_type, code, value in events:
+                    device.write(event_type, code, value)
+                device.syn()
+
+                if self.stats:
+                    self.stats.add_writes(len(events))
+
+            if command:
+                command.step_written(len(events) if device else 0)
+
+            self.next_step_time = now + pause
+
+        return GLib.SOURCE_REMOVE
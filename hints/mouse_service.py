@@ -9,29 +9,72 @@ process when creating virutal devices.
 
 from __future__ import annotations
 
+import logging
 import socket
+import sys
+from argparse import ArgumentParser
+from functools import partial
+from json import dumps
 from os import path, remove
-from pickle import dumps, loads
 from signal import SIGINT, signal
-from time import sleep, time
+from time import monotonic
 from typing import TYPE_CHECKING, Any, Iterable
 
 from evdev import AbsInfo, UInput, ecodes
 from gi import require_version
 
-from hints.constants import SOCKET_MESSAGE_SIZE, UNIX_DOMAIN_SOCKET_FILE
-from hints.mouse_enums import MouseButton, MouseMode
-from hints.utils import load_config
+from hints.config_watcher import ConfigWatcher
+from hints.constants import (
+    HI_RES_SCROLL_UNITS,
+    SOCKET_READ_SIZE,
+    UNIX_DOMAIN_SOCKET_FILE,
+)
+from hints.focus_tracker import FocusTracker
+from hints.ipc import InvalidMessageError, MessageReader, encode_message
+from hints.mouse import (
+    CouldNotCommunicateWithTheMouseService,
+    get_mouse_service_stats,
+)
+from hints.mouse_enums import MouseButton, MouseButtonState, MouseMode
+from hints.mouse_motion import MouseMotion
+from hints.mouse_scheduler import MouseStepScheduler
+from hints.mouse_stats import MouseServiceStats
+from hints.utils import HintsConfig, InvalidConfigError, compile_config, load_config
+from hints.window_systems.exceptions import CouldNotIdentifyWindowSystemType
+from hints.window_systems.window_system_type import get_window_system_id
 
 require_version("Gdk", "3.0")
 require_version("Gtk", "3.0")
 from gi.repository import Gdk, GLib, Gtk
 
 if TYPE_CHECKING:
-    from hints.mouse_enums import MouseButtonState
+    from hints.mouse_scheduler import MouseStep
 
-MOUSE_SERVICE_LOOP_MS_INTERVAL = 10
-config = load_config()
+logger = logging.getLogger(__name__)
+
+MOUSE_SERVICE_CONNECTION_BACKLOG = 16
+MAX_SCRIPT_STEPS = 10000
+# range of the absolute mouse device axes, screen positions are scaled to it
+ABSOLUTE_AXIS_MAX = 65535
+
+
+def load_service_config() -> HintsConfig:
+    """Load the config, falling back to the default config.
+
+    The service keeps running with an invalid config file, and picks up
+    the config once it is fixed (see ConfigWatcher).
+
+    :return: The config.
+    """
+    try:
+        return load_config()
+    except InvalidConfigError as error:
+        logger.error("%s Using the default config.", error)
+        # the default config, with enums resolved like a loaded config
+        return compile_config(None)
+
+
+config = load_service_config()
 
 
 class Mouse:
@@ -40,10 +83,42 @@ class Mouse:
     This uses uinput to support both X11 and Wayland.
     """
 
-    def __init__(self, abs_max_width=10000, abs_max_height=10000, write_pause=0.03):
+    def __init__(
+        self,
+        screen_width=10000,
+        screen_height=10000,
+        write_pause=0.03,
+        scheduler: MouseStepScheduler | None = None,
+        frame_rate=60,
+        max_script_wait=5.0,
+    ):
+        """Mouse constructor.
+
+        The devices are created once. The absolute device uses a fixed
+        range that positions are scaled to, so screen size changes only
+        update the scale (see set_screen_size).
+
+        :param screen_width: Screen width, the maximum x position for
+            absolute movement.
+        :param screen_height: Screen height, the maximum y position for
+            absolute movement.
+        :param write_pause: Seconds to pause after writes, for window
+            systems that need time to register them.
+        :param scheduler: Scheduler used to write to the devices.
+        :param frame_rate: Moves per second for interpolated motion
+            (like drags).
+        :param max_script_wait: Longest wait, in seconds, a script can
+            ask for. Longer waits are shortened to it.
+        """
 
         keys = [button.value for button in MouseButton]
         self.write_pause = write_pause
+        self.frame_rate = frame_rate
+        self.max_script_wait = max_script_wait
+        self.scheduler = scheduler or MouseStepScheduler()
+        self.absolute_x_scale = 1.0
+        self.absolute_y_scale = 1.0
+        self.set_screen_size(screen_width, screen_height)
 
         self.relative_mouse = UInput(
             {
@@ -53,10 +128,14 @@ class Mouse:
                     ecodes.REL_Y,
                     ecodes.REL_HWHEEL,
                     ecodes.REL_WHEEL,
+                    ecodes.REL_HWHEEL_HI_RES,
+                    ecodes.REL_WHEEL_HI_RES,
                 ],
             },
             name="Hints relative mouse",
         )
+        # high resolution scroll units not sent as wheel notches yet (x, y)
+        self.hi_res_scroll_remainder = [0, 0]
 
         self.absolute_mouse = UInput(
             {
@@ -67,7 +146,7 @@ class Mouse:
                         AbsInfo(
                             value=0,
                             min=0,
-                            max=abs_max_width,
+                            max=ABSOLUTE_AXIS_MAX,
                             fuzz=0,
                             flat=0,
                             resolution=0,
@@ -78,7 +157,7 @@ class Mouse:
                         AbsInfo(
                             value=0,
                             min=0,
-                            max=abs_max_height,
+                            max=ABSOLUTE_AXIS_MAX,
                             fuzz=0,
                             flat=0,
                             resolution=0,
@@ -89,6 +168,300 @@ class Mouse:
             name="Hints absolute mouse",
         )
 
+    def set_screen_size(self, screen_width: int, screen_height: int):
+        """Update the scale from screen positions to absolute device
+        positions.
+
+        :param screen_width: Screen width.
+        :param screen_height: Screen height.
+        """
+        self.absolute_x_scale = ABSOLUTE_AXIS_MAX / max(1, screen_width)
+        self.absolute_y_scale = ABSOLUTE_AXIS_MAX / max(1, screen_height)
+
+    def close(self):
+        """Release the mouse devices."""
+        self.scheduler.clear()
+        self.relative_mouse.close()
+        self.absolute_mouse.close()
+
+    def execute(self, steps: list[MouseStep]):
+        """Write steps to the mouse devices.
+
+        Steps are scheduled after any steps still waiting to be written,
+        so this returns without waiting for the pauses between steps.
+
+        :param steps: Steps to write, in order.
+        """
+        self.scheduler.schedule(steps)
+
+    def get_scroll_steps(self, x: int, y: int) -> list[MouseStep]:
+        """Get the steps to scroll.
+
+        :param x: X scroll direction.
+        :param y: Y scroll direction.
+        :return: Steps.
+        """
+        # the device advertises high resolution scrolling, so consumers
+        # like libinput only read the high resolution events
+        return [
+            (
+                self.relative_mouse,
+                [
+                    (ecodes.EV_REL, ecodes.REL_HWHEEL, int(x)),
+                    (ecodes.EV_REL, ecodes.REL_WHEEL, int(y)),
+                    (
+                        ecodes.EV_REL,
+                        ecodes.REL_HWHEEL_HI_RES,
+                        int(x) * HI_RES_SCROLL_UNITS,
+                    ),
+                    (
+                        ecodes.EV_REL,
+                        ecodes.REL_WHEEL_HI_RES,
+                        int(y) * HI_RES_SCROLL_UNITS,
+                    ),
+                ],
+                0,
+            )
+        ]
+
+    def get_hi_res_scroll_steps(self, x: int, y: int) -> list[MouseStep]:
+        """Get the steps to scroll by fractions of a wheel notch.
+
+        Wheel notch events are sent too, whenever the high resolution
+        units add up to a notch, for consumers that only read those.
+
+        :param x: X scroll in 1/HI_RES_SCROLL_UNITS of a notch.
+        :param y: Y scroll in 1/HI_RES_SCROLL_UNITS of a notch.
+        :return: Steps.
+        """
+        events = []
+
+        for axis, units, notch_code, hi_res_code in (
+            (0, int(x), ecodes.REL_HWHEEL, ecodes.REL_HWHEEL_HI_RES),
+            (1, int(y), ecodes.REL_WHEEL, ecodes.REL_WHEEL_HI_RES),
+        ):
+            if not units:
+                continue
+
+            self.hi_res_scroll_remainder[axis] += units
+            # truncate towards zero so both directions behave the same
+            notches = int(self.hi_res_scroll_remainder[axis] / HI_RES_SCROLL_UNITS)
+            self.hi_res_scroll_remainder[axis] -= notches * HI_RES_SCROLL_UNITS
+
+            events.append((ecodes.EV_REL, hi_res_code, units))
+            if notches:
+                events.append((ecodes.EV_REL, notch_code, notches))
+
+        return [(self.relative_mouse, events, 0)] if events else []
+
+    def get_move_steps(
+        self, x: int, y: int, absolute: bool = True, pause: float | None = None
+    ) -> list[MouseStep]:
+        """Get the steps to move.
+
+        :param X: X move direction.
+        :param y: Y move direction.
+        :param absolute: Whether to move the mouse using an absolute
+            position.
+        :param pause: Seconds to pause after moving, defaults to the
+            write pause.
+        :return: Steps.
+        """
+        if pause is None:
+            pause = self.write_pause
+
+        if absolute:
+            return [
+                (
+                    self.absolute_mouse,
+                    [
+                        (
+                            ecodes.EV_ABS,
+                            ecodes.ABS_X,
+                            min(
+                                max(round(x * self.absolute_x_scale), 0),
+                                ABSOLUTE_AXIS_MAX,
+                            ),
+                        ),
+                        (
+                            ecodes.EV_ABS,
+                            ecodes.ABS_Y,
+                            min(
+                                max(round(y * self.absolute_y_scale), 0),
+                                ABSOLUTE_AXIS_MAX,
+                            ),
+                        ),
+                    ],
+                    pause,
+                )
+            ]
+
+        return [
+            (
+                self.relative_mouse,
+                [
+                    (ecodes.EV_REL, ecodes.REL_X, int(x)),
+                    (ecodes.EV_REL, ecodes.REL_Y, int(y)),
+                ],
+                pause,
+            )
+        ]
+
+    def get_button_steps(
+        self, button: MouseButton | int, button_state: MouseButtonState | int
+    ) -> list[MouseStep]:
+        """Get the steps to press or release a button.
+
+        :param button: Button to use, or its value.
+        :param button_state: Button state (button down / button up), or
+            its value.
+        :return: Steps.
+        :raises ValueError: When the button or button state is not valid.
+        """
+        return [
+            (
+                self.relative_mouse,
+                [
+                    (
+                        ecodes.EV_KEY,
+                        MouseButton(button).value,
+                        MouseButtonState(button_state).value,
+                    )
+                ],
+                self.write_pause,
+            )
+        ]
+
+    def get_click_steps(
+        self,
+        x: int,
+        y: int,
+        button: MouseButton | int,
+        button_states: Iterable[MouseButtonState | int],
+        repeat: int = 1,
+        absolute: bool = True,
+    ) -> list[MouseStep]:
+        """Get the steps to click.
+
+        :param x: X position to click.
+        :param y: Y position to click.
+        :param button: Button to use for click.
+        :param actions: Actions to use for the click button (button down
+            / button up).
+        :param repeat: Times to repeat a click.
+        :param absolute: Whether the click position is absolute.
+        :return: Steps.
+        """
+        steps = self.get_move_steps(x, y, absolute=absolute)
+
+        for _ in range(repeat):
+            for button_state in button_states:
+                steps += self.get_button_steps(button, button_state)
+
+        if absolute:
+            # small move to clear previous write incase the previous move wants
+            # to be repeated
+            steps += self.get_move_steps(x + 1, y, absolute=True)
+            steps += self.get_move_steps(x - 1, y, absolute=True)
+
+        return steps
+
+    def get_drag_steps(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration: float,
+        button: int = MouseButton.LEFT.value,
+    ) -> list[MouseStep]:
+        """Get the steps to drag from one position to another.
+
+        The button is pressed at the start, the mouse moves through
+        interpolated positions (one per frame), then the button is
+        released at the end. Many applications only recognize drags that
+        have motion events between the press and the release.
+
+        :param start_x: X position to start dragging from.
+        :param start_y: Y position to start dragging from.
+        :param end_x: X position to drop at.
+        :param end_y: Y position to drop at.
+        :param duration: Seconds to move from the start to the end.
+        :param button: Button to drag with.
+        :return: Steps.
+        :raises ValueError: When the drag is too long.
+        """
+        frames = max(1, round(duration * self.frame_rate))
+
+        if frames > MAX_SCRIPT_STEPS:
+            raise ValueError("drag is too long")
+
+        frame_time = duration / frames
+
+        steps = self.get_move_steps(start_x, start_y, absolute=True)
+        steps += self.get_button_steps(button, MouseButtonState.DOWN.value)
+
+        for frame in range(1, frames + 1):
+            progress = frame / frames
+            # ease in and out, so the drag starts and ends slowly like a hand
+            eased = progress * progress * (3 - 2 * progress)
+            steps += self.get_move_steps(
+                start_x + (end_x - start_x) * eased,
+                start_y + (end_y - start_y) * eased,
+                absolute=True,
+                # let the drop target register the last move before releasing
+                pause=(
+                    max(frame_time, self.write_pause) if frame == frames else frame_time
+                ),
+            )
+
+        steps += self.get_button_steps(button, MouseButtonState.UP.value)
+
+        return steps
+
+    def get_script_steps(self, operations: list[list[Any]]) -> list[MouseStep]:
+        """Get the steps for a script of mouse operations.
+
+        Operations are lists starting with the operation name:
+
+        - ["move", x, y, absolute]
+        - ["button", button, button_state]
+        - ["scroll", x, y]
+        - ["wait", seconds]
+        - ["repeat", times, operations]
+
+        Waits longer than max_script_wait are shortened to it.
+
+        :param operations: Operations to perform, in order.
+        :return: Steps.
+        :raises ValueError: When an operation is not valid or the script
+            is too long.
+        """
+        steps: list[MouseStep] = []
+
+        for operation in operations:
+            match operation:
+                case ["move", x, y, absolute]:
+                    steps += self.get_move_steps(x, y, absolute=absolute)
+                case ["button", button, button_state]:
+                    steps += self.get_button_steps(button, button_state)
+                case ["scroll", x, y]:
+                    steps += self.get_scroll_steps(x, y)
+                case ["wait", int() | float() as seconds] if seconds >= 0:
+                    steps.append((None, [], min(float(seconds), self.max_script_wait)))
+                case ["repeat", times, repeated_operations]:
+                    repeated_steps = self.get_script_steps(repeated_operations)
+                    if len(repeated_steps) * int(times) > MAX_SCRIPT_STEPS:
+                        raise ValueError("mouse script is too long")
+                    steps += repeated_steps * int(times)
+                case _:
+                    raise ValueError(f"invalid mouse operation {operation}")
+
+            if len(steps) > MAX_SCRIPT_STEPS:
+                raise ValueError("mouse script is too long")
+
+        return steps
+
     def scroll(self, x: int, y: int, *_args, **_kwargs):
         """Scroll event.
 
@@ -97,9 +470,7 @@ class Mouse:
             the same interface as move. :param **_kwargs: Extra kwargs
             to use the same interface as move.
         """
-        self.relative_mouse.write(ecodes.EV_REL, ecodes.REL_HWHEEL, int(x))
-        self.relative_mouse.write(ecodes.EV_REL, ecodes.REL_WHEEL, int(y))
-        self.relative_mouse.syn()
+        self.execute(self.get_scroll_steps(x, y))
 
     def move(self, x: int, y: int, absolute: bool = True):
         """Move event.
@@ -109,18 +480,7 @@ class Mouse:
         :param absolute: Whether to move the mouse using an absolute
             position.
         """
-
-        if absolute:
-            self.absolute_mouse.write(ecodes.EV_ABS, ecodes.ABS_X, int(x))
-            self.absolute_mouse.write(ecodes.EV_ABS, ecodes.ABS_Y, int(y))
-            self.absolute_mouse.syn()
-
-        else:
-            self.relative_mouse.write(ecodes.EV_REL, ecodes.REL_X, int(x))
-            self.relative_mouse.write(ecodes.EV_REL, ecodes.REL_Y, int(y))
-            self.relative_mouse.syn()
-
-        sleep(self.write_pause)
+        self.execute(self.get_move_steps(x, y, absolute=absolute))
 
     def click(
         self,
@@ -141,80 +501,153 @@ class Mouse:
         :param repeat: Times to repeat a click.
         :param absolute: Whether the click position is absolute.
         """
-        self.move(x, y, absolute=absolute)
-
-        for _ in range(repeat):
-            for button_state in button_states:
-                self.relative_mouse.write(ecodes.EV_KEY, button, button_state)
-                self.relative_mouse.syn()
-                sleep(self.write_pause)
-
-        if absolute:
-            # small move to clear previous write incase the previous move wants
-            # to be repeated
-            self.move(x + 1, y, absolute=True)
-            self.move(x - 1, y, absolute=True)
+        self.execute(
+            self.get_click_steps(
+                x, y, button, button_states, repeat=repeat, absolute=absolute
+            )
+        )
 
-    def do_mouse_action(
+    def drag(
         self,
-        key_press_state: dict[str, Any],
-        key: str,
-        mode: MouseMode,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration: float,
+        button: int = MouseButton.LEFT.value,
     ):
-        """Perform mouse action.
+        """Drag event.
+
+        :param start_x: X position to start dragging from.
+        :param start_y: Y position to start dragging from.
+        :param end_x: X position to drop at.
+        :param end_y: Y position to drop at.
+        :param duration: Seconds to move from the start to the end.
+        :param button: Button to drag with.
+        """
+        self.execute(
+            self.get_drag_steps(start_x, start_y, end_x, end_y, duration, button)
+        )
 
-        :param key_press_state: State containing key press event data
-            used for ramping up speeds.
-        :param key: The key to perform a mouse action for.
-        :param mode: The mouse mode.
+    def run_script(self, operations: list[list[Any]]):
+        """Perform a script of mouse operations in one go.
+
+        :param operations: Operations to perform, in order (see
+            get_script_steps).
+        """
+        self.execute(self.get_script_steps(operations))
+
+
+def get_configured_window_system_id() -> str:
+    """Get the id of the window system in use, unless the config sets it.
+
+    :return: The window system id, empty when it can't be identified.
+    """
+    window_system_id = config["window_system"]
+
+    if not window_system_id:
+        try:
+            window_system_id = get_window_system_id()
+        except CouldNotIdentifyWindowSystemType:
+            logger.debug("Could not identify the window system.")
+
+    return window_system_id
+
+
+def get_write_pause() -> float:
+    """Get the pause between mouse device writes for the window system.
+
+    :return: Seconds to pause after writes.
+    """
+    write_pauses = config["mouse_write_pause"]
+
+    return write_pauses.get(get_configured_window_system_id(), write_pauses["default"])
+
+
+class MouseServiceConnection:
+    """Connection from a hints process to the mouse service."""
+
+    def __init__(self, connection: socket.socket):
+        """Mouse service connection constructor.
+
+        :param connection: The accepted (non-blocking) socket.
         """
-        key_press_state.setdefault("start_time", time())
-
-        sensitivity = 1
-        rampup_time = 1
-        mouse_navigation_action = self.move
-        left = "h"
-        right = "l"
-        up = "k"
-        down = "j"
-
-        if mode == MouseMode.MOVE.value:
-            sensitivity = config["mouse_move_pixel_sensitivity"]
-            rampup_time = config["mouse_move_rampup_time"]
-            left = config["mouse_move_left"]
-            right = config["mouse_move_right"]
-
-            # up and down are intentionally switched to keep the logic the same
-            # as scrol
-            up = config["mouse_move_down"]
-            down = config["mouse_move_up"]
-
-            mouse_navigation_action = self.move
-
-        elif mode == MouseMode.SCROLL.value:
-            sensitivity = config["mouse_scroll_pixel_sensitivity"]
-            rampup_time = config["mouse_scroll_rampup_time"]
-            left = config["mouse_scroll_left"]
-            right = config["mouse_scroll_right"]
-            up = config["mouse_scroll_up"]
-            down = config["mouse_scroll_down"]
-            mouse_navigation_action = self.scroll
-
-        key_press_state.setdefault("sensitivity", sensitivity)
-
-        if time() - key_press_state["start_time"] >= rampup_time:
-            key_press_state["sensitivity"] += sensitivity
-
-        if key == left:
-            mouse_navigation_action(-key_press_state["sensitivity"], 0, absolute=False)
-        if key == right:
-            mouse_navigation_action(key_press_state["sensitivity"], 0, absolute=False)
-        if key == up:
-            mouse_navigation_action(0, key_press_state["sensitivity"], absolute=False)
-        if key == down:
-            mouse_navigation_action(0, -key_press_state["sensitivity"], absolute=False)
-
-        return key_press_state
+        self.connection = connection
+        self.reader = MessageReader()
+        self.outgoing = bytearray()
+        self.read_watch = 0
+        self.write_watch = 0
+
+    def read(self) -> tuple[list[tuple[int, Any]], bool]:
+        """Read the requests that have been received.
+
+        :return: Complete requests (request_id, payload) and whether the
+            connection was closed by the client.
+        :raises InvalidMessageError: When the client sends an invalid
+            message.
+        """
+        requests = []
+
+        while True:
+            try:
+                data = self.connection.recv(SOCKET_READ_SIZE)
+            except BlockingIOError:
+                return requests, False
+
+            if not data:
+                return requests, True
+
+            requests.extend(self.reader.feed(data))
+
+    def write(self, request_id: int, reply: dict[str, Any]):
+        """Queue a reply and send as much as possible without blocking.
+
+        :param request_id: The id of the request being replied to.
+        :param reply: The reply.
+        """
+        self.outgoing += encode_message(request_id, reply)
+        self.flush()
+
+    def flush(self):
+        """Send queued replies without blocking.
+
+        Whatever can't be sent yet is sent once the socket is writable.
+        """
+        try:
+            while self.outgoing:
+                sent = self.connection.send(self.outgoing)
+                del self.outgoing[:sent]
+        except BlockingIOError:
+            pass
+        except OSError:
+            # the client is gone, reading will notice and close the connection
+            self.outgoing.clear()
+
+        if self.outgoing and not self.write_watch:
+            self.write_watch = GLib.io_add_watch(
+                self.connection.fileno(),
+                GLib.PRIORITY_DEFAULT,
+                GLib.IO_OUT | GLib.IO_ERR | GLib.IO_HUP,
+                self.on_writable,
+            )
+
+    def on_writable(self, *_):
+        """Send queued replies once the socket is writable."""
+        self.write_watch = 0
+        self.flush()
+
+        # flush adds a new watch if there is more to send
+        return GLib.SOURCE_REMOVE
+
+    def close(self):
+        """Close the connection."""
+        for watch in (self.read_watch, self.write_watch):
+            if watch:
+                GLib.source_remove(watch)
+
+        self.read_watch = 0
+        self.write_watch = 0
+        self.connection.close()
 
 
 class MouseService:
@@ -224,12 +657,35 @@ class MouseService:
     events requring the mouse devices to reload / be updated.
     """
 
-    def __init__(self):
-        """Mouse Service Constructor."""
+    def __init__(self, stats_interval: float = 0, stats_file: str = ""):
+        """Mouse Service Constructor.
+
+        :param stats_interval: Seconds between statistics dumps, 0 to
+            not dump them.
+        :param stats_file: File to append statistics dumps to (as JSON
+            lines), stdout when empty.
+        """
         Gtk.init()
 
         self.screen = Gdk.Screen.get_default()
-        self.mouse = Mouse(self.screen.get_width(), self.screen.get_height())
+        self.stats = MouseServiceStats()
+        self.stats_file = stats_file
+        self.scheduler = MouseStepScheduler(self.stats)
+        self.write_pause = get_write_pause()
+        self.mouse = Mouse(
+            self.screen.get_width(),
+            self.screen.get_height(),
+            write_pause=self.write_pause,
+            scheduler=self.scheduler,
+            frame_rate=config["mouse_motion_frame_rate"],
+            max_script_wait=config["mouse_script_max_wait"],
+        )
+        self.motion = MouseMotion(self.mouse, config)
+        # the client that started the current motion
+        self.motion_connection: MouseServiceConnection | None = None
+        self.config_watcher = ConfigWatcher(config, self.on_config_changed)
+        self.focus_tracker = FocusTracker(get_configured_window_system_id())
+        self.focus_tracker.start()
 
         if path.exists(UNIX_DOMAIN_SOCKET_FILE):
             remove(UNIX_DOMAIN_SOCKET_FILE)
@@ -238,49 +694,189 @@ class MouseService:
             socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_NONBLOCK
         )
         self.socket.bind(UNIX_DOMAIN_SOCKET_FILE)
-        self.socket.listen(1)
-        GLib.timeout_add(MOUSE_SERVICE_LOOP_MS_INTERVAL, self.socket_connection)
+        self.socket.listen(MOUSE_SERVICE_CONNECTION_BACKLOG)
+        self.connections: list[MouseServiceConnection] = []
+        GLib.io_add_watch(
+            self.socket.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN,
+            self.socket_connection,
+        )
 
         self.screen.connect("size-changed", self.on_size_changed)
         signal(SIGINT, self.on_interrupt)
 
+        if stats_interval > 0:
+            GLib.timeout_add(max(1, round(stats_interval * 1000)), self.on_dump_stats)
+
+    def on_config_changed(self, _config: HintsConfig):
+        """Apply settings the mouse keeps outside of the config.
+
+        Everything else reads the (updated) config when it is used, and
+        steps that are already scheduled are written as they were.
+        """
+        self.write_pause = get_write_pause()
+        self.mouse.write_pause = self.write_pause
+        self.mouse.frame_rate = config["mouse_motion_frame_rate"]
+        self.mouse.max_script_wait = config["mouse_script_max_wait"]
+
+    def on_dump_stats(self):
+        """Write the statistics as a JSON line."""
+        line = dumps(self.stats.to_dict()) + "\n"
+
+        if self.stats_file:
+            try:
+                with open(self.stats_file, "a", encoding="utf-8") as stats_file:
+                    stats_file.write(line)
+            except OSError:
+                logger.exception("Could not write statistics.")
+        else:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+
+        return GLib.SOURCE_CONTINUE
+
     def on_interrupt(self, *_):
         """Interrupt handler to clean up."""
+        for connection in self.connections:
+            connection.close()
+
+        self.motion.halt()
+        self.focus_tracker.stop()
+        self.mouse.close()
         self.socket.close()
         Gtk.main_quit()
 
     def on_size_changed(self, screen: Gdk.Screen):
-        """Screen size change event handler to update the mouse device min/max
-        values for correct absolute position movement.
+        """Screen size change event handler to update the scale used for
+        correct absolute position movement.
+
+        The mouse devices are kept, so that the window system does not
+        have to pick up new devices (which can lose the first clicks).
 
         :param screen: The screen object for the event.
         """
-        self.mouse = Mouse(screen.get_width(), screen.get_height())
+        self.mouse.set_screen_size(screen.get_width(), screen.get_height())
+
+    def start_mouse_motion(
+        self, connection: MouseServiceConnection, key: str, mode: MouseMode | int
+    ):
+        """Start moving in the direction of a key, for a client.
+
+        :param connection: The client connection the request came from.
+        :param key: The direction key that went down.
+        :param mode: The mouse mode.
+        """
+        self.motion_connection = connection
+        self.motion.start(key, mode)
+
+    def handle_request(
+        self,
+        payload: dict[str, Any],
+        connection: MouseServiceConnection,
+        received_time: float,
+    ) -> dict[str, Any]:
+        """Perform a requested mouse method.
+
+        :param payload: The request.
+        :param connection: The client connection the request came from.
+        :param received_time: When the request was read (time.monotonic).
+        :return: The reply, with the result of the method or an error.
+        """
+        method = payload.get("method", "")
+        args = payload.get("args", ())
+        kwargs = payload.get("kwargs", {})
+
+        methods = {
+            "click": self.mouse.click,
+            "move": self.mouse.move,
+            "scroll": self.mouse.scroll,
+            "run_script": self.mouse.run_script,
+            "drag": self.mouse.drag,
+            "start_mouse_motion": partial(self.start_mouse_motion, connection),
+            "stop_mouse_motion": self.motion.stop,
+            "get_focused_window": self.focus_tracker.get_snapshot,
+        }
+
+        # reading the statistics is not part of them
+        if method == "stats":
+            return {"result": self.stats.to_dict()}
+
+        if method not in methods:
+            return {"error": f"unknown method '{method}'"}
+
+        # steps scheduled while handling the request count towards it
+        command = self.stats.start_command(method, received_time)
+        self.scheduler.current_command = command
+
+        try:
+            return {"result": methods[method](*args, **kwargs)}
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            logger.exception("Could not perform '%s'", method)
+            return {"error": str(error)}
+        finally:
+            self.scheduler.current_command = None
+            command.handled()
 
-    def socket_connection(self):
-        """Handle socket connection events.
+    def socket_connection(self, *_):
+        """Accept connections.
 
         This is how the main hints process and the mouse service
-        communicate.
+        communicate. It runs only when there are clients waiting to
+        connect. Connections are kept open, so clients only pay for
+        connecting once, and any number of clients can be connected.
+        """
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except BlockingIOError:
+                break
+
+            connection.setblocking(False)
+            service_connection = MouseServiceConnection(connection)
+            service_connection.read_watch = GLib.io_add_watch(
+                connection.fileno(),
+                GLib.PRIORITY_DEFAULT,
+                GLib.IO_IN | GLib.IO_ERR | GLib.IO_HUP,
+                self.on_connection_readable,
+                service_connection,
+            )
+            self.connections.append(service_connection)
+
+        return GLib.SOURCE_CONTINUE
+
+    def on_connection_readable(self, _, __, connection: MouseServiceConnection):
+        """Handle the requests a client sent.
+
+        :param connection: The client connection.
         """
         try:
-            connection, _ = self.socket.accept()
-            payload = loads(connection.recv(SOCKET_MESSAGE_SIZE))
-            method = payload.get("method", "")
-            args = payload.get("args", ())
-            kwargs = payload.get("kwargs", {})
-            connection.send(
-                dumps(
-                    {
-                        "click": self.mouse.click,
-                        "move": self.mouse.move,
-                        "scoll": self.mouse.scroll,
-                        "do_mouse_action": self.mouse.do_mouse_action,
-                    }[method](*args, **kwargs)
-                )
+            requests, closed = connection.read()
+        except (InvalidMessageError, OSError):
+            logger.exception("Closing connection to a client.")
+            requests, closed = [], True
+
+        # requests read together queue behind each other
+        received_time = monotonic()
+
+        for request_id, payload in requests:
+            connection.write(
+                request_id, self.handle_request(payload, connection, received_time)
             )
-        except BlockingIOError:
-            pass
+
+        if closed:
+            # the watch calling this is removed by returning SOURCE_REMOVE
+            connection.read_watch = 0
+            connection.close()
+            self.connections.remove(connection)
+
+            # don't keep moving if the client moving the mouse goes away
+            # with keys held down
+            if connection is self.motion_connection:
+                self.motion_connection = None
+                self.motion.stop()
+
+            return GLib.SOURCE_REMOVE
 
         return GLib.SOURCE_CONTINUE
 
@@ -289,9 +885,52 @@ class MouseService:
         Gtk.main()
 
 
+def print_stats():
+    """Print the statistics of the running mouse service.
+
+    Exits with an error when the mouse service is not running.
+    """
+    try:
+        stats = get_mouse_service_stats()
+    except CouldNotCommunicateWithTheMouseService as error:
+        sys.exit(f"hintsd: {error}")
+
+    print(dumps(stats, indent=2))
+
+
 def main():
     """Mouse service entry point."""
-    MouseService().run()
+    parser = ArgumentParser(
+        prog="hintsd",
+        description="Mouse service for hints. Performs mouse actions by"
+        " writing to uinput.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print latency (in seconds) and write statistics of the running"
+        " service, then exit.",
+    )
+    parser.add_argument(
+        "--stats-interval",
+        type=float,
+        default=0,
+        help="Dump statistics as JSON lines every STATS_INTERVAL seconds.",
+    )
+    parser.add_argument(
+        "--stats-file",
+        type=str,
+        default="",
+        help="File to append statistics dumps to, defaults to stdout.",
+    )
+
+    args = parser.parse_args()
+
+    if args.stats:
+        print_stats()
+        return
+
+    MouseService(stats_interval=args.stats_interval, stats_file=args.stats_file).run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+"""Latency and throughput statistics for hintsd.
+
+For every command hintsd records:
+
+- queue time: from receiving the request until its first uinput write
+  (waiting behind other requests and scheduled writes).
+- execution time: from the first to the last uinput write of the command
+  (including pauses between writes), or the time to handle the request
+  for commands that don't write.
+- writes: the number of uinput events written for the command.
+
+Commands whose queued steps were dropped before being written are also
+counted as cancelled.
+"""
+
+from __future__ import annotations
+
+from math import log
+from time import monotonic
+from typing import Any, Callable
+
+# relative precision of histogram buckets
+HISTOGRAM_RESOLUTION = 0.01
+
+
+class Histogram:
+    """Histogram with logarithmic buckets for percentiles of positive values."""
+
+    def __init__(self, resolution: float = HISTOGRAM_RESOLUTION):
+        """Histogram constructor.
+
+        :param resolution: Relative precision of buckets, values in a
+            bucket are within this fraction of each other.
+        """
+        self.base = 1 + resolution
+        self.log_base = log(self.base)
+        self.buckets: dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float):
+        """Add a value.
+
+        :param value: Value to add (negative values count as 0).
+        """
+        self.count += 1
+
+        if value <= 0:
+            self.zeros += 1
+            return
+
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        bucket = round(log(value) / self.log_base)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, percent: float) -> float:
+        """Get a percentile.
+
+        :param percent: Percentile to get (0-100).
+        :return: The value at the percentile (within the histogram
+            resolution), 0 when the histogram is empty.
+        """
+        rank = percent / 100 * self.count
+        seen = self.zeros
+
+        if seen >= rank:
+            return 0.0
+
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.base**bucket, self.maximum)
+
+        return self.maximum
+
+    def to_dict(self) -> dict[str, float]:
+        """Get a summary of the histogram.
+
+        :return: count, mean, p50, p90, p99 and max.
+        """
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.maximum,
+        }
+
+
+class CommandRecord:
+    """Timing of a single command, from receiving it to its last write."""
+
+    __slots__ = (
+        "method",
+        "received_time",
+        "handled_time",
+        "first_write_time",
+        "last_write_time",
+        "writes",
+        "pending_steps",
+        "cancelled",
+        "on_done",
+    )
+
+    def __init__(
+        self,
+        method: str,
+        received_time: float,
+        on_done: Callable[[CommandRecord], None],
+    ):
+        """Command record constructor.
+
+        :param method: The command method.
+        :param received_time: When the request was read (time.monotonic).
+        :param on_done: Called once the command is handled and all of
+            its steps are written.
+        """
+        self.method = method
+        self.received_time = received_time
+        self.handled_time = 0.0
+        self.first_write_time = 0.0
+        self.last_write_time = 0.0
+        self.writes = 0
+        self.pending_steps = 0
+        self.cancelled = False
+        self.on_done = on_done
+
+    def step_written(self, events: int):
+        """Record that one of the command's steps was written.
+
+        :param events: The number of events written in the step.
+        """
+        now = monotonic()
+
+        if not self.first_write_time:
+            self.first_write_time = now
+
+        self.last_write_time = now
+        self.writes += events
+        self.pending_steps -= 1
+
+        if self.handled_time and not self.pending_steps:
+            self.on_done(self)
+
+    def step_dropped(self):
+        """Record that one of the command's steps was dropped without
+        being written.
+        """
+        self.cancelled = True
+        self.pending_steps -= 1
+
+        if self.handled_time and not self.pending_steps:
+            self.on_done(self)
+
+    def handled(self):
+        """Record that the command was handled (its steps were scheduled)."""
+        self.handled_time = monotonic()
+
+        if not self.pending_steps:
+            self.on_done(self)
+
+
+class MouseServiceStats:
+    """Statistics for the commands hintsd performed."""
+
+    def __init__(self):
+        self.start_time = monotonic()
+        # method -> statistic -> histogram
+        self.histograms: dict[str, dict[str, Histogram]] = {}
+        # method -> commands with steps that were dropped
+        self.cancelled: dict[str, int] = {}
+        self.total_writes = 0
+
+    def start_command(self, method: str, received_time: float) -> CommandRecord:
+        """Start recording a command.
+
+        :param method: The command method.
+        :param received_time: When the request was read (time.monotonic).
+        :return: The record to update as the command is performed.
+        """
+        return CommandRecord(method, received_time, self.add_command)
+
+    def add_command(self, record: CommandRecord):
+        """Add a finished command to the statistics.
+
+        :param record: The record of the command.
+        """
+        histograms = self.histograms.setdefault(
+            record.method,
+            {
+                "queue_time": Histogram(),
+                "execution_time": Histogram(),
+                "writes": Histogram(),
+            },
+        )
+
+        if record.first_write_time:
+            histograms["queue_time"].add(record.first_write_time - record.received_time)
+            histograms["execution_time"].add(
+                record.last_write_time - record.first_write_time
+            )
+        else:
+            histograms["queue_time"].add(0)
+            histograms["execution_time"].add(record.handled_time - record.received_time)
+
+        histograms["writes"].add(record.writes)
+
+        if record.cancelled:
+            self.cancelled[record.method] = self.cancelled.get(record.method, 0) + 1
+
+    def add_writes(self, events: int):
+        """Count events written to the uinput devices.
+
+        :param events: The number of events.
+        """
+        self.total_writes += events
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get a summary of the statistics.
+
+        Times are in seconds.
+
+        :return: The statistics.
+        """
+        return {
+            "uptime": monotonic() - self.start_time,
+            "total_writes": self.total_writes,
+            "commands": {
+                method: {
+                    **{
+                        name: histogram.to_dict()
+                        for name, histogram in histograms.items()
+                    },
+                    "cancelled": self.cancelled.get(method, 0),
+                }
+                for method, histograms in self.histograms.items()
+            },
+        }
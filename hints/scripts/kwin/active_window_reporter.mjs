@@ -0,0 +1,87 @@
+/* Report active window information to hints over D-Bus (Plasma 6).
+ *
+ * The script stays loaded in KWin while hintsd tracks the focus. It
+ * reports the active window whenever it changes (or moves / resizes), and
+ * whenever hints asks for it by invoking the shortcut registered below
+ * (through kglobalaccel). Reports are only sent while hints owns its
+ * D-Bus name.
+ */
+const DBUS_SERVICE = "org.freedesktop.DBus";
+const DBUS_PATH = "/org/freedesktop/DBus";
+const DBUS_INTERFACE = "org.freedesktop.DBus";
+const HINTS_SERVICE = "org.hints.ActiveWindow";
+const HINTS_PATH = "/org/hints/ActiveWindow";
+const HINTS_INTERFACE = "org.hints.ActiveWindow";
+
+/* Get active window information using the Kwin API for plasma 6
+ * @return Object with window information for the current active window
+ */
+const getActiveWindowInformation = () => {
+  const window = workspace.activeWindow;
+
+  if (!window) {
+    return null;
+  }
+
+  const geometry = window.clientGeometry;
+  return {
+    extents: [geometry.x, geometry.y, geometry.width, geometry.height],
+    pid: window.pid,
+    name: window.resourceClass,
+  };
+};
+
+const reportActiveWindow = () => {
+  const information = getActiveWindowInformation();
+
+  if (!information) {
+    return;
+  }
+
+  // nobody receives reports when hints is not running, and calling a name
+  // without an owner makes D-Bus try to activate a service for it
+  callDBus(
+    DBUS_SERVICE,
+    DBUS_PATH,
+    DBUS_INTERFACE,
+    "NameHasOwner",
+    HINTS_SERVICE,
+    (owned) => {
+      if (owned) {
+        callDBus(
+          HINTS_SERVICE,
+          HINTS_PATH,
+          HINTS_INTERFACE,
+          "Update",
+          JSON.stringify(information),
+        );
+      }
+    },
+  );
+};
+
+// the window whose geometry changes are reported
+let trackedWindow = null;
+
+const onWindowActivated = (window) => {
+  if (trackedWindow) {
+    trackedWindow.frameGeometryChanged.disconnect(reportActiveWindow);
+  }
+
+  trackedWindow = window;
+
+  if (trackedWindow) {
+    trackedWindow.frameGeometryChanged.connect(reportActiveWindow);
+  }
+
+  reportActiveWindow();
+};
+
+workspace.windowActivated.connect(onWindowActivated);
+registerShortcut(
+  "hints-report-active-window",
+  "Hints: report the active window",
+  "",
+  reportActiveWindow,
+);
+onWindowActivated(workspace.activeWindow);
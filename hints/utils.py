@@ -1,10 +1,30 @@
-from json import load
+from __future__ import annotations
+
+import marshal
+from hashlib import sha256
+from json import JSONDecodeError, loads
+from os import getpid, makedirs, path, remove, replace, stat
 from typing import Any
 
-from hints.constants import CONFIG_PATH, DEFAULT_CONFIG
+from hints import __version__
+from hints.constants import COMPILED_CONFIG_PATH, CONFIG_PATH, DEFAULT_CONFIG_PATH
 
 HintsConfig = dict[str, Any]
 
+# bump when the compiled config format changes
+COMPILED_CONFIG_VERSION = 2
+
+
+class InvalidConfigError(Exception):
+    """Exception to raise when the config file can't be used."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Invalid config ({CONFIG_PATH}): {self.reason}"
+
 
 def merge_configs(source: HintsConfig, destination: HintsConfig) -> HintsConfig:
     """Deepmerge configs recursively.
@@ -23,17 +43,245 @@ def merge_configs(source: HintsConfig, destination: HintsConfig) -> HintsConfig:
     return destination
 
 
+def resolve_enums(value: Any) -> Any:
+    """Replace enum values (like Atspi.Role or Gdk.ModifierType) with
+    plain ints, recursively.
+
+    Enum values compare equal to their ints, and plain values can be
+    compiled without the modules that define the enums.
+
+    :param value: Config value.
+    :return: The value with enums resolved.
+    """
+    if isinstance(value, dict):
+        return {key: resolve_enums(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [resolve_enums(item) for item in value]
+
+    if isinstance(value, int) and not isinstance(value, bool):
+        return int(value)
+
+    return value
+
+
+def validate_config(config: Any, defaults: Any, key_path: str = ""):
+    """Check that config values have the same types as their defaults.
+
+    Keys without defaults (like per application rules) are not checked.
+
+    :param config: Config (or config value) to check.
+    :param defaults: The default config (or value).
+    :param key_path: Path to the value being checked, for errors.
+    :raises InvalidConfigError: When a value has the wrong type.
+    """
+    numbers = (int, float)
+
+    if isinstance(defaults, dict):
+        if not isinstance(config, dict):
+            raise InvalidConfigError(f"'{key_path}' should be an object")
+
+        for key, default in defaults.items():
+            if key in config:
+                validate_config(
+                    config[key], default, f"{key_path}.{key}" if key_path else key
+                )
+
+    elif isinstance(defaults, bool):
+        if not isinstance(config, bool):
+            raise InvalidConfigError(f"'{key_path}' should be true or false")
+
+    elif isinstance(defaults, numbers):
+        if not isinstance(config, numbers) or isinstance(config, bool):
+            raise InvalidConfigError(f"'{key_path}' should be a number")
+
+    elif isinstance(defaults, str):
+        if not isinstance(config, str):
+            raise InvalidConfigError(f"'{key_path}' should be a string")
+
+    elif isinstance(defaults, list):
+        if not isinstance(config, list):
+            raise InvalidConfigError(f"'{key_path}' should be a list")
+
+
+def get_default_config_fingerprint() -> str | None:
+    """Get a fingerprint of the default config source.
+
+    The default config can change without the hints version changing
+    (like when running from a checkout), so compiled configs are checked
+    against it.
+
+    :return: The hash of the default config module, None when it can't
+        be read.
+    """
+    try:
+        with open(DEFAULT_CONFIG_PATH, "rb") as _f:
+            return sha256(_f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def get_key_paths(config: HintsConfig) -> list[list[str]]:
+    """Get the paths to every value in a config, recursively.
+
+    :param config: Config.
+    :return: Key paths. Ex [["hints", "hint_height"], ["alphabet"]]
+    """
+    key_paths = []
+
+    for key, value in config.items():
+        if isinstance(value, dict) and value:
+            key_paths += [[key, *key_path] for key_path in get_key_paths(value)]
+        else:
+            key_paths.append([key])
+
+    return key_paths
+
+
+def has_key_paths(config: HintsConfig, key_paths: list[list[str]]) -> bool:
+    """Check that a config has a value at every key path.
+
+    :param config: Config.
+    :param key_paths: Key paths (see get_key_paths).
+    :return: Whether every key path is in the config.
+    """
+    for key_path in key_paths:
+        node = config
+
+        for key in key_path:
+            if not isinstance(node, dict) or key not in node:
+                return False
+            node = node[key]
+
+    return True
+
+
+def get_default_key_paths() -> list[list[str]]:
+    """Get the key paths of the default config.
+
+    :return: Key paths (see get_key_paths).
+    """
+    # only imported when compiling, it needs slow GI imports
+    from hints.default_config import (  # pylint: disable=import-outside-toplevel
+        get_default_config,
+    )
+
+    return get_key_paths(get_default_config())
+
+
+def compile_config(data: bytes | None) -> HintsConfig:
+    """Merge a config file into the default config and validate it.
+
+    :param data: Contents of the config file, None when there is none.
+    :return: The config, with enums resolved.
+    :raises InvalidConfigError: When the config file can't be parsed or
+        has values of the wrong type.
+    """
+    # only imported when compiling, it needs slow GI imports
+    from hints.default_config import (  # pylint: disable=import-outside-toplevel
+        get_default_config,
+    )
+
+    # a new default config every call, so merging into it is safe
+    defaults = resolve_enums(get_default_config())
+    user_config = {}
+
+    if data is not None:
+        try:
+            user_config = loads(data)
+        except (JSONDecodeError, UnicodeDecodeError) as error:
+            raise InvalidConfigError(str(error)) from error
+
+    validate_config(user_config, defaults)
+
+    return merge_configs(user_config, defaults)
+
+
 def load_config() -> HintsConfig:
     """Load Json config file.
 
+    The merged config is compiled to a file next to the config file, and
+    is only rebuilt when the config file, hints or the default config
+    change, skipping JSON parsing and building the default config. A
+    compiled config missing any default value is rebuilt too.
+
     :return: config object.
+    :raises InvalidConfigError: When the config file can't be parsed or
+        has values of the wrong type.
     """
-    config = {}
-
     try:
-        with open(CONFIG_PATH, encoding="utf-8") as _f:
-            config = load(_f)
+        config_stat = stat(CONFIG_PATH)
+        stat_key: tuple[int, int] | None = (
+            config_stat.st_mtime_ns,
+            config_stat.st_size,
+        )
     except FileNotFoundError:
-        pass
+        stat_key = None
+
+    defaults_fingerprint = get_default_config_fingerprint()
+    compiled = None
+
+    try:
+        with open(COMPILED_CONFIG_PATH, "rb") as _f:
+            compiled = marshal.load(_f)
+        if (
+            compiled["version"],
+            compiled["hints_version"],
+            compiled["defaults_fingerprint"],
+        ) != (
+            COMPILED_CONFIG_VERSION,
+            __version__,
+            defaults_fingerprint,
+        ) or not has_key_paths(
+            compiled["config"], compiled["default_key_paths"]
+        ):
+            compiled = None
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        compiled = None
+
+    if compiled and compiled["stat"] == stat_key:
+        return compiled["config"]
+
+    data = None
+
+    if stat_key:
+        try:
+            with open(CONFIG_PATH, "rb") as _f:
+                data = _f.read()
+        except FileNotFoundError:
+            stat_key = None
+
+    digest = sha256(data).hexdigest() if data is not None else None
+
+    # the file was touched or copied without changing
+    if compiled and compiled["hash"] == digest:
+        config = compiled["config"]
+        default_key_paths = compiled["default_key_paths"]
+    else:
+        config = compile_config(data)
+        default_key_paths = get_default_key_paths()
+
+    compiled = {
+        "version": COMPILED_CONFIG_VERSION,
+        "hints_version": __version__,
+        "defaults_fingerprint": defaults_fingerprint,
+        "default_key_paths": default_key_paths,
+        "stat": stat_key,
+        "hash": digest,
+        "config": config,
+    }
+
+    # written to a temporary file first, so readers never see part of it
+    temporary_path = f"{COMPILED_CONFIG_PATH}.{getpid()}"
+
+    try:
+        makedirs(path.dirname(COMPILED_CONFIG_PATH), exist_ok=True)
+        with open(temporary_path, "wb") as _f:
+            marshal.dump(compiled, _f)
+        replace(temporary_path, COMPILED_CONFIG_PATH)
+    except OSError:
+        # the config directory might be read only, compile again next time
+        if path.exists(temporary_path):
+            remove(temporary_path)
 
-    return merge_configs(config, DEFAULT_CONFIG)
+    return config
@@ -1,23 +1,18 @@
-"""Sway window system."""
-
-from json import loads
-from subprocess import run
+"""Hyprland window system."""
 
+from hints.mouse import get_focused_window_snapshot
+from hints.window_systems.hyprland_ipc import get_active_window
 from hints.window_systems.window_system import WindowSystem
 
 
 class Hyprland(WindowSystem):
-    """Sway Window system class."""
+    """Hyprland Window system class."""
 
     def __init__(self):
         super().__init__()
-        self.focused_window = self._get_focused_window_from_hyprlandctl()
-
-    def _get_focused_window_from_hyprlandctl(self):
-        focused_window = run(
-            ["hyprctl", "activewindow", "-j"], capture_output=True, check=True
+        self.focused_window = (
+            get_focused_window_snapshot("hyprland") or get_active_window()
         )
-        return loads(focused_window.stdout.decode("utf-8"))
 
     @property
     def window_system_name(self) -> str:
@@ -0,0 +1,108 @@
+"""Client for Hyprland's sockets.
+
+Requests (like "j/activewindow", the same as `hyprctl activewindow -j`)
+are sent to .socket.sock directly instead of running hyprctl. Events can
+be read from .socket2.sock (see connect_hyprland_socket).
+"""
+
+from __future__ import annotations
+
+from json import loads
+from os import environ, path
+from socket import AF_UNIX, SOCK_STREAM, socket
+from typing import Any
+
+REQUEST_SOCKET = ".socket.sock"
+EVENT_SOCKET = ".socket2.sock"
+
+
+class HyprlandIpcError(Exception):
+    """Exception to raise when Hyprland can't be queried."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Could not query Hyprland: {self.reason}"
+
+
+def get_hyprland_socket_path(name: str) -> str:
+    """Get the path to a Hyprland socket.
+
+    :param name: The socket file name.
+    :return: The socket path.
+    :raises HyprlandIpcError: When Hyprland is not running in this
+        session.
+    """
+    signature = environ.get("HYPRLAND_INSTANCE_SIGNATURE")
+
+    if not signature:
+        raise HyprlandIpcError(
+            "the HYPRLAND_INSTANCE_SIGNATURE environment variable is not set"
+        )
+
+    runtime_directory = environ.get("XDG_RUNTIME_DIR", "")
+    socket_path = path.join(runtime_directory, "hypr", signature, name)
+
+    # Hyprland versions before 0.40 kept their sockets in /tmp
+    if not runtime_directory or not path.exists(socket_path):
+        legacy_socket_path = path.join("/tmp/hypr", signature, name)
+        if path.exists(legacy_socket_path):
+            return legacy_socket_path
+
+    return socket_path
+
+
+def connect_hyprland_socket(name: str) -> socket:
+    """Connect to a Hyprland socket.
+
+    :param name: The socket file name.
+    :return: The connection.
+    :raises HyprlandIpcError: When the socket can't be connected to.
+    """
+    connection = socket(AF_UNIX, SOCK_STREAM)
+
+    try:
+        connection.connect(get_hyprland_socket_path(name))
+    except OSError as error:
+        connection.close()
+        raise HyprlandIpcError(str(error)) from error
+
+    return connection
+
+
+def hyprland_request(request: str) -> bytes:
+    """Send a request to Hyprland.
+
+    Hyprland replies and closes the connection, one request per
+    connection.
+
+    :param request: The request, like "j/activewindow".
+    :return: The reply.
+    :raises HyprlandIpcError: When Hyprland can't be queried.
+    """
+    with connect_hyprland_socket(REQUEST_SOCKET) as connection:
+        try:
+            connection.sendall(request.encode("utf-8"))
+            reply = bytearray()
+
+            while chunk := connection.recv(65536):
+                reply += chunk
+        except OSError as error:
+            raise HyprlandIpcError(str(error)) from error
+
+    return bytes(reply)
+
+
+def get_active_window() -> dict[str, Any]:
+    """Get the active window.
+
+    :return: The active window, as `hyprctl activewindow -j` prints it
+        (with class, pid, at and size).
+    :raises HyprlandIpcError: When Hyprland can't be queried.
+    """
+    try:
+        return loads(hyprland_request("j/activewindow"))
+    except ValueError as error:
+        raise HyprlandIpcError(str(error)) from error
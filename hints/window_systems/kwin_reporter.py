@@ -0,0 +1,212 @@
+"""Active window information from a KWin script.
+
+The KWin script (scripts/kwin/active_window_reporter.mjs) calls the
+Update method of a D-Bus object hints owns with the active window
+information, whenever the active window changes and whenever hints
+invokes the shortcut the script registers. It only reports while the
+object's name is owned.
+
+Only one process can own the object's name. When hintsd tracks the focus
+it owns the name and keeps the script loaded for as long as it runs, and
+reports go to hintsd. Without hintsd, hints loads the script for one
+report and unloads it again.
+"""
+
+from __future__ import annotations
+
+from importlib.resources import as_file, files
+from json import loads
+from time import monotonic, sleep
+from typing import Any, Callable
+
+import dbus
+import dbus.service
+from dbus.mainloop.glib import DBusGMainLoop
+from gi import require_version
+
+from hints.mouse import get_focused_window_snapshot
+
+require_version("GLib", "2.0")
+from gi.repository import GLib
+
+KWIN_SCRIPT_PLUGIN_NAME = "hints_active_window_reporter"
+KWIN_SCRIPT_SHORTCUT = "hints-report-active-window"
+HINTS_DBUS_SERVICE = "org.hints.ActiveWindow"
+HINTS_DBUS_PATH = "/org/hints/ActiveWindow"
+HINTS_DBUS_INTERFACE = "org.hints.ActiveWindow"
+# seconds to wait for the script to report
+KWIN_SCRIPT_REPORT_TIMEOUT = 1
+# seconds between asking hintsd if the script reported to it
+HINTSD_REPORT_POLL_INTERVAL = 0.01
+
+
+class KWinScriptError(Exception):
+    """Exception to raise when the KWin script does not report."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Could not get the active window from KWin: {self.reason}"
+
+
+class ActiveWindowReceiver(dbus.service.Object):
+    """D-Bus object the KWin script reports the active window to."""
+
+    def __init__(
+        self,
+        bus: dbus.Bus,
+        on_update: Callable[[dict[str, Any]], None] | None = None,
+    ):
+        """Active window receiver constructor.
+
+        :param bus: The session bus, with a GLib main loop.
+        :param on_update: Called with the active window information
+            whenever the script reports it.
+        :raises dbus.exceptions.NameExistsException: When another process
+            receives the reports.
+        """
+        # keep the name for as long as the receiver exists. Waiting in the
+        # queue for the name would mean waiting for reports that go to the
+        # current owner.
+        self.bus_name = dbus.service.BusName(HINTS_DBUS_SERVICE, bus, do_not_queue=True)
+        super().__init__(bus, HINTS_DBUS_PATH)
+        self.on_update = on_update
+        self.active_window: dict[str, Any] | None = None
+
+    @dbus.service.method(HINTS_DBUS_INTERFACE, in_signature="s")
+    def Update(self, information: str):  # pylint: disable=invalid-name
+        """Active window information from the KWin script.
+
+        :param information: JSON with extents, pid and name.
+        """
+        try:
+            self.active_window = loads(information)
+        except ValueError:
+            return
+
+        if self.on_update:
+            self.on_update(self.active_window)
+
+
+def load_kwin_script(bus: dbus.Bus) -> bool:
+    """Load the KWin script, unless it is already loaded.
+
+    :param bus: The session bus.
+    :return: Whether the script was loaded now (it reports the active
+        window when it starts).
+    """
+    scripting = dbus.Interface(
+        bus.get_object("org.kde.KWin", "/Scripting"), "org.kde.kwin.Scripting"
+    )
+
+    if scripting.isScriptLoaded(KWIN_SCRIPT_PLUGIN_NAME):
+        return False
+
+    with as_file(files("hints") / "scripts/kwin/active_window_reporter.mjs") as path:
+        scripting.loadScript(str(path), KWIN_SCRIPT_PLUGIN_NAME)
+
+    # runs the scripts that are loaded but not running yet
+    scripting.start()
+
+    return True
+
+
+def unload_kwin_script(bus: dbus.Bus):
+    """Unload the KWin script, with the shortcut it registered.
+
+    :param bus: The session bus.
+    """
+    dbus.Interface(
+        bus.get_object("org.kde.KWin", "/Scripting"), "org.kde.kwin.Scripting"
+    ).unloadScript(KWIN_SCRIPT_PLUGIN_NAME)
+
+
+def request_report(bus: dbus.Bus):
+    """Ask the (loaded) KWin script to report the active window.
+
+    :param bus: The session bus.
+    """
+    dbus.Interface(
+        bus.get_object("org.kde.kglobalaccel", "/component/kwin"),
+        "org.kde.kglobalaccel.Component",
+    ).invokeShortcut(KWIN_SCRIPT_SHORTCUT)
+
+
+def get_active_window(timeout: float = KWIN_SCRIPT_REPORT_TIMEOUT) -> dict[str, Any]:
+    """Get the active window from the KWin script.
+
+    :param timeout: Seconds to wait for the script to report.
+    :return: Active window information (extents, pid and name).
+    :raises KWinScriptError: When the script does not report in time.
+    """
+    DBusGMainLoop(set_as_default=True)
+    bus = dbus.SessionBus()
+    loop = GLib.MainLoop()
+
+    try:
+        receiver = ActiveWindowReceiver(bus, lambda _: loop.quit())
+    except dbus.exceptions.NameExistsException:
+        return get_active_window_from_hintsd(bus, timeout)
+
+    loaded = False
+
+    try:
+        loaded = load_kwin_script(bus)
+
+        if not loaded:
+            request_report(bus)
+
+        if receiver.active_window is None:
+            timeout_id = GLib.timeout_add(round(timeout * 1000), loop.quit)
+            loop.run()
+
+            if receiver.active_window is not None:
+                GLib.source_remove(timeout_id)
+
+        # nothing receives reports once this returns
+        if loaded:
+            unload_kwin_script(bus)
+    except dbus.DBusException as error:
+        raise KWinScriptError(str(error)) from error
+    finally:
+        receiver.remove_from_connection()
+        bus.release_name(HINTS_DBUS_SERVICE)
+
+    if receiver.active_window is None:
+        raise KWinScriptError("the KWin script did not report in time")
+
+    return receiver.active_window
+
+
+def get_active_window_from_hintsd(
+    bus: dbus.Bus, timeout: float = KWIN_SCRIPT_REPORT_TIMEOUT
+) -> dict[str, Any]:
+    """Get the active window from hintsd, when hintsd receives the reports.
+
+    hintsd only has no active window until the script reports to it, so
+    the script is asked to report first.
+
+    :param bus: The session bus.
+    :param timeout: Seconds to wait for the script to report.
+    :return: Active window information (extents, pid and name).
+    :raises KWinScriptError: When the script does not report in time.
+    """
+    try:
+        if not load_kwin_script(bus):
+            request_report(bus)
+    except dbus.DBusException as error:
+        raise KWinScriptError(str(error)) from error
+
+    deadline = monotonic() + timeout
+
+    while monotonic() < deadline:
+        active_window = get_focused_window_snapshot("plasmashell")
+
+        if active_window:
+            return active_window
+
+        sleep(HINTSD_REPORT_POLL_INTERVAL)
+
+    raise KWinScriptError("the KWin script did not report to hintsd in time")
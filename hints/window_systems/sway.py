@@ -1,56 +1,55 @@
 """Sway window system."""
 
-from json import loads
-from subprocess import PIPE, Popen
-
+from typing import Any
+
+from hints.mouse import get_focused_window_snapshot
+from hints.window_systems.sway_ipc import (
+    SwayIpcClient,
+    SwayIpcMessageType,
+    find_focused_node,
+)
 from hints.window_systems.window_system import WindowSystem
 
 
-class Sway(WindowSystem):
-    """Sway Window system class."""
+def get_sway_focus(client: SwayIpcClient) -> tuple[dict[str, Any], int]:
+    """Get the focused window and the height of the bar on its output.
 
-    def __init__(self):
-        super().__init__()
-        self.focused_window = self._get_focused_window_from_sway_tree()
-        self.focused_workspace = self._get_focused_workspace_from_sway_tree()
-        self.focused_output = self._get_focused_output_from_sway_tree()
-        self.bar_height = self._get_bar_height()
-
-    def _get_focused_window_from_sway_tree(self):
-        swaytree = Popen(["swaymsg", "-t", "get_tree"], stdout=PIPE)
-        focused = Popen(
-            ["jq", ".. | select(.type?) | select(.focused==true)"],
-            stdin=swaytree.stdout,
-            stdout=PIPE,
+    :param client: Sway IPC client.
+    :return: The focused node and the bar height.
+    :raises SwayIpcError: When sway can't be queried.
+    """
+    tree, workspaces, outputs = client.query_many(
+        (
+            SwayIpcMessageType.GET_TREE,
+            SwayIpcMessageType.GET_WORKSPACES,
+            SwayIpcMessageType.GET_OUTPUTS,
         )
+    )
+    focused_workspace = next(item for item in workspaces if item.get("focused"))
+    focused_output = next(item for item in outputs if item.get("focused"))
 
-        return loads(focused.communicate()[0].decode("utf-8"))
+    # The focused widnow does not included offsets for the top bar (swaybar).
+    # So we need to calcuare the height of the bar for the current monitor.
+    # Unknow if this will be an issue with other bars on sway.
+    bar_height = focused_output["rect"]["height"] - focused_workspace["rect"]["height"]
 
-    def _get_focused_workspace_from_sway_tree(self):
-        swaytree = Popen(["swaymsg", "-t", "get_workspaces"], stdout=PIPE)
-        focused = Popen(
-            ["jq", ".[] | select(.focused==true)"],
-            stdin=swaytree.stdout,
-            stdout=PIPE,
-        )
+    return find_focused_node(tree), bar_height
 
-        return loads(focused.communicate()[0].decode("utf-8"))
 
-    def _get_focused_output_from_sway_tree(self):
-        swaytree = Popen(["swaymsg", "-t", "get_outputs"], stdout=PIPE)
-        focused = Popen(
-            ["jq", ".[] | select(.focused==true)"],
-            stdin=swaytree.stdout,
-            stdout=PIPE,
-        )
+class Sway(WindowSystem):
+    """Sway Window system class."""
 
-        return loads(focused.communicate()[0].decode("utf-8"))
+    def __init__(self):
+        super().__init__()
 
-    def _get_bar_height(self) -> int:
-        return (
-            self.focused_output["rect"]["height"]
-            - self.focused_workspace["rect"]["height"]
-        )
+        snapshot = get_focused_window_snapshot("sway")
+
+        if snapshot:
+            self.focused_window = snapshot["window"]
+            self.bar_height = snapshot["bar_height"]
+        else:
+            with SwayIpcClient() as client:
+                self.focused_window, self.bar_height = get_sway_focus(client)
 
     @property
     def window_system_name(self) -> str:
@@ -68,9 +67,6 @@ class Sway(WindowSystem):
 
         :return: Active window extents (x, y, width, height).
         """
-        # The focused widnow does not included offsets for the top bar (swaybar).
-        # So we need to calcuare the height of the bar for the current monitor.
-        # Unknow if this will be an issue with other bars on sway.
         return (
             self.focused_window["rect"]["x"],
             self.focused_window["rect"]["y"] - self.bar_height,
@@ -0,0 +1,194 @@
+"""Client for the sway IPC protocol (the i3 IPC protocol).
+
+Queries are sent over the socket in $SWAYSOCK, instead of running swaymsg
+(and jq) for every query. Several queries can be sent back to back on one
+connection, and their replies are read in order.
+"""
+
+from __future__ import annotations
+
+from enum import IntEnum
+from json import dumps, loads
+from os import environ
+from socket import AF_UNIX, SOCK_STREAM, socket
+from struct import Struct
+from typing import Any, Iterable
+
+IPC_MAGIC = b"i3-ipc"
+# magic, payload length, message type (in native byte order)
+IPC_HEADER = Struct(f"={len(IPC_MAGIC)}sII")
+# replies to subscriptions (events) have the highest bit of their type set
+IPC_EVENT_MASK = 1 << 31
+
+
+class SwayIpcMessageType(IntEnum):
+    """Sway IPC message types."""
+
+    RUN_COMMAND = 0
+    GET_WORKSPACES = 1
+    SUBSCRIBE = 2
+    GET_OUTPUTS = 3
+    GET_TREE = 4
+
+
+class SwayIpcError(Exception):
+    """Exception to raise when sway can't be queried."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Could not query sway: {self.reason}"
+
+
+class SwayIpcClient:
+    """Connection to sway's IPC socket."""
+
+    def __init__(self, socket_path: str | None = None):
+        """Sway IPC client constructor.
+
+        :param socket_path: Path to the sway socket, defaults to
+            $SWAYSOCK.
+        :raises SwayIpcError: When the socket can't be connected to.
+        """
+        socket_path = socket_path or environ.get("SWAYSOCK")
+
+        if not socket_path:
+            raise SwayIpcError("the SWAYSOCK environment variable is not set")
+
+        self.connection = socket(AF_UNIX, SOCK_STREAM)
+
+        try:
+            self.connection.connect(socket_path)
+        except OSError as error:
+            self.connection.close()
+            raise SwayIpcError(str(error)) from error
+
+    def __enter__(self) -> SwayIpcClient:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+    def send(self, message_type: SwayIpcMessageType, payload: Any = None):
+        """Send a message.
+
+        :param message_type: The message type.
+        :param payload: JSON serializable payload, for messages that
+            take one (like SUBSCRIBE).
+        """
+        data = b"" if payload is None else dumps(payload).encode("utf-8")
+        self.connection.sendall(
+            IPC_HEADER.pack(IPC_MAGIC, len(data), message_type) + data
+        )
+
+    def read_exactly(self, size: int) -> bytes:
+        """Read a number of bytes.
+
+        :param size: Bytes to read.
+        :return: The data.
+        :raises SwayIpcError: When sway closes the connection.
+        """
+        data = bytearray()
+
+        while len(data) < size:
+            chunk = self.connection.recv(size - len(data))
+            if not chunk:
+                raise SwayIpcError("sway closed the connection")
+            data += chunk
+
+        return bytes(data)
+
+    def receive(self) -> tuple[int, Any]:
+        """Read a message.
+
+        :return: The message type and its payload.
+        :raises SwayIpcError: When the reply can't be read.
+        """
+        magic, size, message_type = IPC_HEADER.unpack(
+            self.read_exactly(IPC_HEADER.size)
+        )
+
+        if magic != IPC_MAGIC:
+            raise SwayIpcError("received an invalid reply")
+
+        try:
+            return message_type, loads(self.read_exactly(size))
+        except ValueError as error:
+            raise SwayIpcError(str(error)) from error
+
+    def query_many(self, message_types: Iterable[SwayIpcMessageType]) -> list[Any]:
+        """Send queries back to back, then read their replies.
+
+        :param message_types: The queries.
+        :return: The replies, in the order of the queries.
+        :raises SwayIpcError: When sway can't be queried.
+        """
+        message_types = list(message_types)
+
+        try:
+            for message_type in message_types:
+                self.send(message_type)
+
+            replies = []
+
+            while len(replies) < len(message_types):
+                reply_type, reply = self.receive()
+
+                if reply_type & IPC_EVENT_MASK:
+                    continue
+
+                if reply_type != message_types[len(replies)]:
+                    raise SwayIpcError(f"unexpected reply type {reply_type}")
+
+                replies.append(reply)
+        except OSError as error:
+            raise SwayIpcError(str(error)) from error
+
+        return replies
+
+    def query(self, message_type: SwayIpcMessageType) -> Any:
+        """Send a query and read its reply.
+
+        :param message_type: The query.
+        :return: The reply.
+        :raises SwayIpcError: When sway can't be queried.
+        """
+        return self.query_many((message_type,))[0]
+
+
+def find_focused_node(tree: dict[str, Any]) -> dict[str, Any] | None:
+    """Find the focused node in a sway tree.
+
+    Children are visited in focus order (most recently focused first),
+    which leads straight to the focused node, so the walk usually stops
+    after visiting one node per level.
+
+    :param tree: The tree (from GET_TREE).
+    :return: The focused node, None when no node is focused.
+    """
+    stack = [tree]
+
+    while stack:
+        node = stack.pop()
+
+        if node.get("focused"):
+            return node
+
+        children = node.get("nodes", []) + node.get("floating_nodes", [])
+        focus_order = {
+            node_id: order for order, node_id in enumerate(node.get("focus", ()))
+        }
+        # popped last, so the most recently focused child is visited first
+        children.sort(
+            key=lambda child: focus_order.get(child.get("id"), len(focus_order)),
+            reverse=True,
+        )
+        stack.extend(children)
+
+    return None
@@ -1,7 +1,9 @@
 """Window System Type module."""
 
+from __future__ import annotations
+
 from enum import Enum
-from os import getenv
+from os import getenv, listdir, path
 from typing import Literal
 
 from hints.window_systems.exceptions import CouldNotIdentifyWindowSystemType
@@ -34,3 +36,120 @@ def get_window_system_type() -> WindowSystemType:
         if xdg_session_type == "wayland"
         else WindowSystemType.X11
     )
+
+
+def get_wayland_window_system_id_from_environment() -> str:
+    """Get the id of the Wayland window system from environment
+    variables compositors set for their clients.
+
+    :return: The window system id, or an empty string if the environment
+        does not tell.
+    """
+    if getenv("SWAYSOCK"):
+        return "sway"
+
+    if getenv("HYPRLAND_INSTANCE_SIGNATURE"):
+        return "hyprland"
+
+    if getenv("KDE_FULL_SESSION"):
+        return "plasmashell"
+
+    # a list, like "KDE" or "sway:wlroots"
+    desktops = {
+        desktop.lower() for desktop in getenv("XDG_CURRENT_DESKTOP", "").split(":")
+    }
+
+    for desktop, window_system_id in (
+        ("sway", "sway"),
+        ("hyprland", "hyprland"),
+        ("kde", "plasmashell"),
+    ):
+        if desktop in desktops:
+            return window_system_id
+
+    return ""
+
+
+def get_wayland_window_system_id_from_processes() -> str:
+    """Get the id of the Wayland window system from the running processes.
+
+    :return: The window system id, or an empty string if no supported
+        window system is running.
+    """
+    # add new waland wms here, then add a match case in
+    # hints.hints.get_window_system_class to import the class
+    supported_wayland_wms = {"sway", "Hyprland", "plasmashell"}
+
+    for pid in listdir("/proc"):
+        if not pid.isdigit():
+            continue
+
+        try:
+            with open(f"/proc/{pid}/comm", encoding="utf-8") as _f:
+                command = _f.read().rstrip("\n")
+        except OSError:
+            # the process exited
+            continue
+
+        if command in supported_wayland_wms:
+            return command.lower()
+
+    return ""
+
+
+def get_window_system_id_cache_path() -> str | None:
+    """Get the file the window system id is cached in for this session.
+
+    The cache lives in the runtime directory, which is removed when the
+    user logs out.
+
+    :return: The cache path, None when there is nothing to key it by.
+    """
+    runtime_directory = getenv("XDG_RUNTIME_DIR")
+    session = getenv("XDG_SESSION_ID") or getenv("WAYLAND_DISPLAY")
+
+    if not runtime_directory or not session:
+        return None
+
+    return path.join(
+        runtime_directory, f"hints-window-system-{session.replace('/', '_')}"
+    )
+
+
+def get_window_system_id() -> str:
+    """Get the id of the window system in use.
+
+    Wayland window systems are identified from environment variables
+    first, then from the running processes. What the processes tell is
+    cached for the session.
+
+    :return: The window system id (see SupportedWindowSystems), or an
+        empty string if the window system is not supported.
+    """
+    if get_window_system_type() == WindowSystemType.X11:
+        return "x11"
+
+    window_system_id = get_wayland_window_system_id_from_environment()
+
+    if window_system_id:
+        return window_system_id
+
+    cache_path = get_window_system_id_cache_path()
+
+    if cache_path:
+        try:
+            with open(cache_path, encoding="utf-8") as _f:
+                return _f.read()
+        except OSError:
+            pass
+
+    window_system_id = get_wayland_window_system_id_from_processes()
+
+    if cache_path and window_system_id:
+        try:
+            with open(cache_path, "w", encoding="utf-8") as _f:
+                _f.write(window_system_id)
+        except OSError:
+            pass
+
+    return window_system_id
@@ -1,12 +1,20 @@
 """Linux window manger."""
 
-from gi import require_version
+from __future__ import annotations
 
-require_version("Wnck", "3.0")
+import logging
 
-from gi.repository import Wnck
+from gi import require_version
 
+from hints.mouse import get_focused_window_snapshot
 from hints.window_systems.window_system import WindowSystem
+from hints.window_systems.x11_probe import (
+    X11ProbeError,
+    X11WindowInformation,
+    get_active_window,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class X11(WindowSystem):
@@ -15,9 +23,39 @@ class X11(WindowSystem):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.screen = Wnck.Screen.get_default()
-        self.screen.force_update()
-        self.active_window = self.screen.get_active_window()
+        snapshot = get_focused_window_snapshot("x11")
+
+        if snapshot:
+            self.active_window = X11WindowInformation(
+                window=snapshot["window"],
+                extents=tuple(snapshot["extents"]),
+                pid=snapshot["pid"],
+                class_instance_name=snapshot["class_instance_name"],
+            )
+            return
+
+        try:
+            self.active_window = get_active_window()
+        except X11ProbeError:
+            logger.debug("Could not probe the active window, falling back to Wnck.")
+            self.active_window = self._get_active_window_from_wnck()
+
+    def _get_active_window_from_wnck(self) -> X11WindowInformation:
+        # imported here, only needed when probing fails
+        require_version("Wnck", "3.0")
+        from gi.repository import Wnck  # pylint: disable=import-outside-toplevel
+
+        screen = Wnck.Screen.get_default()
+        # fetches the state of every window and workspace
+        screen.force_update()
+        active_window = screen.get_active_window()
+
+        return X11WindowInformation(
+            window=active_window.get_xid(),
+            extents=tuple(active_window.get_geometry()),
+            pid=active_window.get_pid(),
+            class_instance_name=active_window.get_class_instance_name(),
+        )
 
     @property
     def window_system_name(self) -> str:
@@ -35,7 +73,7 @@ class X11(WindowSystem):
 
         :return: Active window extents (x, y, width, height).
         """
-        return self.active_window.get_geometry()
+        return self.active_window.extents
 
     @property
     def focused_window_pid(self) -> int:
@@ -43,7 +81,7 @@ class X11(WindowSystem):
 
         :return: Process ID of focused window.
         """
-        return self.active_window.get_pid()
+        return self.active_window.pid
 
     @property
     def focused_applicaiton_name(self) -> str:
@@ -54,4 +92,4 @@ class X11(WindowSystem):
 
         :return: Focused application name.
         """
-        return self.active_window.get_class_instance_name()
+        return self.active_window.class_instance_name
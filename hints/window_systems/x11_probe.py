@@ -0,0 +1,374 @@
+"""Active window probe for X11.
+
+Reads the active window's geometry, pid and class straight from the X
+server with a handful of Xlib requests, instead of having libwnck fetch
+the state of every window and workspace.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from ctypes import (
+    CFUNCTYPE,
+    POINTER,
+    Structure,
+    byref,
+    c_char_p,
+    c_int,
+    c_long,
+    c_ubyte,
+    c_uint,
+    c_ulong,
+    c_void_p,
+    cast,
+    cdll,
+    string_at,
+)
+from ctypes.util import find_library
+from dataclasses import dataclass
+from typing import Iterator
+
+Window = c_ulong
+Atom = c_ulong
+# Xlib constants
+SUCCESS = 0
+XA_CARDINAL = 6
+XA_WINDOW = 33
+NO_EVENT_MASK = 0
+STRUCTURE_NOTIFY_MASK = 1 << 17
+PROPERTY_CHANGE_MASK = 1 << 22
+# XEvent is a union padded to 24 longs
+XEvent = c_long * 24
+
+
+class X11ProbeError(Exception):
+    """Exception to raise when the active window can't be probed."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+    def __str__(self):
+        return f"Could not probe the active X11 window: {self.reason}"
+
+
+@dataclass
+class X11WindowInformation:
+    """Active window information."""
+
+    window: int
+    # frame extents (x, y, width, height), like Wnck.Window.get_geometry
+    extents: tuple[int, int, int, int]
+    pid: int
+    # the instance part of WM_CLASS
+    class_instance_name: str
+
+
+class XClassHint(Structure):  # pylint: disable=too-few-public-methods
+    """Xlib XClassHint."""
+
+    # pointers rather than c_char_p, which would copy the strings and lose
+    # the pointers to free
+    _fields_ = [("res_name", c_void_p), ("res_class", c_void_p)]
+
+
+XErrorHandler = CFUNCTYPE(c_int, c_void_p, c_void_p)
+
+
+class X11Probe:
+    """Xlib connection for probing the active window."""
+
+    def __init__(self):
+        """X11 probe constructor.
+
+        :raises X11ProbeError: When libX11 can't be loaded or the display
+            can't be opened.
+        """
+        library = find_library("X11")
+
+        if not library:
+            raise X11ProbeError("libX11 was not found")
+
+        xlib = cdll.LoadLibrary(library)
+        xlib.XOpenDisplay.restype = c_void_p
+        xlib.XOpenDisplay.argtypes = [c_char_p]
+        xlib.XCloseDisplay.argtypes = [c_void_p]
+        xlib.XDefaultRootWindow.restype = Window
+        xlib.XDefaultRootWindow.argtypes = [c_void_p]
+        xlib.XInternAtom.restype = Atom
+        xlib.XInternAtom.argtypes = [c_void_p, c_char_p, c_int]
+        xlib.XGetWindowProperty.argtypes = [
+            c_void_p,
+            Window,
+            Atom,
+            c_long,
+            c_long,
+            c_int,
+            Atom,
+            POINTER(Atom),
+            POINTER(c_int),
+            POINTER(c_ulong),
+            POINTER(c_ulong),
+            POINTER(POINTER(c_ubyte)),
+        ]
+        xlib.XGetGeometry.argtypes = [
+            c_void_p,
+            Window,
+            POINTER(Window),
+            POINTER(c_int),
+            POINTER(c_int),
+            POINTER(c_uint),
+            POINTER(c_uint),
+            POINTER(c_uint),
+            POINTER(c_uint),
+        ]
+        xlib.XTranslateCoordinates.argtypes = [
+            c_void_p,
+            Window,
+            Window,
+            c_int,
+            c_int,
+            POINTER(c_int),
+            POINTER(c_int),
+            POINTER(Window),
+        ]
+        xlib.XGetClassHint.argtypes = [c_void_p, Window, POINTER(XClassHint)]
+        xlib.XFree.argtypes = [c_void_p]
+        xlib.XSync.argtypes = [c_void_p, c_int]
+        # handlers are passed as pointers, so the previous handler (a plain
+        # address) can be set back
+        xlib.XSetErrorHandler.argtypes = [c_void_p]
+        xlib.XSetErrorHandler.restype = c_void_p
+        xlib.XConnectionNumber.argtypes = [c_void_p]
+        xlib.XSelectInput.argtypes = [c_void_p, Window, c_long]
+        xlib.XPending.argtypes = [c_void_p]
+        xlib.XNextEvent.argtypes = [c_void_p, POINTER(XEvent)]
+        self.xlib = xlib
+
+        # installed while probing (see trap_errors), kept referenced so
+        # libX11 never calls a freed callback
+        self.error = False
+        self.error_handler = XErrorHandler(self.on_error)
+
+        self.display = xlib.XOpenDisplay(None)
+
+        if not self.display:
+            raise X11ProbeError("could not open the display")
+
+        self.root = xlib.XDefaultRootWindow(self.display)
+
+    def __enter__(self) -> X11Probe:
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Close the display connection."""
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+    def fileno(self) -> int:
+        """Get the file descriptor of the display connection.
+
+        :return: The file descriptor, readable when events arrive.
+        """
+        return self.xlib.XConnectionNumber(self.display)
+
+    def select_input(self, window: int, event_mask: int) -> bool:
+        """Choose the events to receive for a window.
+
+        Errors are handled right away, so they are not reported for the
+        requests that follow (windows often are gone by the time their
+        events are deselected).
+
+        :param window: The window.
+        :param event_mask: The events (like PROPERTY_CHANGE_MASK).
+        :return: Whether the events were selected.
+        """
+        with self.trap_errors():
+            self.xlib.XSelectInput(self.display, window, event_mask)
+
+        return not self.error
+
+    def drain_events(self) -> int:
+        """Read and discard the events that arrived.
+
+        :return: The number of events read.
+        """
+        event = XEvent()
+        count = 0
+
+        while self.xlib.XPending(self.display):
+            self.xlib.XNextEvent(self.display, byref(event))
+            count += 1
+
+        return count
+
+    def on_error(self, _display, _event) -> int:
+        """Xlib error handler, records that a request failed."""
+        self.error = True
+        return 0
+
+    @contextmanager
+    def trap_errors(self) -> Iterator[None]:
+        """Record errors of the requests made in the block in self.error.
+
+        The default error handler exits the process (for example when the
+        active window is closed while probing it). Error handlers are
+        process wide, so the probe's handler is only installed for the
+        block, and the previous one (like GDK's) is restored after it.
+        """
+        # errors of earlier requests go to the previous handler
+        self.xlib.XSync(self.display, False)
+        self.error = False
+        previous_handler = self.xlib.XSetErrorHandler(
+            cast(self.error_handler, c_void_p)
+        )
+
+        try:
+            yield
+            # errors of the requests in the block arrive by now
+            self.xlib.XSync(self.display, False)
+        finally:
+            self.xlib.XSetErrorHandler(previous_handler)
+
+    def get_cardinals(
+        self, window: int, property_name: str, property_type: int = XA_CARDINAL
+    ) -> list[int]:
+        """Get a window property made of 32 bit values.
+
+        :param window: The window.
+        :param property_name: The property name.
+        :param property_type: The property type.
+        :return: The values, empty when the window has no such property.
+        """
+        actual_type = Atom()
+        actual_format = c_int()
+        items = c_ulong()
+        bytes_after = c_ulong()
+        data = POINTER(c_ubyte)()
+
+        status = self.xlib.XGetWindowProperty(
+            self.display,
+            window,
+            self.xlib.XInternAtom(self.display, property_name.encode(), False),
+            0,
+            # 32 bit items to read, more than any property read here has
+            16,
+            False,
+            property_type,
+            byref(actual_type),
+            byref(actual_format),
+            byref(items),
+            byref(bytes_after),
+            byref(data),
+        )
+
+        if status != SUCCESS or not data:
+            return []
+
+        try:
+            if actual_format.value != 32:
+                return []
+            # format 32 properties are returned as an array of longs
+            return list(cast(data, POINTER(c_long))[: items.value])
+        finally:
+            self.xlib.XFree(data)
+
+    def get_active_window(self) -> X11WindowInformation:
+        """Get the active window information.
+
+        :return: The active window information.
+        :raises X11ProbeError: When there is no active window or it can't
+            be read.
+        """
+        with self.trap_errors():
+            active_window = self.read_active_window()
+
+        if self.error:
+            raise X11ProbeError("the active window could not be read")
+
+        return active_window
+
+    def read_active_window(self) -> X11WindowInformation:
+        """Read the active window information, errors are recorded in
+        self.error (see trap_errors).
+
+        :return: The active window information.
+        :raises X11ProbeError: When there is no active window.
+        """
+        active_windows = self.get_cardinals(self.root, "_NET_ACTIVE_WINDOW", XA_WINDOW)
+
+        if not active_windows or not active_windows[0]:
+            raise X11ProbeError("there is no active window")
+
+        window = Window(active_windows[0])
+        pids = self.get_cardinals(window.value, "_NET_WM_PID")
+        # left, right, top, bottom
+        frame_extents = self.get_cardinals(window.value, "_NET_FRAME_EXTENTS")
+        left, right, top, bottom = (
+            frame_extents if len(frame_extents) == 4 else (0, 0, 0, 0)
+        )
+
+        root = Window()
+        x = c_int()
+        y = c_int()
+        width = c_uint()
+        height = c_uint()
+        border = c_uint()
+        depth = c_uint()
+        child = Window()
+        class_hint = XClassHint()
+
+        self.xlib.XGetGeometry(
+            self.display,
+            window,
+            byref(root),
+            byref(x),
+            byref(y),
+            byref(width),
+            byref(height),
+            byref(border),
+            byref(depth),
+        )
+        # the geometry is relative to the parent (often a frame window)
+        self.xlib.XTranslateCoordinates(
+            self.display, window, self.root, 0, 0, byref(x), byref(y), byref(child)
+        )
+        has_class_hint = self.xlib.XGetClassHint(
+            self.display, window, byref(class_hint)
+        )
+        class_instance_name = (
+            string_at(class_hint.res_name).decode("utf-8", "replace")
+            if class_hint.res_name
+            else ""
+        )
+
+        if has_class_hint:
+            for name in (class_hint.res_name, class_hint.res_class):
+                if name:
+                    self.xlib.XFree(name)
+
+        return X11WindowInformation(
+            window=window.value,
+            extents=(
+                x.value - left,
+                y.value - top,
+                width.value + left + right,
+                height.value + top + bottom,
+            ),
+            pid=pids[0] if pids else 0,
+            class_instance_name=class_instance_name,
+        )
+
+
+def get_active_window() -> X11WindowInformation:
+    """Get the active window information.
+
+    :return: The active window information.
+    :raises X11ProbeError: When the active window can't be probed.
+    """
+    with X11Probe() as probe:
+        return probe.get_active_window()